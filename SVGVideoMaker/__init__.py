@@ -3,5 +3,11 @@ from SVGVideoMaker.geo import *
 
 from SVGVideoMaker.video import *
 
+from SVGVideoMaker.cache import FrameCache
+
+from SVGVideoMaker.metrics import RenderReport
+
+from SVGVideoMaker.output import OutputSpec
+
 from SVGVideoMaker.parser import parse_svg
 # endregion EasyImports
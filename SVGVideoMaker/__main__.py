@@ -0,0 +1,11 @@
+"""
+Command line of SVGVideoMaker, see batch module.
+"""
+
+# region Imports
+import sys
+from SVGVideoMaker.batch import main
+# endregion Imports
+
+if __name__ == '__main__':
+    sys.exit(main())
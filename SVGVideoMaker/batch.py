@@ -0,0 +1,326 @@
+"""
+Render of many videos in one process.
+Jobs are scenes in python files or modules, svg files, scene files saved by SVG.dump or functions,
+each job have its outputs.
+All jobs share the same pool of processes to rasterize frames, some jobs run together so the pool stay busy
+while ffmpeg encode the end of an other job.
+
+Run it with "python -m SVGVideoMaker render scene.py other.svg -o videos/".
+"""
+
+# region Imports
+import os
+import sys
+import json
+import argparse
+import traceback
+from time import perf_counter
+from importlib import import_module
+from importlib.util import spec_from_file_location, module_from_spec
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from SVGVideoMaker.geo import SVG, Point2D
+from SVGVideoMaker.geo.serialize import SCENE_EXT
+from SVGVideoMaker.video import Video
+from SVGVideoMaker.output import OutputSpec
+from SVGVideoMaker.parser import parse_svg
+# endregion Imports
+
+# Extensions of scene files, other scenes are names of modules
+SCENE_FILES = (".py", ".svg", f".{SCENE_EXT}")
+
+class RenderJob:
+    """ A video to render, with its outputs.
+
+    Args:
+        scene   (str or callable) : The scene, a python file or module who define create_video or create_svg,
+                                    a svg file, a scene file saved by SVG.dump, or a function who return a Video
+                                    or a SVG.
+        outputs (list)            : The OutputSpec of video. Default None, one mp4 named like job in 'path'.
+        name    (str)             : The name of job. Default None, name of scene.
+        path    (str)             : The directory of default output. Default "./".
+        start   (int)             : Begin of movie in seconds.
+        end     (int)             : End of movie in seconds.
+        width   (int)             : Width of video in px, for a scene who give a SVG. Default None, size of svg.
+        height  (int)             : Height of video in px, for a scene who give a SVG. Default None, size of svg.
+        fps     (int)             : Number of frames per seconds, for a scene who give a SVG. Default 30.
+    """
+    WAITING = "waiting"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, scene, outputs=None, name=None, path="./", start=None, end=None, width=None, height=None,
+                 fps=30):
+        self.scene = scene
+        self.name = name if name else get_scene_name(scene)
+        self.outputs = outputs if outputs else [OutputSpec(path=path, name=self.name)]
+        self.start = start
+        self.end = end
+        self.width = width
+        self.height = height
+        self.fps = fps
+
+        self.status = RenderJob.WAITING
+        self.frames = None
+        self.duration = None
+        self.error = None
+
+    def load(self):
+        """Create the video of scene.
+
+        Returns:
+            Video : The video.
+        """
+        scene = self.scene
+        if isinstance(scene, str) and scene.endswith(".svg"):
+            return self.get_video(parse_svg(scene))
+        if isinstance(scene, str) and scene.endswith(f".{SCENE_EXT}"):
+            return self.get_video(SVG.load(scene))
+
+        if isinstance(scene, str):
+            module = load_module(scene)
+            for function_name in ("create_video", "create_svg"):
+                if hasattr(module, function_name):
+                    scene = getattr(module, function_name)
+                    break
+            else:
+                raise ValueError(f"Scene {self.scene} define neither create_video nor create_svg")
+        return self.get_video(scene())
+
+    def get_video(self, element):
+        """Get the video of an element given by a scene.
+
+        Args:
+            element (Video or SVG) : The element given by scene.
+
+        Returns:
+            Video : The video of element.
+        """
+        if isinstance(element, Video):
+            return element
+        if isinstance(element, SVG):
+            width, height = element.svg_dimensions
+            return Video(element, width=self.width if self.width else width,
+                         height=self.height if self.height else height, fps=self.fps)
+        raise ValueError(f"Scene {self.scene} give {element.__class__.__name__}, not a Video or a SVG")
+
+    def run(self, workers=None, executor=None, raw=False, pipeline=None):
+        """Render all outputs of job, the status and the duration of job are updated.
+
+        Args:
+            workers  (int)      : Number of processes of executor.
+            executor (Executor) : The processes to rasterize frames, shared by jobs.
+            raw      (bool)     : Send raw pixels to ffmpeg instead of png, if svg have a background color.
+                                  Default False.
+            pipeline (int)      : Number of frames in queues between stages of pipeline. Default None.
+        """
+        self.status = RenderJob.RUNNING
+        begin = perf_counter()
+        try:
+            video = self.load()
+            start_frame, end_frame = video.get_frames_range(self.start, self.end)
+            self.frames = end_frame - start_frame + 1
+            # Raw pixels need an opaque background, scenes without background are send in png
+            raw = raw and bool(video.svg.background_color)
+            video.save_outputs(self.outputs, self.start, self.end, workers=workers, raw=raw, pipeline=pipeline,
+                               executor=executor)
+            self.status = RenderJob.DONE
+        except Exception:
+            self.status = RenderJob.FAILED
+            self.error = traceback.format_exc()
+        self.duration = perf_counter() - begin
+
+    # region Override
+    def __str__(self):
+        string = f"{self.name.ljust(20)} {self.status.ljust(8)}"
+        if self.duration is not None:
+            string += f" {self.duration:8.2f}s"
+        if self.frames and self.duration:
+            string += f" {self.frames} frames ({self.frames / self.duration:.2f} fps)"
+        return string
+    # endregion Override
+
+class BatchRender:
+    """ Render many jobs with one pool of processes, sized to the machine.
+    Some jobs run together, so frames of a job are rasterized while ffmpeg encode an other job.
+
+    Args:
+        workers    (int)      : Number of processes to rasterize frames. Default None, number of cpu.
+        concurrent (int)      : Number of jobs who run together. Default 2.
+        raw        (bool)     : Send raw pixels to ffmpeg instead of png, for scenes with a background color.
+                                Default True.
+        pipeline   (int)      : Number of frames in queues between stages of pipeline. Default 4.
+        callback   (callable) : Function called with a job when it start and when it end. Default None.
+    """
+    def __init__(self, workers=None, concurrent=2, raw=True, pipeline=4, callback=None):
+        self.workers = workers if workers else os.cpu_count()
+        self.concurrent = max(1, concurrent)
+        self.raw = raw
+        self.pipeline = pipeline
+        self.callback = callback
+        self.duration = None
+
+    def run_job(self, job, executor):
+        job.status = RenderJob.RUNNING
+        if self.callback:
+            self.callback(job)
+        job.run(self.workers, executor, self.raw, self.pipeline)
+        if self.callback:
+            self.callback(job)
+        return job
+
+    def run(self, jobs):
+        """Render all jobs, a failed job don't stop others.
+
+        Args:
+            jobs (list) : The RenderJob to run.
+
+        Returns:
+            list : The jobs, with their status.
+        """
+        begin = perf_counter()
+        # Processes are created before ffmpeg processes and threads of jobs, so they don't share them
+        executor = ProcessPoolExecutor(self.workers) if self.workers > 1 else None
+        try:
+            if executor:
+                executor.submit(abs, 0).result()
+            with ThreadPoolExecutor(self.concurrent) as threads:
+                list(threads.map(lambda job: self.run_job(job, executor), jobs))
+        finally:
+            if executor:
+                executor.shutdown()
+        self.duration = perf_counter() - begin
+        return jobs
+
+    @staticmethod
+    def get_report(jobs):
+        """Get the report of jobs, with status and time of each job.
+
+        Args:
+            jobs (list) : The RenderJob.
+
+        Returns:
+            str : The report.
+        """
+        done = sum(job.status == RenderJob.DONE for job in jobs)
+        string = f"{done}/{len(jobs)} jobs done\n"
+        for job in jobs:
+            string += f"\t{job}\n"
+            if job.error:
+                string += "".join(f"\t\t{line}\n" for line in job.error.splitlines()[-3:])
+        return string
+
+# region Utility
+def get_scene_name(scene):
+    """Get a name for a scene.
+
+    Args:
+        scene (str or callable) : The scene.
+
+    Returns:
+        str : The name of file without extension, the last name of module, or the name of function.
+    """
+    if isinstance(scene, str):
+        name = os.path.basename(scene)
+        return os.path.splitext(name)[0] if name.endswith(SCENE_FILES) else name.split(".")[-1]
+    return getattr(scene, "__name__", "scene")
+
+def load_module(scene):
+    """Load a python file or import a module.
+
+    Args:
+        scene (str) : The path of python file or the name of module.
+
+    Returns:
+        module : The module of scene.
+    """
+    if not scene.endswith(".py"):
+        return import_module(scene)
+    spec = spec_from_file_location(f"scene_{get_scene_name(scene)}", scene)
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def load_jobs(jobs_file, path="./"):
+    """Load jobs from a json file, a list of jobs with their outputs.
+    Like [{"scene": "scene.py", "end": 5, "outputs": [{"width": 320, "height": 180, "ext": "webm"}]}].
+    A view box of output is given by [[x_min, y_min], [x_max, y_max]].
+    Relative paths of scene files are relative to the directory of json file.
+
+    Args:
+        jobs_file (str) : The path of json file.
+        path      (str) : The directory of outputs who don't give one. Default "./".
+
+    Returns:
+        list : The RenderJob.
+    """
+    with open(jobs_file) as f:
+        descriptions = json.load(f)
+
+    directory = os.path.dirname(jobs_file)
+    jobs = []
+    for description in descriptions:
+        scene = description.get("scene")
+        if isinstance(scene, str) and scene.endswith(SCENE_FILES):
+            description["scene"] = os.path.join(directory, scene)
+        outputs = description.pop("outputs", None)
+        if outputs:
+            for output in outputs:
+                if output.get("view_box"):
+                    output["view_box"] = tuple(Point2D(*coordinates) for coordinates in output["view_box"])
+            outputs = [OutputSpec(**{"path": path, **output}) for output in outputs]
+        jobs.append(RenderJob(outputs=outputs, **{"path": path, **description}))
+    return jobs
+# endregion Utility
+
+# region Command line
+def get_parser():
+    parser = argparse.ArgumentParser(prog="python -m SVGVideoMaker", description="Make videos from svg scenes")
+    commands = parser.add_subparsers(dest="command")
+    render = commands.add_parser("render", help="Render scenes, python files, modules, svg files or scene files")
+    render.add_argument("scenes", nargs="*", help="The scenes to render")
+    render.add_argument("-j", "--jobs", help="A json file of jobs, with their outputs")
+    render.add_argument("-o", "--output", default="./", help="The directory of videos. Default current directory")
+    render.add_argument("-e", "--ext", default="mp4", help="The format of videos. Default mp4")
+    render.add_argument("--start", type=float, help="Begin of videos in seconds")
+    render.add_argument("--end", type=float, help="End of videos in seconds")
+    render.add_argument("--fps", type=int, default=30, help="Frames per seconds of svg files. Default 30")
+    render.add_argument("-w", "--workers", type=int, help="Number of processes. Default number of cpu")
+    render.add_argument("-c", "--concurrent", type=int, default=2, help="Number of jobs who run together. Default 2")
+    render.add_argument("--png", action="store_true", help="Send png to ffmpeg instead of raw pixels")
+    return parser
+
+def main(args=None):
+    """Run the command line.
+
+    Args:
+        args (list) : The arguments. Default None, arguments of command line.
+
+    Returns:
+        int : The exit code, 1 if a job failed.
+    """
+    parser = get_parser()
+    args = parser.parse_args(args)
+    if args.command != "render" or not (args.scenes or args.jobs):
+        parser.print_help()
+        return 2
+
+    path = os.path.join(args.output, "")
+    if not os.path.exists(path):
+        os.makedirs(path)
+    jobs = load_jobs(args.jobs, path) if args.jobs else []
+    for scene in args.scenes:
+        name = get_scene_name(scene)
+        jobs.append(RenderJob(scene, [OutputSpec(path=path, name=name, ext=args.ext)], name=name,
+                              start=args.start, end=args.end, fps=args.fps))
+
+    batch = BatchRender(args.workers, args.concurrent, raw=not args.png,
+                        callback=lambda job: print(job, flush=True))
+    batch.run(jobs)
+    print(BatchRender.get_report(jobs), end="")
+    print(f"Batch rendered in {batch.duration:.2f}s")
+    return 0 if all(job.status == RenderJob.DONE for job in jobs) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
+# endregion Command line
@@ -0,0 +1,259 @@
+"""
+Benchmark of render, on synthetic scenes and on scenes of examples.
+Computation of svg frames, rasterization and full render of video are measured separately,
+results are saved in json to be compared between commits.
+
+Run it with "python -m SVGVideoMaker.benchmark result.json".
+"""
+
+# region Imports
+import os
+import sys
+import json
+import platform
+from math import pi, cos, sin
+from random import Random
+from time import perf_counter, strftime
+from subprocess import check_output, DEVNULL, CalledProcessError
+from tempfile import TemporaryDirectory
+from SVGVideoMaker.geo import Point2D, SVG, Group, Polygon, Ellipse, Segment
+from SVGVideoMaker.video import Video
+from SVGVideoMaker.raster import rasterize, rasterize_raw
+# endregion Imports
+
+def create_scene(polygons=10, ellipses=10, segments=10, keyframes=4, morph=True, depth=0, fps=30, seconds=5,
+                 width=500, height=500, seed=0):
+    """Create a synthetic scene, the same for same parameters.
+
+    Args:
+        polygons  (int)  : Number of polygons. Default 10.
+        ellipses  (int)  : Number of ellipses. Default 10.
+        segments  (int)  : Number of segments. Default 10.
+        keyframes (int)  : Number of key frames for each animation of each shape. Default 4.
+        morph     (bool) : Polygons are morphed in polygons with an other number of points. Default True.
+        depth     (int)  : Number of nested groups, shapes are spread on each level. Default 0, no group.
+        fps       (int)  : Number of frames per seconds. Default 30.
+        seconds   (int)  : Duration of animation in seconds. Default 5.
+        width     (int)  : Width of video in px. Default 500.
+        height    (int)  : Height of video in px. Default 500.
+        seed      (int)  : The seed of random values. Default 0.
+
+    Returns:
+        Video : The video of scene.
+    """
+    random = Random(seed)
+    last_frame = fps * seconds
+    key_frames = [round(last_frame * (k + 1) / keyframes) for k in range(keyframes)]
+
+    def random_point(margin=0):
+        return Point2D(random.uniform(margin, width - margin), random.uniform(margin, height - margin))
+
+    def regular_points(center, radius, nb_points):
+        angle = random.uniform(0, 2 * pi)
+        return [center + Point2D(radius * cos(angle + 2 * pi * i / nb_points),
+                                 radius * sin(angle + 2 * pi * i / nb_points)) for i in range(nb_points)]
+
+    def animate(shape):
+        for frame in key_frames:
+            shape.add_translation(frame, random.uniform(-20, 20), random.uniform(-20, 20))
+            shape.add_rotate(frame, random.uniform(-90, 90))
+            shape.add_opacity(frame, random.uniform(0.2, 1))
+
+    shapes = []
+    for _ in range(polygons):
+        center, radius = random_point(30), random.uniform(5, 30)
+        polygon = Polygon(regular_points(center, radius, random.randint(3, 8)))
+        animate(polygon)
+        if morph:
+            for frame in key_frames:
+                polygon.add_modification(frame, regular_points(center, radius, random.randint(3, 8)))
+        shapes.append(polygon)
+
+    for _ in range(ellipses):
+        ellipse = Ellipse(random_point(30), random.uniform(5, 30), random.uniform(5, 30))
+        animate(ellipse)
+        shapes.append(ellipse)
+
+    for _ in range(segments):
+        segment = Segment(random_point(), random_point())
+        animate(segment)
+        shapes.append(segment)
+
+    svg = SVG(width=width, height=height)
+    svg.set_view_box(Point2D(0, 0), Point2D(width, height))
+
+    # Spread shapes on the svg and each nested group
+    levels = [svg]
+    for _ in range(depth):
+        group = Group()
+        levels[-1].append(group)
+        levels.append(group)
+    for i, shape in enumerate(shapes):
+        levels[i % len(levels)].append(shape)
+
+    return Video(svg, width=width, height=height, fps=fps)
+
+# region Scenes
+def polygon_example():
+    from SVGVideoMaker.examples.Polygon import create_video
+    return create_video()
+
+def ellipse_arc_example():
+    from SVGVideoMaker.examples.EllipseArc import create_video
+    return create_video()
+
+def colors_example():
+    from SVGVideoMaker.examples.Colors import create_svg
+    return Video(create_svg())
+
+# Function who create the video of each scene by name
+SCENES = {
+    "example_polygon": polygon_example,
+    "example_ellipse_arc": ellipse_arc_example,
+    "example_colors": colors_example,
+    "small": lambda: create_scene(polygons=5, ellipses=5, segments=5),
+    "large": lambda: create_scene(polygons=100, ellipses=100, segments=100),
+    "keyframes": lambda: create_scene(keyframes=30),
+    "morph": lambda: create_scene(polygons=50, ellipses=0, segments=0),
+    "nested": lambda: create_scene(depth=5),
+}
+# endregion Scenes
+
+# region Measures
+def measure(function, repeat=1):
+    """Measure the time of a function, keep the best time of all runs.
+
+    Args:
+        function (callable) : The function to measure, without arguments.
+        repeat   (int)      : Number of runs. Default 1.
+
+    Returns:
+        float, object : The best time in seconds and the result of last run.
+    """
+    best, result = None, None
+    for _ in range(repeat):
+        start = perf_counter()
+        result = function()
+        duration = perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best, result
+
+def benchmark_video(video, repeat=3, raster_frames=30, save_options=None):
+    """Measure the render of a video.
+
+    Args:
+        video         (Video) : The video to measure.
+        repeat        (int)   : Number of runs of each measure, the best is kept. Default 3.
+        raster_frames (int)   : Number of frames rasterized, sampled on all the video. Default 30.
+        save_options  (dict)  : Options of save_movie, like workers. Default None, save_movie isn't measured.
+
+    Returns:
+        dict : The results of each measure, times in seconds.
+    """
+    make_movie_time, frames = measure(lambda: [frame for _, frame in video.make_movie()], repeat)
+    results = {
+        "frames": len(frames),
+        "svg_bytes": sum(len(frame) for frame in frames),
+        "make_movie": make_movie_time,
+        "make_movie_fps": len(frames) / make_movie_time if make_movie_time else None,
+    }
+
+    samples = frames[::max(1, len(frames) // raster_frames)][:raster_frames]
+    png_time, _ = measure(lambda: [rasterize(frame) for frame in samples], repeat)
+    raw_time, _ = measure(lambda: [rasterize_raw(frame, video.width, video.height) for frame in samples], repeat)
+    results.update({
+        "raster_frames": len(samples),
+        "rasterize": png_time / len(samples),
+        "rasterize_raw": raw_time / len(samples),
+    })
+
+    if save_options is not None:
+        with TemporaryDirectory() as directory:
+            save_time, report = measure(lambda: video.save_movie(path=f"{directory}/", metrics=True,
+                                                                 **save_options), repeat)
+        results.update({
+            "save_movie": save_time,
+            "save_movie_fps": len(frames) / save_time if save_time else None,
+            "stages": report.get_summary(),
+        })
+    return results
+# endregion Measures
+
+def get_commit():
+    """Get the git commit of package, to know which version is measured.
+
+    Returns:
+        str : The hash of commit, None if package isn't in a git repository.
+    """
+    try:
+        return check_output(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(__file__),
+                            stderr=DEVNULL).decode().strip()
+    except (OSError, CalledProcessError):
+        return None
+
+def run_benchmarks(path=None, scenes=None, repeat=3, raster_frames=30, save_options=None):
+    """Measure all scenes and save results in json.
+
+    Args:
+        path          (str)  : The path of json file. Default None, results aren't saved.
+        scenes        (list) : Names of scenes to measure, see SCENES. Default None, all scenes.
+        repeat        (int)  : Number of runs of each measure, the best is kept. Default 3.
+        raster_frames (int)  : Number of frames rasterized by scene. Default 30.
+        save_options  (dict) : Options of save_movie. Default None, save_movie isn't measured.
+
+    Returns:
+        dict : The results of all scenes.
+    """
+    results = {
+        "commit": get_commit(),
+        "date": strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "scenes": {}
+    }
+    for name in scenes if scenes else SCENES:
+        print(f"Benchmark {name}")
+        results["scenes"][name] = benchmark_video(SCENES[name](), repeat, raster_frames, save_options)
+
+    if path:
+        with open(path, "w") as f:
+            json.dump(results, f, indent=4)
+    return results
+
+def compare(old, new):
+    """Compare results of two benchmarks.
+
+    Args:
+        old (str or dict) : The reference results or the path of its json file.
+        new (str or dict) : The new results or the path of its json file.
+
+    Returns:
+        str : A table of speedup of each measure, above 1 the new results are faster.
+    """
+    results = []
+    for result in (old, new):
+        if isinstance(result, str):
+            with open(result) as f:
+                result = json.load(f)
+        results.append(result)
+    old, new = results
+
+    string = f"{old.get('commit')} -> {new.get('commit')}\n"
+    for name, new_values in new["scenes"].items():
+        old_values = old["scenes"].get(name)
+        if old_values is None:
+            continue
+        string += f"{name}\n"
+        for measure_name in ("make_movie", "rasterize", "rasterize_raw", "save_movie"):
+            if old_values.get(measure_name) and new_values.get(measure_name):
+                speedup = old_values[measure_name] / new_values[measure_name]
+                string += f"\t{measure_name.ljust(14)}: {old_values[measure_name]:.4f}s -> " \
+                          f"{new_values[measure_name]:.4f}s (x{speedup:.2f})\n"
+    return string
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3:
+        print(compare(sys.argv[1], sys.argv[2]))
+    else:
+        run_benchmarks(sys.argv[1] if len(sys.argv) > 1 else "benchmark.json", save_options={"ext": "mp4"})
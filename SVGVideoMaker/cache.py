@@ -0,0 +1,153 @@
+"""
+Cache on disk of rasterized frames.
+Frames are addressed by their content, so a frame who don't change between two renders is rasterized only once.
+"""
+
+# region Imports
+import os
+from hashlib import sha1
+from getpass import getuser
+from collections import OrderedDict
+# endregion Imports
+
+class FrameCache:
+    """ Cache of rasterized frames, with a least recently used eviction when the cache is full.
+
+    Args:
+        path     (str) : The directory of cache. Default "/tmp/user/svg_frames_cache/".
+        max_size (int) : The maximum size of cache in bytes. Default 1 GiB.
+    """
+    def __init__(self, path=None, max_size=2 ** 30):
+        self.path = path if path else f"/tmp/{getuser()}/svg_frames_cache/"
+        self.max_size = max_size
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+
+        # Index of entries, from the least to the most recently used
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits, self.misses = 0, 0
+        self.load_index()
+
+    def load_index(self):
+        """
+        Read all entries already on disk, ordered by their last use.
+        """
+        found = []
+        for directory in os.listdir(self.path):
+            sub_path = os.path.join(self.path, directory)
+            if not os.path.isdir(sub_path):
+                continue
+            for name in os.listdir(sub_path):
+                if name.endswith(".tmp"):
+                    continue
+                stat = os.stat(os.path.join(sub_path, name))
+                found.append((stat.st_mtime, name, stat.st_size))
+
+        for _, key, size in sorted(found):
+            self.entries[key] = size
+            self.size += size
+
+    @staticmethod
+    def key(frame, *params):
+        """Compute the key of a frame.
+
+        Args:
+            frame  (str) : The svg frame in string.
+            *params      : Others parameters who change the raster (size, format...).
+
+        Returns:
+            str : The key of frame.
+        """
+        digest = sha1(frame.encode() if isinstance(frame, str) else frame)
+        digest.update(repr(params).encode())
+        return digest.hexdigest()
+
+    def get_path(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+    def get(self, key):
+        """Get a raster from cache.
+
+        Args:
+            key (str) : The key of frame.
+
+        Returns:
+            bytes : The raster of frame, None if frame isn't in cache.
+        """
+        if key not in self.entries:
+            self.misses += 1
+            return None
+
+        path = self.get_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            # Removed by someone else
+            self.size -= self.entries.pop(key)
+            self.misses += 1
+            return None
+
+        # Mark as recently used, also on disk for next renders
+        self.entries.move_to_end(key)
+        os.utime(path)
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """Add a raster in cache and remove least recently used rasters if cache is full.
+
+        Args:
+            key  (str)        : The key of frame.
+            data (bytes-like) : The raster of frame.
+        """
+        if key in self.entries:
+            return
+
+        path = self.get_path(key)
+        directory = os.path.dirname(path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        # Write in temporary file to never have partial frame in cache
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(data)
+        os.replace(f"{path}.tmp", path)
+
+        size = os.path.getsize(path)
+        self.entries[key] = size
+        self.size += size
+        self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used rasters until cache size is under max size.
+        """
+        while self.size > self.max_size and self.entries:
+            key, size = self.entries.popitem(last=False)
+            self.size -= size
+            try:
+                os.remove(self.get_path(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        """
+        Remove all rasters of cache.
+        """
+        max_size, self.max_size = self.max_size, -1
+        self.evict()
+        self.max_size = max_size
+
+    # region Override
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __str__(self):
+        return f"FrameCache({self.path}, {len(self.entries)} frames, {self.size}/{self.max_size} bytes, " \
+               f"hits:{self.hits} misses:{self.misses})"
+    # endregion Override
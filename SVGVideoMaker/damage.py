@@ -0,0 +1,256 @@
+"""
+Incremental rasterization of frames.
+Only regions of frame where an element change since the previous frame are rasterized again,
+the rest of frame is copied from the previous raster.
+"""
+
+# region Imports
+from io import BytesIO
+from math import floor, ceil
+import cairocffi as cairo
+from cairosvg.parser import Tree
+from cairosvg.surface import PNGSurface
+from SVGVideoMaker.raster import FrameData, render_surface
+# endregion Imports
+
+# Regions are drawn with hooks of cairosvg surfaces, without them all frame is rasterized
+CLIPPED = callable(getattr(PNGSurface, "_create_surface", None)) and callable(getattr(PNGSurface, "draw", None))
+
+class DamagedFrame(FrameData):
+    """ A svg frame in string, with the regions who change since a previous frame.
+
+    Args:
+        svg         (str)  : The svg frame in string.
+        rects       (list) : The regions who change, list of (x, y, width, height) in px. None if all frame change.
+        frame_index (int)  : The index of this frame in the movie, frames who are the same have the same index.
+        base        (int)  : The index of frame where regions are compared.
+    """
+    def __init__(self, svg, rects=None, frame_index=0, base=None):
+        super().__init__(svg)
+        self.rects = rects
+        self.frame_index = frame_index
+        self.base = base
+
+class DamageTracker:
+    """ Find regions of frame who change between two frames, from the drawn quadrant of each element of svg.
+    Regions are in px, with the same view box mapping than the svg.
+
+    Args:
+        svg       (SVG)   : The svg of frames.
+        width     (int)   : Width of frames in px.
+        height    (int)   : Height of frames in px.
+        max_ratio (float) : Above this ratio of frame area who change, all frame is rasterized. Default 0.5.
+    """
+    def __init__(self, svg, width, height, max_ratio=0.5):
+        self.svg = svg
+        self.width = width
+        self.height = height
+        self.max_ratio = max_ratio
+
+        # Stroke can go further than quadrant of element, miter joins until twice the stroke width
+        stroke_widths = [el.style.stroke_width for el in svg if el.style and el.style.stroke_width]
+        self.stroke_width = max(stroke_widths, default=0)
+
+        self.frame = None
+        self.view_box = None
+        self.displays = []
+        self.quadrants = []
+        self.index = 0
+
+    def get_mapping(self, view_box):
+        """Get the mapping of view box on frame, like svg renderer with default preserveAspectRatio.
+
+        Args:
+            view_box (tuple) : The top left and the bottom right coordinates of view box.
+
+        Returns:
+            float, float, float : The scale, and the offset on X and Y axis in px.
+        """
+        (min_x, min_y), (max_x, max_y) = view_box
+        scale = min(self.width / (max_x - min_x), self.height / (max_y - min_y))
+        offset_x = (self.width - (max_x - min_x) * scale) / 2 - min_x * scale
+        offset_y = (self.height - (max_y - min_y) * scale) / 2 - min_y * scale
+        return scale, offset_x, offset_y
+
+    def track(self, frame):
+        """Compare the last frame computed by svg with the previous one.
+        Must be called just after get_svg of svg, with his result.
+
+        Args:
+            frame (str) : The svg frame in string.
+
+        Returns:
+            DamagedFrame : The frame with the regions who change.
+        """
+        if frame == self.frame:
+            # Held frame, nothing to rasterize
+            return DamagedFrame(frame, [], self.index, self.index)
+
+        view_box = tuple(tuple(coordinates) for coordinates in self.svg.get_view_box())
+        displays = list(self.svg.displays)
+        quadrants = [el.drawn_quadrant() for el in self.svg.group]
+
+        rects = None
+        if self.frame is not None and view_box == self.view_box and len(displays) == len(self.displays):
+            rects = self.get_rects(view_box, displays, quadrants)
+
+        base = self.index
+        self.index += 1
+        self.frame, self.view_box, self.displays, self.quadrants = frame, view_box, displays, quadrants
+        return DamagedFrame(frame, rects, self.index, base)
+
+    def get_rects(self, view_box, displays, quadrants):
+        """Get regions of elements who change, with their previous and their current quadrant.
+
+        Args:
+            view_box  (tuple) : The view box of frame.
+            displays  (list)  : The svg string of each element.
+            quadrants (list)  : The drawn quadrant of each element.
+
+        Returns:
+            list : The regions in px, None if too many regions change.
+        """
+        scale, offset_x, offset_y = self.get_mapping(view_box)
+        stroke_size = 3 / scale # Same as svg
+        margin = 2 * max(self.stroke_width, stroke_size) * scale + 2 # In px, with antialiasing
+
+        rects, area = [], 0
+        for display, previous_display, quadrant, previous_quadrant in \
+                zip(displays, self.displays, quadrants, self.quadrants):
+            if display == previous_display:
+                continue
+            for (min_x, min_y), (max_x, max_y) in (quadrant.get_arrays(), previous_quadrant.get_arrays()):
+                if min_x > max_x or min_y > max_y:
+                    # Empty quadrant
+                    continue
+                x = max(0, floor(min_x * scale + offset_x - margin))
+                y = max(0, floor(min_y * scale + offset_y - margin))
+                width = min(self.width, ceil(max_x * scale + offset_x + margin)) - x
+                height = min(self.height, ceil(max_y * scale + offset_y + margin)) - y
+                if width > 0 and height > 0:
+                    rects.append((x, y, width, height))
+                    area += width * height
+
+        if area > self.max_ratio * self.width * self.height:
+            return None
+        return rects
+
+class ClippedPNGSurface(PNGSurface):
+    """ A surface of cairosvg who start from a copy of a previous surface and draw only on some regions.
+    Override private methods of cairosvg surfaces, checked by CLIPPED.
+
+    Args:
+        tree     (Tree)               : The svg tree to draw.
+        previous (cairo.ImageSurface) : The previous surface, unchanged.
+        rects    (list)               : The regions to draw, list of (x, y, width, height) in px.
+                                        None to draw everywhere.
+        width    (int)                : Width of surface in px.
+        height   (int)                : Height of surface in px.
+    """
+    def __init__(self, tree, previous, rects, width, height):
+        self.previous = previous
+        self.rects = rects
+        super().__init__(tree, None, 96, output_width=width, output_height=height)
+
+    def _create_surface(self, width, height):
+        surface, width, height = super()._create_surface(width, height)
+        context = cairo.Context(surface)
+        context.set_source_surface(self.previous)
+        context.set_operator(cairo.OPERATOR_SOURCE)
+        context.paint()
+        return surface, width, height
+
+    def draw(self, node):
+        if self.rects is not None:
+            # First draw is the root of svg, restrict all drawing on regions
+            rects, self.rects = self.rects, None
+            matrix = self.context.get_matrix()
+            self.context.identity_matrix()
+            for rect in rects:
+                self.context.rectangle(*rect)
+            self.context.clip()
+            # Regions are drawn from scratch
+            self.context.set_operator(cairo.OPERATOR_CLEAR)
+            self.context.paint()
+            self.context.set_operator(cairo.OPERATOR_OVER)
+            self.context.set_matrix(matrix)
+        super().draw(node)
+
+class DamageRenderer:
+    """ Rasterize frames, only on regions who change since the previous frame rasterized.
+    Frames must be given in order, rasterization depend of the previous frame, so it's done on main process.
+    If cairosvg don't have the hooks of ClippedPNGSurface, all frames are rasterized.
+
+    Args:
+        width  (int)  : Width of frames in px.
+        height (int)  : Height of frames in px.
+        raw    (bool) : Give cairo surfaces instead of png. Default True.
+    """
+    def __init__(self, width, height, raw=True):
+        self.width = width
+        self.height = height
+        self.raw = raw
+        self.surface = None
+        self.index = None
+        self.damaged_pixels = 0
+        self.total_pixels = 0
+
+    def render(self, frame):
+        """Draw a frame, from the previous surface if regions of frame are given since it.
+
+        Args:
+            frame (str or DamagedFrame) : The svg frame in string.
+
+        Returns:
+            cairo.ImageSurface : The surface with frame draw on it.
+        """
+        damaged = isinstance(frame, DamagedFrame)
+        rects = frame.rects if damaged else None
+        if rects and not CLIPPED:
+            rects = None
+        self.total_pixels += self.width * self.height
+        if self.surface is None or rects is None or frame.base != self.index:
+            surface = render_surface(frame.svg if damaged else frame, self.width, self.height)
+            self.damaged_pixels += self.width * self.height
+        elif not rects:
+            surface = self.surface
+        else:
+            tree = Tree(bytestring=frame.svg.encode())
+            surface = ClippedPNGSurface(tree, self.surface, rects, self.width, self.height).cairo
+            surface.flush()
+            self.damaged_pixels += sum(width * height for _, _, width, height in rects)
+
+        self.surface = surface
+        self.index = frame.frame_index if damaged else None
+        return surface
+
+    def get_damaged_ratio(self):
+        """Get the ratio of pixels rasterized again on all pixels of frames.
+
+        Returns:
+            float : The ratio, between 0 and 1.
+        """
+        return self.damaged_pixels / self.total_pixels if self.total_pixels else 0.0
+
+    # region Override
+    def __call__(self, frame):
+        surface = self.render(frame)
+        if self.raw:
+            return surface
+        png = BytesIO()
+        surface.write_to_png(png)
+        return png.getvalue()
+    # endregion Override
+
+def track_damages(frames, tracker):
+    """Add regions who change to each frame of a movie.
+
+    Args:
+        frames  (iter)          : Iterable of frame number and svg frame, like make_movie.
+        tracker (DamageTracker) : The tracker of svg of frames.
+
+    Yields:
+        The frame number and the damaged frame.
+    """
+    for i, frame in frames:
+        yield i, tracker.track(frame)
@@ -0,0 +1,349 @@
+"""
+Necessary to encode frames with ffmpeg.
+Each video format have his encoding profile.
+Encoder manage the ffmpeg process, read his progress and detect when he stall or fail.
+"""
+
+# region Imports
+import re
+from enum import Enum
+from time import perf_counter
+from collections import deque
+from threading import Thread, Event
+from subprocess import Popen, PIPE, DEVNULL
+from SVGVideoMaker.raster import RAW_PIXEL_FORMAT
+# endregion Imports
+
+class Format(Enum):
+    """
+    Enumeration of different format (Picture, Video)
+    """
+    PNG = "png"
+    SVG = "svg"
+    SVGZ = "svgz"
+    MP4 = "mp4"
+    WEBM = "webm"
+    GIF = "gif"
+
+class EncodingProfile:
+    """ Options of ffmpeg to encode a video format.
+
+    Args:
+        codec           (str)  : The video codec of ffmpeg. Default None, ffmpeg choose.
+        preset          (str)  : The preset of codec, speed against compression. Default None.
+        crf             (int)  : The constant rate factor, lower is better quality. Default None.
+        threads         (int)  : Number of threads of encoder. Default None, ffmpeg choose.
+        pixel_format    (str)  : The pixel format of video. Default None, ffmpeg choose.
+        options         (list) : Others options of ffmpeg for output. Default None.
+        palette         (bool) : Compute a color palette before encoding, for gif. Default False.
+        palette_samples (int)  : Number of frames used to compute palette. Default 32.
+        preset_option   (str)  : The ffmpeg option to give preset. Default "-preset".
+    """
+    def __init__(self, codec=None, preset=None, crf=None, threads=None, pixel_format=None, options=None,
+                 palette=False, palette_samples=32, preset_option="-preset"):
+        self.codec = codec
+        self.preset = preset
+        self.crf = crf
+        self.threads = threads
+        self.pixel_format = pixel_format
+        self.options = list(options) if options else []
+        self.palette = palette
+        self.palette_samples = palette_samples
+        self.preset_option = preset_option
+
+    def copy(self, **changes):
+        """Copy the profile with some changes.
+
+        Args:
+            **changes : The attributes to change, like crf=18.
+
+        Returns:
+            EncodingProfile : The new profile.
+        """
+        attributes = dict(vars(self))
+        attributes.update(changes)
+        return EncodingProfile(**attributes)
+
+    def get_filters(self):
+        """Get video filters of options.
+
+        Returns:
+            list : The video filters of ffmpeg, like "pad=...".
+        """
+        return [value for option, value in zip(self.options, self.options[1:]) if option == "-vf"]
+
+    def get_options(self, palette=None, filters=True):
+        """Get options of ffmpeg, to put after input.
+
+        Args:
+            palette (str)  : The path of palette picture, used if profile need palette.
+            filters (bool) : Give video filters, False if they are in a filter graph. Default True.
+
+        Returns:
+            list : The options of ffmpeg.
+        """
+        options = []
+        if self.palette and palette:
+            options += ["-i", palette, "-lavfi", "[0:v][1:v] paletteuse"]
+        if self.codec:
+            options += ["-c:v", self.codec]
+        if self.preset:
+            options += [self.preset_option, self.preset]
+        if self.crf is not None:
+            options += ["-crf", f"{self.crf}"]
+        if self.threads:
+            options += ["-threads", f"{self.threads}"]
+        if self.pixel_format:
+            options += ["-pix_fmt", self.pixel_format]
+        if filters:
+            return options + self.options
+
+        others, i = [], 0
+        while i < len(self.options):
+            if self.options[i] == "-vf":
+                i += 2
+            else:
+                others.append(self.options[i])
+                i += 1
+        return options + others
+
+    # region Override
+    def __repr__(self):
+        return f"{self.__class__.__name__}({', '.join(f'{k}={v!r}' for k, v in vars(self).items())})"
+    # endregion Override
+
+PROFILES = {
+    # yuv420p need even size
+    Format.MP4: EncodingProfile(codec="libx264", preset="medium", crf=23, pixel_format="yuv420p",
+                                options=["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-movflags", "+faststart"]),
+    Format.WEBM: EncodingProfile(codec="libvpx-vp9", preset="good", crf=31, pixel_format="yuv420p",
+                                 options=["-b:v", "0", "-row-mt", "1"], preset_option="-deadline"),
+    Format.GIF: EncodingProfile(palette=True),
+}
+
+# Fastest encoding of each format, for draft videos
+DRAFT_PROFILES = {
+    Format.MP4: PROFILES[Format.MP4].copy(preset="ultrafast", crf=28),
+    Format.WEBM: PROFILES[Format.WEBM].copy(preset="realtime", options=["-b:v", "0", "-row-mt", "1",
+                                                                        "-cpu-used", "8"]),
+    Format.GIF: PROFILES[Format.GIF].copy(palette=False),
+}
+
+def get_profile(ext, draft=False):
+    """Get the default encoding profile of a format.
+
+    Args:
+        ext   (Format or str) : The format of video.
+        draft (bool)          : Get the fastest profile, for draft videos. Default False.
+
+    Returns:
+        EncodingProfile : A copy of profile, or a profile who let ffmpeg choose if format is unknown.
+    """
+    ext = ext.value if isinstance(ext, Format) else ext
+    for video_format, profile in (DRAFT_PROFILES if draft else PROFILES).items():
+        if video_format.value == ext:
+            return profile.copy()
+    return EncodingProfile()
+
+def get_input_options(width, height, fps, raw=False):
+    """Get options of ffmpeg to read frames from stdin.
+
+    Args:
+        width  (int)  : Width of frames in px.
+        height (int)  : Height of frames in px.
+        fps    (int)  : Number of frames per seconds.
+        raw    (bool) : Frames are raw pixels, otherwise png.
+
+    Returns:
+        list : The options of ffmpeg.
+    """
+    options = [
+        "-s", f"{width}x{height}",  # Size
+        "-r", f"{fps}",  # fps
+    ]
+    if raw:
+        # Input is directly the buffer of cairo surface
+        options += ["-f", "rawvideo", "-pix_fmt", RAW_PIXEL_FORMAT]
+    return options + ["-i", "-"]  # input come from a pipe like that "exec | ffmpeg"
+
+def get_concat_options(concat):
+    """Get options of ffmpeg to read frames from a concat file, who give the duration of each frame.
+
+    Args:
+        concat (str) : The path of concat file.
+
+    Returns:
+        list : The options of ffmpeg.
+    """
+    return ["-f", "concat", "-safe", "0", "-i", concat]
+
+class EncoderError(Exception):
+    """ Error of ffmpeg, with the last lines of his log.
+
+    Args:
+        message (str)  : The description of error.
+        log     (list) : The last lines of log of ffmpeg.
+    """
+    def __init__(self, message, log=()):
+        self.log = list(log)
+        super().__init__("\n".join([message, *self.log]))
+
+class Encoder:
+    """ A ffmpeg process, his stderr is read in a thread to never block him.
+    Progress of ffmpeg (frames encoded, fps, speed) is read from stderr and given to a callback,
+    with a stall if ffmpeg don't encode frames since 'stall_timeout' seconds while frames are waiting.
+    It's used like a file, frames are written on stdin of ffmpeg.
+
+    Args:
+        cmd           (list)     : The ffmpeg command, progress options are added.
+        stdin         (bool)     : Frames are written on stdin of ffmpeg. Default True.
+        callback      (callable) : Function called with the encoder at each progress or stall. Default None.
+        stall_timeout (float)    : Seconds without progress before ffmpeg is stalled. Default 30.
+        log_size      (int)      : Number of last lines of log kept. Default 50.
+    """
+    # Line of progress, like "frame=12"
+    PROGRESS_LINE = re.compile(r"^([\w.]+)=\s*(\S*)$")
+
+    def __init__(self, cmd, stdin=True, callback=None, stall_timeout=30, log_size=50):
+        # Without frames on stdin, ffmpeg must not read the terminal, where he wait commands like "q"
+        stdin_options = [] if stdin else ["-nostdin"]
+        self.cmd = [cmd[0], *stdin_options, "-nostats", "-progress", "pipe:2", *cmd[1:]]
+        self.callback = callback
+        self.stall_timeout = stall_timeout
+        self.log = deque(maxlen=log_size)
+
+        self.frames_written = 0
+        self.frames = 0
+        self.fps = 0.0
+        self.speed = None
+        self.stalled = False
+        self.last_progress = perf_counter()
+
+        self.process = Popen(self.cmd, stdin=PIPE if stdin else DEVNULL, stderr=PIPE)
+        self.done = Event()
+        self.reader = Thread(target=self.read, daemon=True)
+        self.reader.start()
+        self.monitor = None
+        if stall_timeout:
+            self.monitor = Thread(target=self.watch, daemon=True)
+            self.monitor.start()
+
+    def read(self):
+        """
+        Read stderr of ffmpeg until his end, keep last lines of log and update progress.
+        """
+        progress = {}
+        for line in self.process.stderr:
+            line = line.decode(errors="replace").rstrip()
+            match = Encoder.PROGRESS_LINE.match(line)
+            if match is None:
+                if line:
+                    self.log.append(line)
+                continue
+            key, value = match.groups()
+            progress[key] = value
+            if key == "progress":
+                # Last line of a block of progress
+                self.update(progress)
+                progress = {}
+
+    def update(self, progress):
+        """Update the progress of encoding.
+
+        Args:
+            progress (dict) : The values of a block of progress of ffmpeg.
+        """
+        frames = int(progress.get("frame", self.frames) or 0)
+        if frames != self.frames or not self.frames_written:
+            self.last_progress = perf_counter()
+            self.stalled = False
+        self.frames = frames
+        try:
+            self.fps = float(progress.get("fps", self.fps))
+            speed = progress.get("speed", "").rstrip("x")
+            self.speed = float(speed) if speed and speed != "N/A" else self.speed
+        except ValueError:
+            pass
+        if self.callback:
+            self.callback(self)
+
+    def watch(self):
+        """
+        Detect when ffmpeg don't encode frames while frames are waiting.
+        """
+        interval = min(1, self.stall_timeout)
+        while not self.done.wait(interval):
+            waiting = self.frames_written > self.frames
+            if waiting and not self.stalled and perf_counter() - self.last_progress > self.stall_timeout:
+                self.stalled = True
+                if self.callback:
+                    self.callback(self)
+
+    def check(self):
+        """
+        Fail if ffmpeg is already stopped.
+        """
+        code = self.process.poll()
+        if code is not None:
+            self.reader.join()
+            raise EncoderError(f"ffmpeg stopped with code {code}", self.log)
+
+    def write(self, data):
+        """Write a frame on stdin of ffmpeg.
+
+        Args:
+            data (bytes-like) : The frame.
+        """
+        try:
+            self.process.stdin.write(data)
+        except (BrokenPipeError, ValueError):
+            self.process.wait()
+            self.check()
+            raise
+        self.frames_written += 1
+
+    def close(self):
+        """
+        Wait the end of ffmpeg, fail if ffmpeg fail.
+        """
+        try:
+            if self.process.stdin:
+                self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        code = self.process.wait()
+        self.reader.join()
+        self.done.set()
+        if self.monitor:
+            self.monitor.join()
+        if code != 0:
+            raise EncoderError(f"ffmpeg failed with code {code}", self.log)
+
+    def kill(self):
+        """
+        Stop ffmpeg without wait the end of encoding.
+        """
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        try:
+            if self.process.stdin:
+                self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.done.set()
+
+    # region Override
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.kill()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.frames}/{self.frames_written} frames, {self.fps} fps, " \
+               f"speed {self.speed}{', stalled' if self.stalled else ''})"
+    # endregion Override
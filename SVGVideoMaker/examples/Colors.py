@@ -7,7 +7,12 @@ from SVGVideoMaker import Circle, Rectangle, Point2D, SVG, save
 # endregion Imports
 
 
-def main():
+def create_svg():
+	"""Create the scene of example.
+
+	Returns:
+		SVG : The svg of scene.
+	"""
 	# Global values
 	width, height = 500, 500
 
@@ -34,7 +39,11 @@ def main():
 	circle2.set_style(fill_color=f"url(#{id_g4})", stroke_width=0)
 
 	svg.append(rect1, rect2, circle1, circle2)
+	return svg
 
+
+def main():
+	svg = create_svg()
 	save(svg.get_svg(), path="./color", ext="png")
 
 
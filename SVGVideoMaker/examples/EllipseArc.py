@@ -44,7 +44,14 @@ def create_column(colum, sens):
 	svg.append(g)
 
 
-def main():
+def create_video():
+	"""Create the scene of example.
+
+	Returns:
+		Video : The video of scene.
+	"""
+	svg.group.clear()
+
 	# First and last column
 	create_column(10, 1)
 	create_column(100, -1)
@@ -75,12 +82,17 @@ def main():
 	svg.append(ellipse_top, ellipse_top_mid, ellipse_bottom, ellipse_bottom_mid,
 	           ellipse_center, ellipse_center_center)
 
-	for element in svg:
+	# Elements of svg, the opacity of columns is applied on their group and not on each arc
+	for element in svg.group:
 		element.add_opacity((seconds * 1) * fps, 1)
 		element.add_opacity((seconds * 2) * fps, 0)
 		element.add_opacity((seconds * 3) * fps, 1)
 
-	video = Video(svg, fps=fps, width=width*5, height=height*5)
+	return Video(svg, fps=fps, width=width*5, height=height*5)
+
+
+def main():
+	video = create_video()
 	print(svg.display_animations())
 	video.save_movie(name="ellipse_arc", end=seconds * 3 + 1, ext="gif")
 
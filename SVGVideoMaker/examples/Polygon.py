@@ -38,7 +38,14 @@ def create_column(colum, sens):
 			svg.append(squarre)
 
 
-def main():
+def create_video():
+	"""Create the scene of example.
+
+	Returns:
+		Video : The video of scene.
+	"""
+	svg.group.clear()
+
 	# First and last column
 	create_column(10, 1)
 	create_column(100, -1)
@@ -69,7 +76,11 @@ def main():
 
 	svg.append(p1, p2, p3)
 
-	video = Video(svg, fps=fps, width=width*5, height=height*5)
+	return Video(svg, fps=fps, width=width*5, height=height*5)
+
+
+def main():
+	video = create_video()
 	video.save_frame(seconds * fps, path="./", name="anim")
 	video.save_movie(name="polygon", end=seconds + 1, ext="gif")
 
@@ -1,11 +1,33 @@
 
 # region Imports
 from enum import Enum
-from copy import deepcopy
+from copy import copy
+from bisect import bisect_left
+from numbers import Number
+from collections import namedtuple
 from SVGVideoMaker.geo.debug import msg, DebugLevel
 # endregion Imports
 
 
+def freeze_value(value):
+    """Copy a value of key frame, so it isn't changed by a modification of the value given,
+    like the animation of a point used in a key frame.
+    Points are copied with their own coordinates, without copy their animation and their style.
+
+    Args:
+        value (AnimationData) : The value, a number, a point or a list of points.
+
+    Returns:
+        AnimationData : The copy of value.
+    """
+    if isinstance(value, (list, tuple)):
+        return [freeze_value(element) for element in value]
+    if hasattr(value, "coordinates"):
+        frozen = copy(value)
+        frozen.coordinates = list(value.coordinates)
+        return frozen
+    return value
+
 class AnimationType(Enum):
     """
     Enumeration of different type of animation.
@@ -17,22 +39,17 @@ class AnimationType(Enum):
     OPACITY = 5
     ANGLE_TRANSLATION = 6
 
-class AnimationState(Enum):
-    """
-    Enumeration of different state of animation.
-    """
-    NEW = 0
-    CURRENT = 1
-    END = 2
+# Segment of animation between two key frames, with the value of all segment and the value of each frame
+KeySegment = namedtuple("KeySegment", "start end value delta")
+# Segment of modification, with the points at start and at end who have the same number of points,
+# and if the shape of element is replaced by the start points at the begin of segment to have this number of points
+MorphSegment = namedtuple("MorphSegment", "start end previous next delta reshape")
 
 class Animation:
     """
     Animation
     """
 
-    # Define value for save/get current values of all types
-    KEY, VALUES = 0, 1
-
     def __init__(self, svg_element, id=None):
         """Animation for all types (Translation, Inflation, Reshape, Opacity)
 
@@ -48,22 +65,25 @@ class Animation:
         for anim_type in AnimationType:
             self.anims[anim_type] = dict() # Position of element with second in key
 
-        self.anim_computed = None
-
-        self.current_values = dict()
-        for anim_type in AnimationType:
-            self.current_values[anim_type] = (-1, None) # Initialization
+        # Segments between key frames of each type, computed by compile, with their last frames
+        self.compiled = None
+        self.ends = None
+        # Index of the segment of each type played
+        self.cursors = dict()
 
         self.nb_frames = 0
 
     def set_start(self, opacity):
         self.anims[AnimationType.OPACITY][0] = opacity # Add the init display for DISPLAY
+        self.compiled = None
 
     def init_animation(self):
-        self.anim_computed = deepcopy(self.anims)
+        if self.compiled is None:
+            self.compile()
+        self.cursors.clear()
 
     def finish_animation(self):
-        self.anim_computed = None # Clear element computed
+        self.compiled = None # Clear element computed
 
     def add_animation(self, frame, anim_type=AnimationType.TRANSLATION, **kwargs):
         """Add animation pn the good type and check if data is ok
@@ -81,9 +101,89 @@ class Animation:
             values = kwargs["value"]
 
         # Add data if is good
-        self.anims[anim_type][frame] = deepcopy(values) # To don't be affect about possible modification
+        self.anims[anim_type][frame] = freeze_value(values) # To don't be affect about possible modification
+        self.compiled = None
         self.nb_frames = max(frame, self.nb_frames)
 
+    # region Compilation
+    def compile(self):
+        """Check key frames and compute the segments between key frames of each type, before the animation.
+        All animations (update, state_at) read these segments, they are computed again only when key frames change.
+
+        Raises:
+            ValueError : If a value of key frame haven't the good type,
+                         or if a type who need a start value haven't key frame at frame 0.
+        """
+        compiled = {anim_type: tuple(self.compile_segments(anim_type)) for anim_type in AnimationType}
+        self.ends = {anim_type: [segment.end for segment in segments] for anim_type, segments in compiled.items()}
+        self.compiled = compiled
+
+    def compile_segments(self, anim_type):
+        """Compute the segments between key frames of a type.
+
+        Args:
+            anim_type (AnimationType) : The type of animation.
+
+        Returns:
+            list : The KeySegment sorted by frame.
+        """
+        if anim_type is AnimationType.MODIFICATION:
+            return []
+
+        # Opacity is absolute, value of segment is the difference between end and start values
+        sub = anim_type is AnimationType.OPACITY
+        segments = []
+        previous_value, previous_frame = None, 0
+        for key_frame, value in sorted(self.anims[anim_type].items(), key=lambda item: item[0]):
+            if not isinstance(value, Number) and not hasattr(value, "coordinates"):
+                raise ValueError(f"{self.get_name()} : value {value} of {anim_type.name} at frame {key_frame} "
+                                 f"isn't a number or a point")
+            if key_frame > previous_frame:
+                if sub and previous_value is None:
+                    raise ValueError(f"{self.get_name()} : {anim_type.name} need a key frame at frame 0")
+                total = value - previous_value if sub else value
+                segments.append(KeySegment(previous_frame, key_frame, total, total / (key_frame - previous_frame)))
+            previous_value, previous_frame = value, key_frame
+        return segments
+
+    def get_compiled(self, anim_type):
+        """Get the segments of a type, compile key frames if they changed.
+
+        Args:
+            anim_type (AnimationType) : The type of animation.
+
+        Returns:
+            tuple : The segments sorted by frame.
+        """
+        if self.compiled is None:
+            self.compile()
+        return self.compiled[anim_type]
+
+    def get_segment(self, anim_type, frame):
+        """Get the segment who animate a frame.
+        The search begin at the segment of previous call, because animation go forward.
+
+        Args:
+            anim_type (AnimationType) : The type of animation.
+            frame     (int)           : The frame number.
+
+        Returns:
+            KeySegment : The segment, None if the type don't change at this frame.
+        """
+        segments = self.get_compiled(anim_type)
+        if frame < 1:
+            return None # Nothings at begin
+        ends = self.ends[anim_type]
+        cursor = self.cursors.get(anim_type, 0)
+        if cursor >= len(ends) or ends[cursor] < frame or (cursor and ends[cursor - 1] >= frame):
+            cursor = bisect_left(ends, frame)
+            self.cursors[anim_type] = cursor
+        if cursor == len(ends):
+            return None # End of animation
+        segment = segments[cursor]
+        return segment if segment.start < frame else None
+    # endregion Compilation
+
     def update(self):
         """
         Update all animation, modification need to be in first.
@@ -95,49 +195,64 @@ class Animation:
         # Increment frame counter
         self.current_frame += 1
 
-    def read_animation(self, anim_type, force=False):
-        """Read the animation to compute and return the previous animation values with his key frame.
+    def update_generic(self, anim_type, apply):
+        segment = self.get_segment(anim_type, self.current_frame)
+        if segment is not None:
+            apply(segment.delta)
+
+    def get_segments(self, anim_type):
+        """Get all segments of animation between two key frames, sorted by frame.
 
         Args:
-            anim_type (AnimationType) : The type of animation to read (in AnimationType).
-            force     (bool)          : Oblige to search animation, if false can use element in save memory.
+            anim_type (AnimationType) : The type of animation.
 
         Returns:
-            AnimationState, (AnimationData, int), (AnimationData, int) :
-                The previous animation values with his key time and also the next animations values and his key time.
+            list : List of (start frame, end frame, value) for each segment.
         """
-        if self.current_frame == 0:
-            return AnimationState.END, (None, 0), (None, 0)  # Nothings at begin, it like if animation is finish
-
-        if self.current_frame > self.current_values[anim_type][Animation.KEY] or force:
-            # Search next animation data
-            previous_anim, previous_frame = None, 0
-            try:
-                for key_frame, animation in self.anim_computed[anim_type].items():
-                    # We pass the value
-                    if self.current_frame <= key_frame:
-                        return AnimationState.NEW, (previous_anim, previous_frame), (animation, key_frame)
-                    # Set previous element
-                    previous_anim = animation
-                    previous_frame = key_frame
-                else:
-                    # End of animation
-                    return AnimationState.END, (None, 0), (None, 0)
-            except StopIteration:
-                # No animation for this element
-                return AnimationState.END, (None, 0), (None, 0)
-        else:  # We have already the next animation data
-            return AnimationState.CURRENT, (None, None), (None, None)
-
-    def update_generic(self, anim_type, apply, sub=False):
-        # Read values of Animation type
-        state, (start_val, start_frame), (end_val, end_frame) = self.read_animation(anim_type)
-        if state is AnimationState.NEW:
-            # Compute addition and memoize for optimization
-            value = end_val - start_val if sub else end_val
-            self.current_values[anim_type] = (end_frame, value / (end_frame - start_frame))
-        if state is not AnimationState.END:
-            apply(self.current_values[anim_type][Animation.VALUES])
+        return [(segment.start, segment.end, segment.value) for segment in self.get_compiled(anim_type)]
+
+    def get_value_at(self, anim_type, frame):
+        """Get the sum of all values apply by animation from the begin to 'frame', computed from key frames.
+
+        Args:
+            anim_type (AnimationType) : The type of animation.
+            frame     (int)           : The frame number.
+
+        Returns:
+            AnimationData : The total value to apply, None if nothing to apply.
+        """
+        total = None
+        for start_frame, end_frame, value in self.get_segments(anim_type):
+            if frame <= start_frame:
+                break
+            part = value * ((min(frame, end_frame) - start_frame) / (end_frame - start_frame))
+            total = part if total is None else total + part
+        return total
+
+    def state_at(self, frame):
+        """Set the element at his state of 'frame', without play all previous frames.
+        After that, update continue the animation from 'frame'.
+
+        Args:
+            frame (int) : The frame number.
+        """
+        self.svg_el.reset()
+        self.apply_state(frame)
+        self.current_frame = frame + 1
+
+    def apply_state(self, frame):
+        """Apply on element all animations from the begin to 'frame'.
+
+        Args:
+            frame (int) : The frame number.
+        """
+        for anim_type, apply in ((AnimationType.TRANSLATION, self.svg_el.apply_translation),
+                                 (AnimationType.INFLATION, self.svg_el.apply_inflation),
+                                 (AnimationType.ROTATION, self.svg_el.apply_rotation),
+                                 (AnimationType.OPACITY, self.svg_el.apply_opacity)):
+            value = self.get_value_at(anim_type, frame)
+            if value is not None:
+                apply(value)
 
     def update_translation(self):
         self.update_generic(AnimationType.TRANSLATION, self.svg_el.apply_translation)
@@ -149,7 +264,7 @@ class Animation:
         self.update_generic(AnimationType.ROTATION, self.svg_el.apply_rotation)
 
     def update_opacity(self):
-        self.update_generic(AnimationType.OPACITY, self.svg_el.apply_opacity, sub=True)
+        self.update_generic(AnimationType.OPACITY, self.svg_el.apply_opacity)
 
     def reset(self):
         """
@@ -158,10 +273,11 @@ class Animation:
         # Reset frame counter
         self.current_frame = 0
         self.init_animation()
-        for anim_type in AnimationType:
-            self.current_values[anim_type] = (-1, None)
 
     # region Getters
+    def get_name(self):
+        return self.id if self.id else getattr(self.svg_el, "id", self.svg_el.__class__.__name__)
+
     def get_nb_frames(self):
         """Get the number of frames.
 
@@ -169,6 +285,14 @@ class Animation:
             int : The number of frames.
         """
         return self.nb_frames
+
+    def is_static(self):
+        """Get if the element never change, it have only the start values at frame 0.
+
+        Returns:
+            bool : True if the element never change, otherwise False.
+        """
+        return all(frame == 0 for anims in self.anims.values() for frame in anims)
     # endregion Getters
 
     def display_animations(self):
@@ -186,7 +310,7 @@ class Animation:
             nb_values = len(str(len(self.anims[anim_type].values())))
             have_element = False
 
-            for key, values in self.anims[anim_type].items():
+            for key, values in sorted(self.anims[anim_type].items(), key=lambda item: item[0]):
                 string += f"\t\t>Frame: {key:{nb_key}}, "
                 if anim_type is AnimationType.MODIFICATION and isinstance(values, list):
                     string += f'Size:{len(values):{nb_values}}, {" ".join(map(str, values))}\n'
@@ -216,39 +340,83 @@ class ModificationAnimation(Animation):
 
     def set_start(self, opacity, modifications_points):
         super().set_start(opacity)
-        self.anims[AnimationType.MODIFICATION][0] = modifications_points  # Add the init_point for MODIFICATION
+        self.anims[AnimationType.MODIFICATION][0] = freeze_value(modifications_points)  # Add the init_point for MODIFICATION
 
-    def update_modification(self):
-        state, (previous_val, start_frame), (next_val, end_frame) = self.read_animation(AnimationType.MODIFICATION)
-        if state is AnimationState.NEW:
-            if len(previous_val) != len(next_val):
-                msg(f"Not same size between key: {start_frame} and key: {end_frame} !", DebugLevel.VERBOSE)
+    def compile_segments(self, anim_type):
+        """Compute the segments between key frames of a type.
+        Override compile_segments of Animation, shapes of modification are reshaped to have the same number of points
+        between start and end.
 
-                # Simplify writing
-                anims = self.anim_computed[AnimationType.MODIFICATION]
+        Args:
+            anim_type (AnimationType) : The type of animation.
 
-                # Not same number of point, need to reshape element before add element
+        Returns:
+            list : The KeySegment or the MorphSegment of modification sorted by frame.
+        """
+        if anim_type is not AnimationType.MODIFICATION:
+            return super().compile_segments(anim_type)
+
+        segments = []
+        previous_val, previous_frame = None, 0
+        for key_frame, next_val in sorted(self.anims[anim_type].items(), key=lambda item: item[0]):
+            if not isinstance(next_val, (list, tuple)) or not all(hasattr(point, "coordinates") for point in next_val):
+                raise ValueError(f"{self.get_name()} : value of {anim_type.name} at frame {key_frame} "
+                                 f"isn't a list of points")
+            if key_frame > previous_frame:
+                if previous_val is None:
+                    raise ValueError(f"{self.get_name()} : {anim_type.name} need a key frame at frame 0")
+                # Need to apply the reshape at begin of segment, if we need more points to match with next values
+                reshape = len(previous_val) < len(next_val)
+                if len(previous_val) != len(next_val):
+                    msg(f"Not same size between key: {previous_frame} and key: {key_frame} !", DebugLevel.VERBOSE)
                 if len(previous_val) > len(next_val):
-                    # Don't need to apply reshape because we have more points than necessary
-                    anims[end_frame] = self.svg_el.reshape(next_val, previous_val)
-                else:
-                    # Need to apply the reshape because we need more points to match with next values
-                    anims[start_frame] = self.svg_el.reshape(previous_val, next_val, apply=True)
-
-                # Get new values who are reshape
-                _, (previous_val, start_frame), (next_val, end_frame) = \
-                    self.read_animation(AnimationType.MODIFICATION, force=True)
-
-            # Compute the difference between previous and next position
-            nb_frame_to_move = end_frame - start_frame
-            computed = [((n - p) / nb_frame_to_move) for n, p in zip(next_val, previous_val)]
-            # Save incrementation to add from start to end frame
-            self.current_values[AnimationType.MODIFICATION] = end_frame, computed
-            # Send the modification to add
-            self.svg_el.apply_modification(computed)
-        elif state is AnimationState.CURRENT:
-            # Send modification
-            self.svg_el.apply_modification(self.current_values[AnimationType.MODIFICATION][Animation.VALUES])
+                    next_val = self.svg_el.reshape(next_val, previous_val)
+                elif reshape:
+                    previous_val = self.svg_el.reshape(previous_val, next_val)
+
+                # Difference between previous and next position for each frame
+                nb_frame_to_move = key_frame - previous_frame
+                delta = [((n - p) / nb_frame_to_move) for n, p in zip(next_val, previous_val)]
+                segments.append(MorphSegment(previous_frame, key_frame, tuple(previous_val), tuple(next_val),
+                                             tuple(delta), reshape))
+            previous_val, previous_frame = next_val, key_frame
+        return segments
+
+    def update_modification(self):
+        segment = self.get_segment(AnimationType.MODIFICATION, self.current_frame)
+        if segment is None:
+            return
+        if segment.reshape and self.current_frame == max(segment.start, 0) + 1:
+            # Not same number of point, element take the reshaped start points
+            self.svg_el.apply_shape(list(segment.previous))
+        self.svg_el.apply_modification(segment.delta)
+
+    def get_modifications(self):
+        """Get all segments of modification, with shapes reshape to have the same number of points
+        between start and end, like during the animation.
+
+        Returns:
+            list : List of (start frame, end frame, start points, end points) for each segment.
+        """
+        return [(segment.start, segment.end, list(segment.previous), list(segment.next))
+                for segment in self.get_compiled(AnimationType.MODIFICATION)]
+
+    def apply_state(self, frame):
+        """Apply on element all animations from the begin to 'frame'.
+        Override apply_state of Animation
+
+        Args:
+            frame (int) : The frame number.
+        """
+        points = None
+        for start_frame, end_frame, previous_val, next_val in self.get_modifications():
+            if frame <= start_frame:
+                break
+            t = (min(frame, end_frame) - start_frame) / (end_frame - start_frame)
+            points = [p + (n - p) * t for p, n in zip(previous_val, next_val)]
+        if points is not None:
+            self.svg_el.apply_shape(points)
+        super().apply_state(frame)
 
     def update(self):
         """
@@ -271,6 +439,19 @@ class EllispePartAnimation(Animation):
     def update_angle_translation(self):
         self.update_generic(AnimationType.ANGLE_TRANSLATION, self.svg_el.apply_angle_translation)
 
+    def apply_state(self, frame):
+        """Apply on element all animations from the begin to 'frame'.
+        Override apply_state of Animation
+
+        Args:
+            frame (int) : The frame number.
+        """
+        super().apply_state(frame)
+        value = self.get_value_at(AnimationType.ANGLE_TRANSLATION, frame)
+        if value is not None:
+            self.svg_el.apply_angle_translation(value)
+
     def update(self):
-        super().update()
+        # Before update of Animation, who go to next frame
         self.update_angle_translation()
+        super().update()
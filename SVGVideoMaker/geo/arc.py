@@ -4,7 +4,7 @@ from math import pi, sin, cos
 
 from SVGVideoMaker.geo.animation import Animation, EllispePartAnimation, AnimationType
 from SVGVideoMaker.geo.quadrant import Quadrant
-from SVGVideoMaker.geo.debug import DEBUG_LEVEL, DebugLevel
+from SVGVideoMaker.geo.debug import DebugLevel, is_debug
 from SVGVideoMaker.geo.point import Point2D
 from SVGVideoMaker.geo.shape import Shape
 # endregion Imports
@@ -157,16 +157,19 @@ class EllipseArc(Shape):
 		self.animations.reset()
 		self.center_anim = self.center.copy()
 		self.radius_anim = self.radius.copy()
-		self.sa_anim = self.sa.copy()
-		self.ea_anim = self.ea.copy()
+		self.sa_anim = self.sa
+		self.ea_anim = self.ea
+		self.compute_angles()
 
 	def apply_inflation(self, value):
 		self.radius_anim += value
+		self.set_dirty()
 
 	def apply_angle_translation(self, angles):
 		self.sa_anim += angles
 		self.ea_anim += angles
 		self.compute_angles()
+		self.set_dirty()
 	# endregion Animation
 
 	# region SVG
@@ -217,7 +220,7 @@ class EllipseArc(Shape):
 
 		string = f'<path d="{arc}" {self.get_transform()} {self.get_styles()}></path>'
 
-		if DEBUG_LEVEL.value <= DebugLevel.VISUAL.value:
+		if is_debug(DebugLevel.VISUAL):
 			string += f"{self.center_anim.svg_content()} {self.start_point.svg_content()} {self.end_point.svg_content()}"
 
 		return string
@@ -15,13 +15,26 @@ class DebugLevel(Enum):
 
 
 DEBUG_LEVEL = DebugLevel.NO
+# Number of changes of debug level, the svg of shapes cached with an other level is computed again
+DEBUG_GENERATION = 0
 DEBUG_LENGTH = max([len(dbg_lvl.name) for dbg_lvl in DebugLevel])
 
 def msg(str, dbg_lvl):
-	if DEBUG_LEVEL.value <= dbg_lvl.value:
+	if is_debug(dbg_lvl):
 		print(f"{f'{dbg_lvl.name}'.ljust(DEBUG_LENGTH)} : {str}")
 
+def is_debug(dbg_lvl):
+	return DEBUG_LEVEL.value <= dbg_lvl.value
+
+def get_debug():
+	return DEBUG_LEVEL
+
+def get_debug_generation():
+	return DEBUG_GENERATION
+
 def set_debug(dbg_lvl):
-	global DEBUG_LEVEL
-	DEBUG_LEVEL = dbg_lvl
+	global DEBUG_LEVEL, DEBUG_GENERATION
+	if dbg_lvl != DEBUG_LEVEL:
+		DEBUG_LEVEL = dbg_lvl
+		DEBUG_GENERATION += 1
 
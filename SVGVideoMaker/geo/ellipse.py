@@ -60,10 +60,12 @@ class Ellipse(Shape):
     def apply_translation(self, value):
         for i, v in enumerate(value.coordinates):
             self.coordinates[i] += v
+        self.set_dirty()
 
     def apply_inflation(self, value):
         self.rx += value
         self.ry += value
+        self.set_dirty()
 
     def reset(self):
         super().reset()
@@ -1,8 +1,9 @@
 
 # region Imports
-from SVGVideoMaker.geo.animation import AnimationType
+from SVGVideoMaker.geo.animation import AnimationType, Animation
 from SVGVideoMaker.geo.quadrant import Quadrant
 from SVGVideoMaker.geo.style import Style
+from SVGVideoMaker.geo.debug import get_debug_generation
 # endregion Imports
 
 class Group:
@@ -14,7 +15,23 @@ class Group:
         self.animations = self # Opaque structure to let user apply modification of animation on all a group.
         self.translation = [0, 0]
         self.rotation = 0
+        self.start_translation = [0, 0] # Transform before any animation
+        self.start_rotation = 0
+        self.scale = [1, 1]
+        self.center = None # Center of rotation and scale, from elements at start of animation
         self.style = Style(opacity=1)
+        # Animation of group itself, key frames are stored once and applied on the <g> of group
+        self.animation = Animation(self)
+        self.animation.set_start(self.style.opacity)
+        self.groups = () # Groups who contain this group
+        # Svg and quadrants of elements of last frame, cleared when an element change
+        self.cache_content = None
+        self.cache_quadrant = None
+        self.cache_drawn = None
+        # Svg of group of last frame, reused if the group and its elements don't changed
+        self.cache_head = None
+        self.cache_svg = None
+        self.cache_generation = None # Generation of debug level of the svg cached
 
     def append(self, *elements):
         """Append all elements in svg.
@@ -23,27 +40,48 @@ class Group:
             *elements (list) : A list of all elements to add.
         """
         for element in elements:
-            if isinstance(element, list) or isinstance(element, tuple):
-                for el in element:
-                    self.group.append(el)
-            else:
-                self.group.append(element)
+            for el in (element if isinstance(element, (list, tuple)) else (element,)):
+                self.group.append(el)
+                el.groups += (self,)
+        self.center = None
+        self.set_changed()
 
     def init_animation(self):
+        self.animation.init_animation()
         for el in self.group:
             if el.animations:
                 el.animations.init_animation()
+        self.init_center()
 
-    def add_animation(self, frame, anim_type=AnimationType.TRANSLATION, x=None, y=None, value=None):
-        if anim_type == AnimationType.MODIFICATION:
-            raise Exception("Group can't have modification animation")
+    def compile(self):
+        """Check key frames and compute the segments of animations of all elements, before the animation.
+        Segments are used by all next animations, until key frames of an element change.
 
+        Raises:
+            ValueError : If key frames of an element aren't valid.
+        """
         for el in self.group:
             if el.animations:
-                if value:
-                    el.animations.add_animation(frame, anim_type, value=value)
-                elif x and y:
-                    el.animations.add_animation(frame, anim_type, x=x, y=y)
+                el.animations.compile()
+        self.animation.compile()
+
+    def add_animation(self, frame, anim_type=AnimationType.TRANSLATION, x=None, y=None, value=None):
+        """Add animation on group at frame, applied once on the <g> of group and not on each element.
+
+        Args:
+            frame     (int)          : The frame number.
+            anim_type (AnimationType): The type of animation to add.
+            x         (float)        : The value on X axis, for translation and inflation.
+            y         (float)        : The value on Y axis, for translation and inflation.
+            value     (float)        : The value, for rotation and opacity.
+        """
+        if anim_type in (AnimationType.MODIFICATION, AnimationType.ANGLE_TRANSLATION):
+            raise Exception(f"Group can't have {anim_type.name.lower()} animation")
+
+        if value is not None:
+            self.animation.add_animation(frame, anim_type, value=value)
+        else:
+            self.animation.add_animation(frame, anim_type, x=x, y=y)
 
     def set_style(self, fill_color=None, stroke_color=None, stroke_width=None, stroke_linecaps=None,
                   stroke_dasharray=None, opacity=None, others_rules=None, custom=True):
@@ -62,6 +100,7 @@ class Group:
         self.style.set(fill_color, stroke_color, stroke_width, stroke_linecaps, stroke_dasharray, opacity, custom)
         if others_rules:
             self.style.add_other_rules(others_rules)
+        self.notify_groups()
 
     def add_other_rule(self, rules):
         """Add new rules at previous others rules.
@@ -72,6 +111,14 @@ class Group:
 		"""
         if self.style:
             self.style.add_other_rules(rules)
+            self.notify_groups()
+
+    def set_start_transform(self):
+        """
+        Keep the current translation and rotation as transform of group before any animation.
+        """
+        self.start_translation = list(self.translation)
+        self.start_rotation = self.rotation
 
     def is_style(self):
         return self.style.custom if self.style else False
@@ -84,109 +131,180 @@ class Group:
 		"""
         translation = " ".join([str(el) for el in self.translation])
         string = f'transform="translate({translation})'
-        # TODO Not supported yet need to have center rotation
-        # if self.rotation != 0:
-        #     center_pt = "{} {}".format(*self.get_center())
-        #     string += f" rotate({self.rotation} {center_pt})"
+        if self.rotation != 0:
+            center_pt = "{} {}".format(*self.get_center())
+            string += f" rotate({self.rotation} {center_pt})"
+        if self.scale != [1, 1]:
+            # Scale around center
+            center_x, center_y = self.get_center()
+            string += f" translate({center_x} {center_y}) scale({self.scale[0]} {self.scale[1]})" \
+                      f" translate({-center_x} {-center_y})"
 
         return string + '"'
 
+    def get_center(self):
+        """Return the center of rotation and inflation of group, the center of its elements at start of animation.
+
+        Returns:
+            list: The center of group.
+        """
+        if self.center is None:
+            (min_x, min_y), (max_x, max_y) = self.content_quadrant().get_arrays()
+            self.center = [(min_x + max_x) / 2, (min_y + max_y) / 2] if min_x <= max_x else [0, 0]
+        return self.center
+
+    def init_center(self):
+        """
+        Compute the center of group before elements move, only if the group rotate or inflate.
+        """
+        self.center = None
+        if self.animation.anims[AnimationType.ROTATION] or self.animation.anims[AnimationType.INFLATION]:
+            self.get_center()
+
     def get_nb_frames(self):
-        nb_frames = -1
+        nb_frames = -1 if self.animation.is_static() else self.animation.get_nb_frames()
         for el in self.group:
             nb_frames = max(nb_frames, el.animations.get_nb_frames())
         return nb_frames
 
+    def is_static(self):
+        """Get if all elements of group never change.
+
+        Returns:
+            bool : True if all elements never change, otherwise False.
+        """
+        return self.animation.is_static() and \
+               all(el.animations is None or el.animations.is_static() for el in self.group)
+
     def get_keys_animations(self):
         """
         Get string of all key animations of all svg element in svg.
         """
-        return "\n".join([el.animations.display_animations() for el in self.group if el.animations])
+        return self.display_animations()
 
     def display_animations(self):
         """
         Get string of all key animations of all svg element in svg.
         """
-        return "\n".join([el.animations.display_animations() for el in self.group if el.animations])
+        animations = [] if self.animation.is_static() else [self.animation.display_animations()]
+        animations += [el.animations.display_animations() for el in self.group if el.animations]
+        return "\n".join(animations)
 
     def update(self):
+        self.animation.update()
         for el in self.group:
             if el.animations:
                 el.animations.update()
 
+    def state_at(self, frame):
+        """Set all elements at their state of 'frame', directly from key frames without play previous frames.
+        After that, update continue the animation from 'frame'.
+
+        Args:
+            frame (int) : The frame number.
+        """
+        self.animation.state_at(frame) # Reset group and its elements
+        self.init_center()
+        for el in self.group:
+            if el.animations:
+                el.animations.state_at(frame)
+
     def add_translation(self, frame, x, y=None):
-        """Add translation animation on shape at frame.
+        """Add translation animation on group at frame.
 
 		Args:
 			frame (int): The frame.
 			x     (int): The translation on X axis.
 			y     (int): The translation on Y axis.
 		"""
-        for el in self.group:
-            if el.animations:
-                el.add_rotate(frame, x=x, y=y)
+        self.add_animation(frame, AnimationType.TRANSLATION, x=x, y=y)
 
     def add_rotate(self, frame, value):
-        """Add rotation animation on shape at frame.
+        """Add rotation animation on group at frame, around the center of its elements.
 
 		Args:
 			frame (int): The frame.
 			value (float): The rotation in degrees.
 		"""
-        for el in self.group:
-            if el.animations:
-                el.add_rotate(frame, value=value)
+        self.add_animation(frame, AnimationType.ROTATION, value=value)
 
     def add_opacity(self, frame, value):
-        """Add opacity animation on shape at frame.
+        """Add opacity animation on group at frame.
 
 		Args:
 			frame (int): The frame.
 			value (float): The percent of opacity. Between 0 and 1.
 		"""
-        for el in self.group:
-            if el.animations:
-                el.add_opacity(frame, value)
+        self.add_animation(frame, AnimationType.OPACITY, value=value)
 
     def add_inflation(self, frame, x, y=None):
-        """Add translation animation on shape at frame.
+        """Add inflation animation on group at frame, added to the scale of group who is 1 at start.
 
 		Args:
 			frame (int): The frame.
 			x     (int): The inflation on X axis.
 			y     (int): The inflation on Y axis.
 		"""
-        for el in self.group:
-            if el.animations:
-                el.add_inflation(frame, x, y)
+        y = x if y is None else y
+        self.add_animation(frame, AnimationType.INFLATION, x=x, y=y)
 
     def apply_translation(self, value):
-        for el in self.group:
-            if el.animations:
-                el.animations.apply_translation(value)
+        self.translation = [v + old for v, old in zip(value, self.translation)]
+        self.notify_groups()
 
     def apply_inflation(self, value):
-        for el in self.group:
-            if el.animations:
-                el.animations.apply_inflation(value)
+        self.scale = [v + old for v, old in zip(value, self.scale)]
+        self.notify_groups()
 
     def apply_opacity(self, value):
-        for el in self.group:
-            if el.animations:
-                el.animations.apply_opacity(value)
+        if self.style:
+            self.style.opacity = round(self.style.opacity + value, 3)
+            self.notify_groups()
 
-    def apply_rotate(self, value):
-        # TODO Change center
-        for el in self.group:
-            if el.animations:
-                el.animations.apply_rotate(value)
+    def apply_rotation(self, value):
+        self.rotation += value
+        self.notify_groups()
 
     def reset(self):
         for el in self.group:
             if el.animations:
                 el.reset()
+        self.translation = list(self.start_translation)
+        self.rotation = self.start_rotation
+        self.scale = [1, 1]
+        self.center = None
+        if self.style:
+            self.style.reset()
+        self.animation.reset()
+        self.notify_groups()
 
     # region SVG
+    def set_dirty(self):
+        """
+        Mark all elements as changed, their svg and their quadrants are computed again at next frame.
+        """
+        for element in self.group:
+            element.set_dirty()
+        self.set_changed()
+
+    def set_changed(self):
+        """
+        Clear the svg and the quadrants of elements of last frame, called when an element change.
+        Nothing is done if they are already cleared, groups who contain this group are already cleared too.
+        """
+        if self.cache_content is None and self.cache_quadrant is None and self.cache_drawn is None \
+                and self.cache_svg is None:
+            return
+        self.cache_content = self.cache_quadrant = self.cache_drawn = self.cache_svg = None
+        self.notify_groups()
+
+    def notify_groups(self):
+        """
+        Tell groups who contain this group that it changed.
+        """
+        for group in self.groups:
+            group.set_changed()
+
     def bounding_quadrant(self):
         """Return a quadrant who contain the shape.
 
@@ -195,9 +313,46 @@ class Group:
         """
         quadrant = Quadrant.empty_quadrant(2)
         for element in self.group:
-            quadrant.update(element.bounding_quadrant())
+            quadrant.update(element.get_quadrant())
         return quadrant
 
+    def get_quadrant(self):
+        """Return a quadrant who contain the shape, computed again only if an element changed.
+        The quadrant is shared between frames, it must not be modified.
+
+        Returns:
+        	Quadrant: The quadrant who contain the shape.
+        """
+        if self.cache_quadrant is None:
+            self.cache_quadrant = self.bounding_quadrant()
+        return self.cache_quadrant
+
+    def content_quadrant(self):
+        """Return a quadrant who contain the elements like they're drawn, without transform of group.
+        Computed again only if an element changed, the quadrant must not be modified.
+
+        Returns:
+        	Quadrant: The quadrant who contain the drawn elements.
+        """
+        if self.cache_drawn is None:
+            self.cache_drawn = Quadrant.empty_quadrant(2)
+            for element in self.group:
+                self.cache_drawn.update(element.drawn_quadrant())
+        return self.cache_drawn
+
+    def drawn_quadrant(self):
+        """Return a quadrant who contain the shape like it's drawn, with transform of each element and of group.
+
+        Returns:
+        	Quadrant: The quadrant who contain the drawn shape.
+        """
+        quadrant = self.content_quadrant()
+        if self.rotation == 0 and not any(self.translation) and self.scale == [1, 1]:
+            return quadrant
+
+        # Same transform than get_transform
+        return quadrant.transform(self.get_center(), self.rotation, self.translation, self.scale)
+
     def get_svg(self):
         """Return a string who describe shape only if it's visible.
 
@@ -206,17 +361,33 @@ class Group:
         """
         return self.svg_content()
 
+    def get_content(self):
+        """Return a string who describe the shape, with the svg of elements who don't changed.
+
+        Returns:
+            str: The string who describe the shape.
+        """
+        return self.svg_content()
+
     def svg_content(self):
         """Return a string who describe the shape.
+        Svg of elements is computed again only if an element changed,
+        and the svg of last frame is reused if the group, its elements and the debug level don't changed.
 
         Returns:
             str: The string who describe the shape.
         """
-        string = f"<g {self.get_transform()} {self.style.get_styles()}>"
-        for el in self.group:
-            string += el.svg_content() + "\n"
-        string += "</g>"
-        return string
+        generation = get_debug_generation()
+        if self.cache_generation != generation:
+            self.cache_content = self.cache_svg = None
+            self.cache_generation = generation
+        head = f"<g {self.get_transform()} {self.style.get_styles()}>"
+        if self.cache_svg is None or head != self.cache_head:
+            if self.cache_content is None:
+                self.cache_content = "".join(el.get_content() + "\n" for el in self.group)
+            self.cache_head = head
+            self.cache_svg = head + self.cache_content + "</g>"
+        return self.cache_svg
     # endregion SVG
 
     # region Override
@@ -9,7 +9,7 @@ from SVGVideoMaker.geo.quadrant import Quadrant
 from SVGVideoMaker.geo.shape import Shape
 from SVGVideoMaker.geo.animation import ModificationAnimation, AnimationType
 from SVGVideoMaker.geo.utility import nearest_point, dont_match, couples
-from SVGVideoMaker.geo.debug import msg, DebugLevel, DEBUG_LEVEL
+from SVGVideoMaker.geo.debug import msg, DebugLevel, is_debug
 # endregion Imports
 
 class Polygon(Shape):
@@ -126,10 +126,12 @@ class Polygon(Shape):
     def apply_modification(self, values):
         for i in range(len(self.points)):
             self.points[i] += values[i]
+        self.set_dirty()
 
     def apply_inflation(self, value):
         for i in range(len(self.points)):
             self.points[i] *= value
+        self.set_dirty()
     # endregion Animation
 
     # region Shape
@@ -203,11 +205,13 @@ class Polygon(Shape):
             # by utilisation of return
             msg("Apply reshape", DebugLevel.VERBOSE)
             self.points = list(matched)
+            self.set_dirty()
 
         return matched
 
     def apply_shape(self, shape):
         self.points = shape
+        self.set_dirty()
 
     def reset(self):
         super().reset()
@@ -252,7 +256,7 @@ class Polygon(Shape):
             x_text, y_text = self.points[0].coordinates
             string += f'<text x="{x_text}" y="{y_text}">{self.id}</text>\n'
 
-        if DEBUG_LEVEL.value <= DebugLevel.VISUAL.value:
+        if is_debug(DebugLevel.VISUAL):
             string += "\n".join([p.svg_content() for p in self.points]) + "\n"
 
         return string
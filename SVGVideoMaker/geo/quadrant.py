@@ -2,6 +2,10 @@
 Quadrants are rectangular boxes delimiting a set of items.
 """
 
+# region Imports
+from math import radians, cos, sin
+# endregion Imports
+
 class Quadrant:
     """
     enclosing rectangles.
@@ -126,6 +130,30 @@ class Quadrant:
         """
         return self.min_coordinates, self.max_coordinates
 
+    def transform(self, center, rotation=0, translation=(0, 0), scale=(1, 1)):
+        """Get the quadrant who contain this quadrant after a svg transform,
+        scale and rotation around center then translation.
+
+        Args:
+            center      (list)  : The center of rotation and scale.
+            rotation    (float) : The rotation in degrees. Default 0.
+            translation (list)  : The translation. Default (0, 0).
+            scale       (list)  : The scale on each axis. Default (1, 1).
+
+        Returns:
+            Quadrant : The quadrant who contain the transformed quadrant.
+        """
+        center_x, center_y = center
+        angle = radians(rotation)
+        (min_x, min_y), (max_x, max_y) = self.get_arrays()
+        transformed = Quadrant.empty_quadrant(2)
+        for x, y in ((min_x, min_y), (max_x, min_y), (max_x, max_y), (min_x, max_y)):
+            x, y = (x - center_x) * scale[0], (y - center_y) * scale[1]
+            corner = (center_x + x * cos(angle) - y * sin(angle) + translation[0],
+                      center_y + x * sin(angle) + y * cos(angle) + translation[1])
+            transformed.update(Quadrant(corner, corner))
+        return transformed
+
     # region Override
     def __repr__(self):
         return f"{str(self)}\n"
@@ -66,9 +66,11 @@ class Segment(Shape):
     def apply_translation(self, value):
         for i in range(len(self.anim_points)):
             self.anim_points[i] += value
+        self.set_dirty()
 
     def apply_inflation(self, value):
         self.anim_points[-1] += value
+        self.set_dirty()
     # endregion Animation
 
     # region SVG
@@ -0,0 +1,470 @@
+"""
+Compact binary file of a svg, to save a scene once it's created and load it quickly, or send it to other processes.
+The format is columnar, a json header describe elements by type of shape, with their ids, the index of their
+style in a table of styles shared by all elements, and columns of coordinates, transforms and key frames.
+All numbers of columns are in one block of float64 after the header, read in place from a memory mapped file.
+"""
+
+# region Imports
+import gc
+import sys
+import json
+import struct
+from array import array
+from mmap import mmap, ACCESS_READ
+from SVGVideoMaker.geo.svg import SVG
+from SVGVideoMaker.geo.group import Group
+from SVGVideoMaker.geo.style import Style
+from SVGVideoMaker.geo.gradient import Gradient
+from SVGVideoMaker.geo.ellipse import Ellipse, Circle
+from SVGVideoMaker.geo.point import Point, Point2D
+from SVGVideoMaker.geo.polygon import Polygon
+from SVGVideoMaker.geo.rectangle import Rectangle, Square
+from SVGVideoMaker.geo.segment import Segment
+from SVGVideoMaker.geo.arc import EllipseArc
+from SVGVideoMaker.geo.animation import AnimationType
+# endregion Imports
+
+MAGIC = b"SVGVMSCN"
+VERSION = 2
+# Extension of scene files
+SCENE_EXT = "svgscene"
+
+# Kind of values of key frames
+NUMBER, POINT, POINTS = "n", "p", "l"
+
+def get_point(x, y):
+    # Points of coordinates and key frames are values, they don't need animation and style
+    return Point2D(x, y, animation=False, style=False)
+
+def flatten(points):
+    return [coordinate for point in points for coordinate in point.coordinates]
+
+def get_points(numbers):
+    return [get_point(x, y) for x, y in zip(numbers[::2], numbers[1::2])]
+
+# region Columns
+class Column:
+    """ A property of all elements of a type of shape, each element have a run of numbers.
+    Integers of each run are marked, 1 if all numbers are integers, 0 if none, else their indexes in run,
+    so numbers keep their type and the svg of scene loaded is the same.
+    """
+    def __init__(self):
+        self.numbers = []
+        self.sizes = []
+        self.ints = []
+
+    def add(self, numbers):
+        """Add the run of numbers of an element.
+
+        Args:
+            numbers (list) : The numbers.
+        """
+        self.numbers += numbers
+        self.sizes.append(len(numbers))
+        ints = [i for i, number in enumerate(numbers) if isinstance(number, int)]
+        self.ints.append(int(bool(ints)) if len(ints) in (0, len(numbers)) else ints)
+
+    def save(self, block):
+        """Append numbers to the block of file.
+
+        Args:
+            block (array) : The float64 block of file.
+
+        Returns:
+            dict : The description of column for header.
+        """
+        offset = len(block)
+        block.extend(self.numbers)
+        return {"offset": offset, "sizes": self.sizes, "ints": self.ints}
+
+def read_column(block, column):
+    """Read all runs of a column.
+
+    Args:
+        block  (memoryview or array) : The float64 block of file.
+        column (dict)                : The description of column in header.
+
+    Returns:
+        list : The list of numbers of each element.
+    """
+    start = column["offset"]
+    numbers = block[start:start + sum(column["sizes"])].tolist()
+    runs, i = [], 0
+    for size, ints in zip(column["sizes"], column["ints"]):
+        run = numbers[i:i + size]
+        if ints == 1:
+            run = [int(number) for number in run]
+        elif ints:
+            for j in ints:
+                run[j] = int(run[j])
+        runs.append(run)
+        i += size
+    return runs
+# endregion Columns
+
+# region Shapes
+def write_transform(element, columns):
+    # Transform before any animation, given by parser for the transform attribute of svg elements
+    if isinstance(element, Group):
+        columns["transform"].add([*element.start_translation, element.start_rotation])
+    else:
+        columns["transform"].add([*element.translation, element.rotation])
+
+def read_transform(element, columns, i):
+    x, y, rotation = columns["transform"][i]
+    element.translation, element.rotation = [x, y], rotation
+    if isinstance(element, Group):
+        element.set_start_transform()
+
+def write_polygon(element, columns):
+    columns["points"].add(flatten(element.start_points))
+    columns["display_id"].add([int(element.display_id)])
+    if isinstance(element, Rectangle):
+        columns["size"].add([element.width, element.height])
+
+def read_polygon(cls, columns, i, id, animation):
+    polygon = cls.__new__(cls)
+    Polygon.__init__(polygon, get_points(columns["points"][i]), id=id, animation=animation, style=False)
+    polygon.display_id = bool(columns["display_id"][i][0])
+    if "size" in columns:
+        polygon.width, polygon.height = columns["size"][i]
+    return polygon
+
+def write_ellipse(element, columns):
+    columns["center"].add(list(element.start_coordinates))
+    columns["radius"].add([element.rx, element.ry])
+
+def read_ellipse(cls, columns, i, id, animation):
+    ellipse = cls.__new__(cls)
+    rx, ry = columns["radius"][i]
+    Ellipse.__init__(ellipse, columns["center"][i], rx, ry, id=id, animation=animation, style=False)
+    if isinstance(ellipse, Point2D):
+        ellipse.x, ellipse.y = columns["center"][i]
+    return ellipse
+
+def write_segment(element, columns):
+    columns["endpoints"].add(flatten(element.endpoints))
+
+def read_segment(cls, columns, i, id, animation):
+    start, end = get_points(columns["endpoints"][i])
+    return Segment(start, end, id=id, animation=animation, style=False)
+
+def write_ellipse_arc(element, columns):
+    columns["center"].add(list(element.center.coordinates))
+    columns["radius"].add(list(element.radius.coordinates))
+    columns["angles"].add([element.sa, element.ea])
+    columns["options"].add([element.rot_x, element.invert])
+
+def read_ellipse_arc(cls, columns, i, id, animation):
+    center, radius = get_points(columns["center"][i] + columns["radius"][i])
+    start_angle, end_angle = columns["angles"][i]
+    arc = EllipseArc(center, radius, start_angle, end_angle, id=id, animation=animation, style=False)
+    arc.rot_x, arc.invert = columns["options"][i]
+    return arc
+
+# For each type of shape who can be saved, its class, its columns and the functions to write and read them
+SHAPES = {
+    "Polygon": (Polygon, ("points", "display_id"), write_polygon, read_polygon),
+    "Rectangle": (Rectangle, ("points", "display_id", "size"), write_polygon, read_polygon),
+    "Square": (Square, ("points", "display_id", "size"), write_polygon, read_polygon),
+    "Ellipse": (Ellipse, ("center", "radius"), write_ellipse, read_ellipse),
+    "Circle": (Circle, ("center", "radius"), write_ellipse, read_ellipse),
+    "Point": (Point, ("center", "radius"), write_ellipse, read_ellipse),
+    "Point2D": (Point2D, ("center", "radius"), write_ellipse, read_ellipse),
+    "Segment": (Segment, ("endpoints",), write_segment, read_segment),
+    "EllipseArc": (EllipseArc, ("center", "radius", "angles", "options"), write_ellipse_arc, read_ellipse_arc),
+}
+# endregion Shapes
+
+# region Key frames
+def encode_value(value):
+    """Get the numbers of a value of key frame.
+
+    Args:
+        value (AnimationData) : The value, a number, a point or a list of points.
+
+    Returns:
+        str, list : The kind of value and its numbers.
+    """
+    if isinstance(value, (int, float)):
+        return NUMBER, [value]
+    if isinstance(value, (list, tuple)):
+        return POINTS, flatten(value)
+    if hasattr(value, "coordinates"):
+        return POINT, list(value.coordinates)
+    raise ValueError(f"Value {value} of key frame can't be saved")
+
+def decode_value(kind, numbers):
+    if kind == NUMBER:
+        return numbers[0]
+    if kind == POINT:
+        return get_point(*numbers)
+    return get_points(numbers)
+# endregion Key frames
+
+class SceneWriter:
+    """ Split elements of a svg by type of shape, in tables of columns.
+    """
+    def __init__(self):
+        self.styles = []
+        self.style_indexes = {}
+        self.tables = {}
+
+    def add_style(self, style):
+        """Add a style to the table of styles, if no element have the same.
+
+        Args:
+            style (Style) : The style of an element, can be None.
+
+        Returns:
+            int : The index of style, -1 for no style.
+        """
+        if style is None:
+            return -1
+        # Start values, the svg is saved like before any animation
+        params = [style.fill_color, style.stroke_dasharray, style.stroke_color, style.stroke_width,
+                  style.stroke_linecaps, style.start_opacity, list(style.others_rules), style.custom]
+        key = json.dumps(params)
+        if key not in self.style_indexes:
+            self.style_indexes[key] = len(self.styles)
+            self.styles.append(params)
+        return self.style_indexes[key]
+
+    def get_table(self, name):
+        if name not in self.tables:
+            columns = SHAPES[name][1] if name in SHAPES else ()
+            self.tables[name] = {
+                "ids": [], "styles": [], "animated": [],
+                "columns": {column: Column() for column in ("transform", *columns)},
+                "keys": {"shapes": [], "types": [], "frames": [], "kinds": [], "values": Column()}
+            }
+        return self.tables[name]
+
+    def add_keys(self, table, index, animations):
+        keys = table["keys"]
+        for anim_type, anims in animations.anims.items():
+            # Key frames keep their order, animation read them in order of insertion
+            for frame, value in anims.items():
+                kind, numbers = encode_value(value)
+                keys["shapes"].append(index)
+                keys["types"].append(anim_type.name)
+                keys["frames"].append(frame)
+                keys["kinds"].append(kind)
+                keys["values"].add(numbers)
+
+    def add_element(self, element):
+        """Add an element in the table of its type.
+
+        Args:
+            element (Shape or Group) : The element.
+
+        Returns:
+            list : The node of element in tree of svg, the type and the index of element in table,
+                   with the nodes of children for a group.
+        """
+        name = element.__class__.__name__
+        if not isinstance(element, Group) and SHAPES.get(name, (None,))[0] is not element.__class__:
+            raise ValueError(f"Element {element.id} of type {name} can't be saved")
+
+        table = self.get_table("Group" if isinstance(element, Group) else name)
+        index = len(table["styles"])
+        table["styles"].append(self.add_style(element.style))
+        write_transform(element, table["columns"])
+        if isinstance(element, Group):
+            self.add_keys(table, index, element.animation)
+            return ["Group", index, [self.add_element(child) for child in element.group]]
+
+        SHAPES[name][2](element, table["columns"])
+        table["ids"].append(element.id)
+        table["animated"].append(int(element.animations is not None))
+        if element.animations:
+            self.add_keys(table, index, element.animations)
+        return [name, index]
+
+    def save(self, svg):
+        """Get the file of svg.
+
+        Args:
+            svg (SVG) : The svg.
+
+        Returns:
+            bytes : The content of file.
+        """
+        elements = [self.add_element(element) for element in svg.group]
+        block = array("d")
+        tables = {}
+        for name, table in self.tables.items():
+            keys = table["keys"]
+            tables[name] = {
+                "ids": table["ids"], "styles": table["styles"], "animated": table["animated"],
+                "columns": {column: values.save(block) for column, values in table["columns"].items()},
+                "keys": {**keys, "values": keys["values"].save(block)}
+            }
+
+        view_box = [svg.start_vb.coordinates, svg.end_vb.coordinates] if svg.start_vb and svg.end_vb else None
+        header = {
+            "version": VERSION,
+            "size": svg.svg_dimensions,
+            "background_color": svg.background_color,
+            "view_box": view_box,
+            "gradients": [[gradient.id, gradient.start, gradient.end,
+                           [[offset, color, opacity] for offset, (color, opacity) in gradient.colors.items()]]
+                          for gradient in svg.gradients],
+            "styles": self.styles,
+            "tables": tables,
+            "elements": elements
+        }
+        header = json.dumps(header, separators=(",", ":")).encode()
+        # Block of numbers is aligned on 8 bytes, json ignore spaces at end
+        header += b" " * (-len(header) % 8)
+        if sys.byteorder == "big":
+            block.byteswap()
+        return MAGIC + struct.pack("<Q", len(header)) + header + block.tobytes()
+
+class SceneReader:
+    """ Create elements of a svg from their tables.
+
+    Args:
+        header (dict)                : The header of file.
+        block  (memoryview or array) : The float64 block of file.
+    """
+    def __init__(self, header, block):
+        self.header = header
+        self.styles = header["styles"]
+        self.tables = {}
+        for name, table in header["tables"].items():
+            keys = table["keys"]
+            # Key frames of each element of table
+            elements_keys = {}
+            for index, anim_type, frame, kind, numbers in zip(keys["shapes"], keys["types"], keys["frames"],
+                                                               keys["kinds"], read_column(block, keys["values"])):
+                elements_keys.setdefault(index, []).append((AnimationType[anim_type], frame, kind, numbers))
+            columns = {column: read_column(block, values) for column, values in table["columns"].items()}
+            self.tables[name] = (table, columns, elements_keys)
+
+    def get_style(self, index):
+        return Style(*self.styles[index]) if index >= 0 else None
+
+    def get_element(self, node):
+        """Create an element.
+
+        Args:
+            node (list) : The node of element in tree of svg.
+
+        Returns:
+            Shape or Group : The element.
+        """
+        name, index = node[0], node[1]
+        table, columns, elements_keys = self.tables[name]
+        if name == "Group":
+            element = Group()
+            element.append([self.get_element(child) for child in node[2]])
+            element.style = self.get_style(table["styles"][index])
+            read_transform(element, columns, index)
+            if index in elements_keys:
+                self.set_keys(element.animation, elements_keys[index])
+            return element
+
+        cls, _, _, read = SHAPES[name]
+        element = read(cls, columns, index, table["ids"][index], bool(table["animated"][index]))
+        element.style = self.get_style(table["styles"][index])
+        read_transform(element, columns, index)
+        if element.animations:
+            self.set_keys(element.animations, elements_keys.get(index, ()))
+        return element
+
+    @staticmethod
+    def set_keys(animations, keys):
+        """Replace the key frames of an animation.
+
+        Args:
+            animations (Animation) : The animation.
+            keys       (list)      : The type, the frame, the kind and the numbers of each key frame.
+        """
+        for anim_type in AnimationType:
+            animations.anims[anim_type] = {}
+        for anim_type, frame, kind, numbers in keys:
+            animations.anims[anim_type][frame] = decode_value(kind, numbers)
+            animations.nb_frames = max(frame, animations.nb_frames)
+
+    def get_svg(self):
+        header = self.header
+        # Elements are many small objects, the garbage collector would scan them again and again while they are created
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            elements = [self.get_element(node) for node in header["elements"]]
+        finally:
+            if enabled:
+                gc.enable()
+        svg = SVG(elements, *header["size"], background_color=header["background_color"])
+        if header["view_box"]:
+            svg.set_view_box(*(Point2D(*coordinates) for coordinates in header["view_box"]))
+        for id, start, end, colors in header["gradients"]:
+            gradient = Gradient(id, tuple(start) if start else None, tuple(end) if end else None)
+            for offset, color, opacity in colors:
+                gradient.add_color(offset, color, opacity)
+            svg.gradients.append(gradient)
+        return svg
+
+# region Save and load
+def dumps(svg):
+    """Save a svg with all its elements and their animations.
+
+    Args:
+        svg (SVG) : The svg.
+
+    Returns:
+        bytes : The svg in binary format.
+    """
+    return SceneWriter().save(svg)
+
+def loads(data):
+    """Load a svg saved by dumps.
+
+    Args:
+        data (bytes or memoryview) : The svg in binary format.
+
+    Returns:
+        SVG : The svg.
+    """
+    with memoryview(data) as buffer:
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError("Data isn't a svg scene")
+        size, = struct.unpack_from("<Q", buffer, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(bytes(buffer[start:start + size]).decode())
+        if header["version"] != VERSION:
+            raise ValueError(f"Version {header['version']} of svg scene isn't supported")
+
+        if sys.byteorder == "big":
+            block = array("d", bytes(buffer[start + size:]))
+            block.byteswap()
+            return SceneReader(header, block).get_svg()
+        # Numbers are read in place, without copy of block
+        with buffer[start + size:].cast("d") as block:
+            return SceneReader(header, block).get_svg()
+
+def dump(svg, path):
+    """Save a svg in a file.
+
+    Args:
+        svg  (SVG) : The svg.
+        path (str) : The path of file.
+    """
+    with open(path, "wb") as f:
+        f.write(dumps(svg))
+
+def load(path):
+    """Load a svg from a file saved by dump, the file is memory mapped.
+
+    Args:
+        path (str) : The path of file.
+
+    Returns:
+        SVG : The svg.
+    """
+    with open(path, "rb") as f, mmap(f.fileno(), 0, access=ACCESS_READ) as data:
+        return loads(data)
+# endregion Save and load
@@ -5,6 +5,7 @@ Implementation of necessary for shape displaying.
 # region Imports
 from abc import abstractmethod, ABC
 from SVGVideoMaker.geo.style import Style
+from SVGVideoMaker.geo.debug import get_debug_generation
 from SVGVideoMaker.geo.animation import AnimationType, Animation, ModificationAnimation
 # endregion Imports
 
@@ -16,6 +17,14 @@ class Shape(ABC):
 	"""
 	COUNTER = 0
 
+	# Svg and quadrants of the last frame, computed again only when the shape is dirty
+	dirty = True
+	groups = () # Groups who contain the shape, told when it change
+	cache_content = None
+	cache_quadrant = None
+	cache_drawn = None
+	cache_generation = None # Generation of debug level of the svg cached
+
 	def __init__(self, id=None, animation=None, style=False, opacity=1):
 		"""Shape is an abstract class who describe main characteristics of a svg shape.
 
@@ -62,6 +71,7 @@ class Shape(ABC):
 		self.style.set(fill_color, stroke_color, stroke_width, stroke_linecaps, stroke_dasharray, opacity, custom)
 		if others_rules:
 			self.style.add_other_rules(others_rules)
+		self.set_dirty()
 
 	def add_other_rule(self, rules):
 		"""Add new rules at previous others rules.
@@ -72,6 +82,18 @@ class Shape(ABC):
 		"""
 		if self.style:
 			self.style.add_other_rules(rules)
+			self.set_dirty()
+
+	def set_dirty(self):
+		"""Mark the shape as changed, its svg and its quadrants are computed again at next frame.
+		Animations and setters do it, it's only needed after a direct change of an attribute.
+		Groups are told only at first change, they can't use the shape again before it's cleaned.
+		"""
+		if self.dirty:
+			return
+		self.dirty = True
+		for group in self.groups:
+			group.set_changed()
 	# endregion Setters
 
 	# region Getters
@@ -113,17 +135,78 @@ class Shape(ABC):
 		"""
 		if self.style:
 			if self.style.opacity > 0:
-				return self.svg_content()
+				return self.get_content()
 			else:
 				return ""
 		else:
-			return self.svg_content()
+			return self.get_content()
+
+	def clean(self):
+		"""
+		Clear the svg and the quadrants of last frame if the shape changed, or if the debug level changed.
+		"""
+		generation = get_debug_generation()
+		if self.dirty or self.cache_generation != generation:
+			self.cache_content = self.cache_quadrant = self.cache_drawn = None
+			self.cache_generation = generation
+			self.dirty = False
+
+	def get_content(self):
+		"""Return the string who describe the shape, computed by svg_content only if the shape changed.
+
+		Returns:
+			str: The string who describe the shape.
+		"""
+		self.clean()
+		if self.cache_content is None:
+			self.cache_content = self.svg_content()
+		return self.cache_content
+
+	def get_quadrant(self):
+		"""Return the quadrant who contain the shape, computed by bounding_quadrant only if the shape changed.
+		The quadrant is shared between frames, it must not be modified.
+
+		Returns:
+			Quadrant: The quadrant who contain the shape.
+		"""
+		self.clean()
+		if self.cache_quadrant is None:
+			self.cache_quadrant = self.bounding_quadrant()
+		return self.cache_quadrant
+
+	def drawn_quadrant(self):
+		"""Return a quadrant who contain the shape like it's drawn, with his translation and his rotation.
+		The quadrant is shared between frames, it must not be modified.
+
+		Returns:
+			Quadrant: The quadrant who contain the drawn shape.
+		"""
+		self.clean()
+		if self.cache_drawn is None:
+			self.cache_drawn = self.compute_drawn_quadrant()
+		return self.cache_drawn
+
+	def compute_drawn_quadrant(self):
+		"""Compute the quadrant who contain the shape like it's drawn, with his translation and his rotation.
+
+		Returns:
+			Quadrant: The quadrant who contain the drawn shape.
+		"""
+		quadrant = self.get_quadrant()
+		if self.rotation == 0 and not any(self.translation):
+			return quadrant
+
+		# Same transform than get_transform, rotation around center then translation
+		return quadrant.transform(self.get_center(), self.rotation, self.translation)
 	# endregion Getters
 
 	# region Animations
 	def reset(self):
 		self.translation = [0, 0]
 		self.rotation = 0
+		if self.style:
+			self.style.reset()
+		self.set_dirty()
 
 	def add_translation(self, frame, x, y=None):
 		"""Add translation animation on shape at frame.
@@ -170,13 +253,16 @@ class Shape(ABC):
 
 	def apply_translation(self, value):
 		self.translation = [v + old for v, old in zip(value, self.translation)]
+		self.set_dirty()
 
 	def apply_rotation(self, value):
 		self.rotation += value
+		self.set_dirty()
 
 	def apply_opacity(self, value):
 		if self.style:
 			self.style.opacity = round(self.style.opacity + value, 3)
+			self.set_dirty()
 	# endregion Animations
 
 	# region Abstract
@@ -27,6 +27,7 @@ class Style:
 		self.stroke_width = stroke_width
 		self.stroke_color = stroke_color
 		self.opacity = opacity
+		self.start_opacity = opacity # Opacity before any animation
 
 		# Others rules
 		self.others_rules = []
@@ -79,6 +80,13 @@ class Style:
 			self.stroke_color = stroke_color
 		if opacity:
 			self.opacity = opacity
+			self.start_opacity = opacity
+
+	def reset(self):
+		"""
+		Reset values modified by animation.
+		"""
+		self.opacity = self.start_opacity
 
 	def get_styles(self):
 		"""Get a string who describe all style.
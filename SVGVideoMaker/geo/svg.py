@@ -7,6 +7,7 @@ Useful to display and save all element.
 from itertools import cycle
 from SVGVideoMaker.geo.quadrant import Quadrant
 from SVGVideoMaker.geo.group import Group
+from SVGVideoMaker.geo.animation import AnimationType
 from SVGVideoMaker.geo.gradient import Gradient
 # endregion Imports
 
@@ -36,6 +37,29 @@ class SVG(Group):
         self.start_vb = None
         self.end_vb = None
         self.gradients = []
+        self.displays = [] # Svg string of each element of last frame
+        self.contents = [] # Svg string and color of each element of last frame
+
+    def add_animation(self, frame, anim_type=AnimationType.TRANSLATION, x=None, y=None, value=None):
+        """Add animation on all elements of svg at frame. Override add_animation of group,
+        svg itself isn't animated, so the view box and the layers follow its elements.
+
+        Args:
+            frame     (int)          : The frame number.
+            anim_type (AnimationType): The type of animation to add.
+            x         (float)        : The value on X axis, for translation and inflation.
+            y         (float)        : The value on Y axis, for translation and inflation.
+            value     (float)        : The value, for rotation and opacity.
+        """
+        if anim_type == AnimationType.MODIFICATION:
+            raise Exception("Svg can't have modification animation")
+
+        for el in self.group:
+            if el.animations:
+                if value is not None:
+                    el.animations.add_animation(frame, anim_type, value=value)
+                else:
+                    el.animations.add_animation(frame, anim_type, x=x, y=y)
 
     def save(self, path, name):
         """Save the svg frame.
@@ -48,71 +72,174 @@ class SVG(Group):
         f.write(self.get_svg())
         f.close()
 
-    def get_svg(self):
-        """Compute svg to string. Override default get_svg of group.
+    # region Scene file
+    def dump(self, path):
+        """Save the svg with all its elements and their animations in a compact binary file.
+        Loading the file with SVG.load is faster than create again the svg.
+
+        Args:
+            path (str) : The path of file.
+        """
+        from SVGVideoMaker.geo.serialize import dump
+        dump(self, path)
+
+    def dumps(self):
+        """Save the svg with all its elements and their animations in binary format, like dump.
+        Smaller and faster to send to an other process than the pickle of svg.
 
         Returns:
-            str: A string who describe the svg.
+            bytes : The svg in binary format.
+        """
+        from SVGVideoMaker.geo.serialize import dumps
+        return dumps(self)
+
+    @staticmethod
+    def load(path):
+        """Load a svg saved by dump.
+
+        Args:
+            path (str) : The path of file.
+
+        Returns:
+            SVG : The svg.
+        """
+        from SVGVideoMaker.geo.serialize import load
+        return load(path)
+
+    @staticmethod
+    def loads(data):
+        """Load a svg saved by dumps.
+
+        Args:
+            data (bytes) : The svg in binary format.
+
+        Returns:
+            SVG : The svg.
+        """
+        from SVGVideoMaker.geo.serialize import loads
+        return loads(data)
+    # endregion Scene file
+
+    def get_view_box(self):
+        """Get the view box of svg, the one given or a view box who contain all elements.
+
+        Returns:
+            tuple: The top left and the bottom right coordinates of view box.
         """
         if self.start_vb and self.end_vb:
-            vb = (self.start_vb.coordinates, self.end_vb.coordinates)
-        else:
-            quadrant = Quadrant.empty_quadrant(2)
-            for element in self.group:
-                quadrant.update(element.bounding_quadrant())
-            quadrant.inflate(1.1) # To see correctly border
+            return self.start_vb.coordinates, self.end_vb.coordinates
 
-            vb = quadrant.get_arrays()
+        quadrant = Quadrant.empty_quadrant(2)
+        for element in self.group:
+            quadrant.update(element.get_quadrant())
+        quadrant.inflate(1.1) # To see correctly border
+        return quadrant.get_arrays()
+
+    def get_frame_params(self, size=None, view_box=None):
+        """Compute the parameters of svg frame.
+
+        Args:
+            size     (tuple) : The size of frame in px (width, height). Default None, size of svg.
+            view_box (tuple) : The top left and the bottom right coordinates of view box. Default None, view box of svg.
 
+        Returns:
+            tuple, list, float: The view box, the dimensions of view box and the stroke width of all elements.
+        """
+        vb = view_box if view_box else self.get_view_box()
         dimensions = [a - b for a, b in zip(vb[1], vb[0])]
 
         if any(d == 0.0 for d in dimensions):
             raise ValueError
 
-        ratios = [a / b for a, b in zip(self.svg_dimensions, dimensions)]
+        ratios = [a / b for a, b in zip(size if size else self.svg_dimensions, dimensions)]
         scale = min(ratios)
         if scale == 0.0:
             raise ValueError
         sk = 3 / scale
-        return self.create_svg(view_box=vb, dimensions=dimensions, stroke_size=sk)
+        return vb, dimensions, sk
+
+    def get_svg(self, size=None, view_box=None, reuse=False):
+        """Compute svg to string. Override default get_svg of group.
+
+        Args:
+            size     (tuple) : The size of frame in px (width, height). Default None, size of svg.
+            view_box (tuple) : The top left and the bottom right coordinates of view box. Default None, view box of svg.
+            reuse    (bool)  : Reuse elements of the last frame computed, when only size or view box change.
+                               Default False.
+
+        Returns:
+            str: A string who describe the svg.
+        """
+        vb, dimensions, sk = self.get_frame_params(size, view_box)
+        return self.create_svg(view_box=vb, dimensions=dimensions, stroke_size=sk,
+                               displays=self.displays if reuse else None, size=size)
+
+    def get_layer_svg(self, indexes, background=False):
+        """Compute svg to string with only some elements of the last frame computed by get_svg.
+        Elements keep their color of the full frame.
+
+        Args:
+            indexes    (list) : The indexes of elements to display.
+            background (bool) : Display the background color. Default False, transparent.
+
+        Returns:
+            str: A string who describe the svg.
+        """
+        vb, dimensions, sk = self.get_frame_params()
+        displays = [self.displays[i] for i in indexes]
+        return self.create_svg(view_box=vb, dimensions=dimensions, stroke_size=sk,
+                               displays=displays, background=background)
 
-    def create_svg(self, view_box, dimensions, stroke_size):
+    def create_svg(self, view_box, dimensions, stroke_size, displays=None, background=True, size=None):
         """Compute svg to string.
 
         Args:
             view_box    (tuple) : A tuple who describe the zone to display on svg. A simple view box.
             dimensions  (list)  : List of size (width and height).
             stroke_size (int)   : Size of stroke width of all element in svg.
+            displays    (list)  : The svg string of elements to display. Default None, all elements.
+            background  (bool)  : Display the background color. Default True.
+            size        (tuple) : The size of frame in px (width, height). Default None, size of svg.
 
         Returns:
             str: A string who describe the svg.
         """
         start = view_box[0]
-        svg_file = '<svg width="{}" height="{}"'.format(*self.svg_dimensions)
+        svg_file = '<svg width="{}" height="{}"'.format(*(size if size else self.svg_dimensions))
         svg_file += ' viewBox="{} {}'.format(*start)
         svg_file += ' {} {}"'.format(*dimensions)
         svg_file += ' xmlns="http://www.w3.org/2000/svg">\n'
         if self.gradients:
             svg_file += f"<defs>\n{self.get_gradients_svg()}\n</defs>\n"
-        if self.background_color:
+        if background and self.background_color:
             svg_file += '<rect x="{}" y="{}"'.format(*start) # min size
             svg_file += ' width="{}" height="{}" fill="{}"/>\n'.format(*dimensions, self.background_color)
         svg_file += '\t<g stroke-width="{}">\n'.format(stroke_size)
-        svg_file += f"{self.compute_displays()}\n\t</g>\n</svg>\n"
+        displays = self.compute_displays() if displays is None else " ".join(displays)
+        svg_file += f"{displays}\n\t</g>\n</svg>\n"
         return svg_file
 
     def compute_displays(self):
         """
         Compute bounding quadrant and svg strings for all things to display.
+        Svg strings of last frame are reused for elements who don't changed.
         """
-        strings = []
+        strings, contents = [], []
         colors = cycle(iter(SVG.svg_colors))
-        for thing in self.group:
+        same = len(self.contents) == len(self.group)
+        for i, thing in enumerate(self.group):
+            content = thing.get_svg()
             if thing.is_style():
-                strings.append(thing.get_svg())
+                contents.append((content, None))
+                strings.append(content)
+                continue
+            color = next(colors)
+            contents.append((content, color))
+            if same and self.contents[i][0] is content and self.contents[i][1] == color:
+                strings.append(self.displays[i])
             else:
-                color = next(colors)
-                strings.append(f'<g fill="{color}" stroke="{color}">\n{thing.get_svg()}\n</g>\n')
+                strings.append(f'<g fill="{color}" stroke="{color}">\n{content}\n</g>\n')
+        self.displays, self.contents = strings, contents
         return " ".join(strings)
 
     def get_gradients_svg(self):
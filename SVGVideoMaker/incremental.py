@@ -0,0 +1,155 @@
+"""
+Incremental render of videos.
+A video is encoded in segments of fixed number of frames, a manifest keep the hash of each frame of each segment.
+On the next render, only segments who have a frame who change are rasterized and encoded again,
+then all segments are spliced in the video with a stream copy.
+"""
+
+# region Imports
+import os
+import json
+from hashlib import sha1
+# endregion Imports
+
+# Default duration of segments in seconds
+SEGMENT_SECONDS = 2
+
+def hash_frame(frame):
+    """Compute the hash of content of a frame.
+
+    Args:
+        frame (str) : The svg frame in string.
+
+    Returns:
+        str : The hash of frame.
+    """
+    return sha1(frame.encode()).hexdigest()
+
+class RenderManifest:
+    """ The segments of a previous render, with the hash of each frame of segment.
+    Manifest and segments are saved in a directory next to the video.
+    A manifest made with other parameters (size, fps, profile...) is ignored, all segments are rendered again.
+
+    Args:
+        directory (str)  : The directory of segments and manifest.
+        params    (dict) : The parameters of render who change the content of segments.
+    """
+    VERSION = 1
+    FILE_NAME = "manifest.json"
+
+    def __init__(self, directory, params):
+        self.directory = directory
+        self.params = params
+        # For each first frame of segment, a dict with the last frame, the file and the hashes of frames
+        self.segments = {}
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self.load()
+
+    def get_path(self, name=None):
+        return os.path.join(self.directory, name if name else RenderManifest.FILE_NAME)
+
+    def load(self):
+        """
+        Read segments of previous render, if it was made with the same parameters.
+        """
+        path = self.get_path()
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            # Unreadable manifest, segments are rendered again
+            return
+        if manifest.get("version") != RenderManifest.VERSION or manifest.get("params") != self.params:
+            return
+        self.segments = {segment["start"]: segment for segment in manifest["segments"]}
+
+    def save(self):
+        """
+        Write the manifest, in a temporary file to never have a partial manifest.
+        """
+        manifest = {
+            "version": RenderManifest.VERSION,
+            "params": self.params,
+            "segments": [self.segments[start] for start in sorted(self.segments)]
+        }
+        path = self.get_path()
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(f"{path}.tmp", path)
+
+    def is_valid(self, start, end, hashes):
+        """Check if a segment of previous render can be reused.
+
+        Args:
+            start  (int)  : The first frame of segment.
+            end    (int)  : The last frame of segment.
+            hashes (list) : The hash of each frame of segment.
+
+        Returns:
+            bool : True if segment have the same frames and his file exist.
+        """
+        segment = self.segments.get(start)
+        return segment is not None and segment["end"] == end and segment["frames"] == hashes and \
+            os.path.exists(self.get_path(segment["file"]))
+
+    def add(self, start, end, hashes, file):
+        """Add a segment rendered.
+
+        Args:
+            start  (int)  : The first frame of segment.
+            end    (int)  : The last frame of segment.
+            hashes (list) : The hash of each frame of segment.
+            file   (str)  : The name of segment file in directory.
+        """
+        self.segments[start] = {"start": start, "end": end, "file": file, "frames": hashes}
+
+    def keep(self, starts):
+        """Remove segments who aren't in the video anymore, with their files.
+
+        Args:
+            starts (iter) : The first frame of each segment of video.
+        """
+        starts = set(starts)
+        for start in [start for start in self.segments if start not in starts]:
+            path = self.get_path(self.segments.pop(start)["file"])
+            if os.path.exists(path):
+                os.remove(path)
+
+    def save_concat(self, starts):
+        """Write the list of segment files for concat demuxer of ffmpeg.
+
+        Args:
+            starts (list) : The first frame of each segment of video, in order.
+
+        Returns:
+            str : The path of list.
+        """
+        path = self.get_path("concat.txt")
+        with open(path, "w") as f:
+            for start in starts:
+                f.write(f"file '{self.segments[start]['file']}'\n")
+        return path
+
+def get_segments(frames, size):
+    """Group frames of a movie in segments.
+
+    Args:
+        frames (iter) : Iterable of frame number and svg frame, like make_movie.
+        size   (int)  : Number of frames of each segment, segments begin at a multiple of size.
+
+    Yields:
+        The first frame, the last frame and the list of svg frames of each segment.
+    """
+    start, segment = None, []
+    for i, frame in frames:
+        if segment and i % size == 0:
+            yield start, start + len(segment) - 1, segment
+            segment = []
+        if not segment:
+            start = i
+        segment.append(frame)
+    if segment:
+        yield start, start + len(segment) - 1, segment
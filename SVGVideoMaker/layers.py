@@ -0,0 +1,169 @@
+"""
+Rasterization of frames by layers.
+Elements who never change are rasterized once in static layers, each frame rasterize only animated elements
+and composite them with static layers, in the order of elements.
+"""
+
+# region Imports
+from io import BytesIO
+from hashlib import sha1
+import cairocffi as cairo
+from cairosvg.parser import Tree
+from SVGVideoMaker.raster import FrameData, get_svg, render_surface
+from SVGVideoMaker.damage import ClippedPNGSurface
+# endregion Imports
+
+# Static layers already rasterized by this process, by key of layer, width and height
+STATIC_SURFACES = {}
+MAX_STATIC_SURFACES = 16
+
+def split_layers(svg):
+    """Split elements of svg in static and animated layers, keeping the order of elements.
+    Static layers need a fixed view box, otherwise the view box change with animated elements.
+
+    Args:
+        svg (SVG) : The svg to split.
+
+    Returns:
+        list : List of layers, each layer is a tuple of a boolean who indicate if layer is static and
+               the indexes of its elements. None if the svg have no static element or no fixed view box.
+    """
+    if not (svg.start_vb and svg.end_vb):
+        return None
+
+    layers = []
+    for i, element in enumerate(svg.group):
+        static = element.animations is None or element.animations.is_static()
+        if layers and layers[-1][0] == static:
+            layers[-1][1].append(i)
+        else:
+            layers.append((static, [i]))
+
+    if not any(static for static, _ in layers):
+        return None
+    return layers
+
+class LayeredFrame(FrameData):
+    """ A svg frame in string, with the svg of each layer.
+
+    Args:
+        svg    (str)  : The svg frame in string.
+        layers (list) : For each layer, the index of static layer or the svg of animated layer in string.
+    """
+    def __init__(self, svg, layers=None):
+        super().__init__(svg)
+        self.layers = layers
+
+def get_static_layers(svg, layers):
+    """Compute svg of each static layer, from the current state of svg.
+
+    Args:
+        svg    (SVG)  : The svg.
+        layers (list) : The layers given by split_layers.
+
+    Returns:
+        list : The svg in string of each static layer.
+    """
+    svg.get_svg()
+    return [svg.get_layer_svg(indexes, background=i == 0) for i, (static, indexes) in enumerate(layers) if static]
+
+def track_layers(frames, svg, layers):
+    """Add the svg of each layer to each frame of a movie.
+
+    Args:
+        frames (iter) : Iterable of frame number and svg frame, like make_movie.
+        svg    (SVG)  : The svg of frames.
+        layers (list) : The layers given by split_layers.
+
+    Yields:
+        The frame number and the layered frame.
+    """
+    for i, frame in frames:
+        frame_layers, static_index = [], 0
+        for j, (static, indexes) in enumerate(layers):
+            if static:
+                frame_layers.append(static_index)
+                static_index += 1
+            else:
+                frame_layers.append(svg.get_layer_svg(indexes, background=j == 0))
+        yield i, LayeredFrame(frame, frame_layers)
+
+class LayerRenderer:
+    """ Rasterize frames layer by layer, static layers are rasterized once by process.
+    Renderer can be send to an other process.
+
+    Args:
+        static_layers (list) : The svg in string of each static layer.
+        width         (int)  : Width of frames in px.
+        height        (int)  : Height of frames in px.
+        raw           (bool) : Give raw pixels instead of png. Default False.
+        copy          (bool) : Give raw pixels in bytes instead of the cairo surface,
+                               to send them to an other process. Default False.
+    """
+    def __init__(self, static_layers, width, height, raw=False, copy=False):
+        self.static_layers = static_layers
+        self.keys = [sha1(layer.encode()).hexdigest() for layer in static_layers]
+        self.width = width
+        self.height = height
+        self.raw = raw
+        self.copy = copy
+
+    def get_static_surface(self, index):
+        """Get the surface of a static layer, rasterize it only the first time.
+
+        Args:
+            index (int) : The index of static layer.
+
+        Returns:
+            cairo.ImageSurface : The surface of layer, must not be modified.
+        """
+        key = (self.keys[index], self.width, self.height)
+        if key not in STATIC_SURFACES:
+            if len(STATIC_SURFACES) >= MAX_STATIC_SURFACES:
+                STATIC_SURFACES.clear()
+            STATIC_SURFACES[key] = render_surface(self.static_layers[index], self.width, self.height)
+        return STATIC_SURFACES[key]
+
+    def render(self, frame):
+        """Draw a frame layer by layer.
+
+        Args:
+            frame (str or LayeredFrame) : The svg frame in string.
+
+        Returns:
+            cairo.ImageSurface : The surface with frame draw on it.
+        """
+        layers = frame.layers if isinstance(frame, LayeredFrame) else None
+        if layers is None:
+            return render_surface(get_svg(frame), self.width, self.height)
+
+        surface = None
+        for layer in layers:
+            if isinstance(layer, int):
+                static = self.get_static_surface(layer)
+                if surface is None:
+                    # Static surface is shared, draw on a copy
+                    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, self.width, self.height)
+                    context = cairo.Context(surface)
+                    context.set_operator(cairo.OPERATOR_SOURCE)
+                else:
+                    context = cairo.Context(surface)
+                context.set_source_surface(static)
+                context.paint()
+            elif surface is None:
+                surface = render_surface(layer, self.width, self.height)
+            else:
+                tree = Tree(bytestring=layer.encode())
+                surface = ClippedPNGSurface(tree, surface, None, self.width, self.height).cairo
+        surface.flush()
+        return surface
+
+    # region Override
+    def __call__(self, frame):
+        surface = self.render(frame)
+        if not self.raw:
+            png = BytesIO()
+            surface.write_to_png(png)
+            return png.getvalue()
+        return bytes(surface.get_data()) if self.copy else surface
+    # endregion Override
@@ -0,0 +1,172 @@
+"""
+Measures of render, to know where the time of render is spent.
+A report can be exported in Chrome trace event format, to be open in a profiler (chrome://tracing, Perfetto).
+"""
+
+# region Imports
+import os
+import json
+from time import perf_counter
+from threading import get_ident
+# endregion Imports
+
+class RenderReport:
+    """ Timings of all stages of a render, frame by frame.
+    Stages are "update", "get_svg", "rasterize" and "write".
+
+    Args:
+        total_frames (int)      : Number of frames of render, to compute the remaining time. Default None.
+        callback     (callable) : Function called with the report each time a frame is written. Default None.
+    """
+    def __init__(self, total_frames=None, callback=None):
+        self.total_frames = total_frames
+        self.callback = callback
+        self.start = perf_counter()
+        self.end = None
+        # List of (stage, frame, start, duration, process id, thread id)
+        self.events = []
+        self.svg_sizes = {}
+        self.frames_written = 0
+
+    def record(self, stage, frame, start, duration, pid=None, tid=None):
+        """Record the time of a stage for a frame.
+
+        Args:
+            stage    (str)   : The name of stage.
+            frame    (int)   : The frame number.
+            start    (float) : The start time of stage, from perf_counter.
+            duration (float) : The duration of stage in seconds.
+            pid      (int)   : The process who run the stage. Default current process.
+            tid      (int)   : The thread who run the stage. Default current thread.
+        """
+        self.events.append((stage, frame, start, duration, pid if pid else os.getpid(), tid if tid else get_ident()))
+        if stage == "write":
+            self.frames_written += 1
+            if self.callback:
+                self.callback(self)
+
+    def record_svg_size(self, frame, size):
+        """Record the size of svg of a frame.
+
+        Args:
+            frame (int) : The frame number.
+            size  (int) : The size of svg in bytes.
+        """
+        self.svg_sizes[frame] = size
+
+    def finish(self):
+        """
+        Mark the end of render.
+        """
+        self.end = perf_counter()
+
+    # region Getters
+    def get_elapsed(self):
+        """Get the time since the begin of render, or the duration of render if finish.
+
+        Returns:
+            float : The time in seconds.
+        """
+        return (self.end if self.end else perf_counter()) - self.start
+
+    def get_fps(self):
+        """Get the number of frames written by seconds.
+
+        Returns:
+            float : The frames per seconds.
+        """
+        elapsed = self.get_elapsed()
+        return self.frames_written / elapsed if elapsed else 0.0
+
+    def get_eta(self):
+        """Get the estimated remaining time of render.
+
+        Returns:
+            float : The remaining time in seconds, None if unknown.
+        """
+        fps = self.get_fps()
+        if self.total_frames is None or not fps:
+            return None
+        return max(0, self.total_frames - self.frames_written) / fps
+
+    def get_frames(self):
+        """Get timings of each frame.
+
+        Returns:
+            dict : For each frame number, a dict of duration by stage, with "svg_size" in bytes.
+        """
+        frames = {}
+        for stage, frame, _, duration, _, _ in self.events:
+            frames.setdefault(frame, {})[stage] = frames.get(frame, {}).get(stage, 0) + duration
+        for frame, size in self.svg_sizes.items():
+            frames.setdefault(frame, {})["svg_size"] = size
+        return dict(sorted(frames.items()))
+
+    def get_summary(self):
+        """Get the summary of all stages.
+
+        Returns:
+            dict : For each stage, the number of measures, total, mean and max duration in seconds.
+        """
+        summary = {}
+        for stage, _, _, duration, _, _ in self.events:
+            values = summary.setdefault(stage, {"count": 0, "total": 0.0, "max": 0.0})
+            values["count"] += 1
+            values["total"] += duration
+            values["max"] = max(values["max"], duration)
+        for values in summary.values():
+            values["mean"] = values["total"] / values["count"]
+        return summary
+    # endregion Getters
+
+    def get_trace(self):
+        """Get all events in Chrome trace event format.
+
+        Returns:
+            dict : The trace, with times in microseconds.
+        """
+        events = [{
+            "name": stage,
+            "cat": "render",
+            "ph": "X",  # Complete event, with a duration
+            "ts": (start - self.start) * 1e6,
+            "dur": duration * 1e6,
+            "pid": pid,
+            "tid": tid,
+            "args": {"frame": frame}
+        } for stage, frame, start, duration, pid, tid in self.events]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_trace(self, path):
+        """Save all events in Chrome trace event format.
+
+        Args:
+            path (str) : The path of json file.
+        """
+        with open(path, "w") as f:
+            json.dump(self.get_trace(), f)
+
+    # region Override
+    def __str__(self):
+        string = f"Render of {self.frames_written} frames in {self.get_elapsed():.3f}s ({self.get_fps():.2f} fps)\n"
+        for stage, values in self.get_summary().items():
+            string += f"\t{stage.ljust(10)}: total {values['total']:.3f}s, " \
+                      f"mean {values['mean'] * 1000:.3f}ms, max {values['max'] * 1000:.3f}ms\n"
+        if self.svg_sizes:
+            string += f"\tsvg size  : mean {sum(self.svg_sizes.values()) / len(self.svg_sizes):.0f} bytes\n"
+        return string
+    # endregion Override
+
+def timed_call(function, *args):
+    """Call function and measure his time, useful to measure in an other process.
+
+    Args:
+        function (callable) : The function to call.
+        *args               : The arguments of function.
+
+    Returns:
+        tuple : The start time, the duration, the process id and the result of function.
+    """
+    start = perf_counter()
+    result = function(*args)
+    return start, perf_counter() - start, os.getpid(), result
@@ -0,0 +1,152 @@
+"""
+Outputs of a render, to make several videos from one computation of frames.
+Each output have its own size, view box, format and destination.
+"""
+
+# region Imports
+from SVGVideoMaker.encoder import get_profile, get_input_options
+# endregion Imports
+
+class OutputSpec:
+    """ An output of render.
+
+    Args:
+        width    (int)             : Width of video in px. Default None, width of Video.
+        height   (int)             : Height of video in px. Default None, height of Video.
+        view_box (tuple)           : The top left and the bottom right points of view box, like set_view_box.
+                                     Default None, view box of svg.
+        path     (str)             : The path where you save video. Default "./".
+        name     (str)             : The name of video. Default "out".
+        ext      (str)             : The extension of your video. Default mp4.
+        profile  (EncodingProfile) : The encoding options. Default None, profile of format 'ext'.
+        palette  (str)             : The path of color palette, if profile need it. Default None, temporary palette.
+    """
+    def __init__(self, width=None, height=None, view_box=None, path="./", name="out", ext="mp4", profile=None,
+                 palette=None):
+        self.width = width
+        self.height = height
+        self.view_box = view_box
+        self.path = path
+        self.name = name
+        self.ext = ext
+        self.profile = profile if profile else get_profile(ext)
+        self.palette = palette
+
+    def set_default_size(self, width, height):
+        """Set the size of output if it wasn't given.
+
+        Args:
+            width  (int) : The default width in px.
+            height (int) : The default height in px.
+        """
+        self.width = self.width if self.width else width
+        self.height = self.height if self.height else height
+
+    # region Getters
+    def get_size(self):
+        return self.width, self.height
+
+    def get_view_box(self):
+        """Get coordinates of view box.
+
+        Returns:
+            tuple : The top left and the bottom right coordinates of view box, None to use view box of svg.
+        """
+        if self.view_box is None:
+            return None
+        start, end = self.view_box
+        return tuple(start.coordinates), tuple(end.coordinates)
+
+    def get_output(self):
+        return f"{self.path}{self.name}.{self.ext}"
+
+    def get_svg(self, svg, reuse=False):
+        """Compute the svg frame of output, at the current state of svg.
+
+        Args:
+            svg   (SVG)  : The svg to draw.
+            reuse (bool) : Reuse elements of the last frame computed by svg. Default False.
+
+        Returns:
+            str : The svg frame in string.
+        """
+        return svg.get_svg(size=self.get_size(), view_box=self.get_view_box(), reuse=reuse)
+    # endregion Getters
+
+    # region Override
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.get_output()}, {self.width}x{self.height})"
+    # endregion Override
+
+class OutputBranch:
+    """ Outputs who are rasterized and encoded together.
+    Frames are rasterized once at the biggest size, and scaled by ffmpeg for each output.
+    Outputs must have the same view box and the same ratio of size.
+
+    Args:
+        outputs (list) : The OutputSpec of branch.
+    """
+    def __init__(self, outputs):
+        self.outputs = outputs
+        # Rasterize with the view box and the size of biggest output
+        self.spec = max(outputs, key=lambda output: output.width * output.height)
+        self.width, self.height = self.spec.get_size()
+
+    def get_command(self, fps, raw=False, palette=None):
+        """Get the ffmpeg command to encode all outputs of branch, frames are read on stdin.
+
+        Args:
+            fps     (int)  : Number of frames per seconds.
+            raw     (bool) : Frames are raw pixels, otherwise png.
+            palette (str)  : The path of color palette, for a branch of one output who need it.
+
+        Returns:
+            list : The command.
+        """
+        cmd = [
+            "ffmpeg",
+            "-y",  # Overwrite output file if exist
+            *get_input_options(self.width, self.height, fps, raw),
+        ]
+        if len(self.outputs) == 1:
+            output = self.outputs[0]
+            return cmd + [*output.profile.get_options(palette), output.get_output()]
+
+        # Frames are split in one stream by output, each stream is scaled to the size of its output
+        labels = "".join(f"[split{i}]" for i in range(len(self.outputs)))
+        graph = [f"[0:v]split={len(self.outputs)}{labels}"]
+        for i, output in enumerate(self.outputs):
+            filters = [f"scale={output.width}:{output.height}", *output.profile.get_filters()]
+            graph.append(f"[split{i}]{','.join(filters)}[out{i}]")
+        cmd += ["-filter_complex", ";".join(graph)]
+        for i, output in enumerate(self.outputs):
+            cmd += ["-map", f"[out{i}]", *output.profile.get_options(filters=False), output.get_output()]
+        return cmd
+
+    # region Override
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.outputs})"
+    # endregion Override
+
+def get_branches(outputs, split=False):
+    """Group outputs who can be rasterized once and scaled by ffmpeg.
+    Outputs who need a palette are always alone, palette is computed for one size.
+
+    Args:
+        outputs (list) : The OutputSpec of each output.
+        split   (bool) : Group outputs with the same view box and the same ratio of size. Default False.
+
+    Returns:
+        list : The OutputBranch of outputs.
+    """
+    if not split:
+        return [OutputBranch([output]) for output in outputs]
+
+    branches, groups = [], {}
+    for output in outputs:
+        if output.profile.palette:
+            branches.append(OutputBranch([output]))
+            continue
+        key = (output.get_view_box(), round(output.width / output.height, 3))
+        groups.setdefault(key, []).append(output)
+    return branches + [OutputBranch(group) for group in groups.values()]
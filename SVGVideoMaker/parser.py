@@ -103,6 +103,7 @@ def parse_rectangle(attributes):
 def parse_group(attributes):
 	g = Group()
 	parse_shape(g, attributes)
+	g.set_start_transform()
 	return g
 
 def parse_node(node):
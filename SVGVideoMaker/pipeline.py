@@ -0,0 +1,283 @@
+"""
+Stages of render who run concurrently.
+Stages are connected with bounded queues, so a fast stage wait a slow stage and memory stay bounded.
+"""
+
+# region Imports
+from time import perf_counter
+from queue import Queue, Full, Empty
+from threading import Thread, Event
+from SVGVideoMaker.raster import get_buffer
+# endregion Imports
+
+# Mark the end of items in a queue
+END = object()
+
+class Prefetch:
+    """ Iterate on an iterable in a thread, items are given through a bounded queue.
+
+    Args:
+        iterable (iter) : The iterable to consume in thread.
+        size     (int)  : Maximum number of items waiting in queue. Default 8.
+    """
+    def __init__(self, iterable, size=8):
+        self.queue = Queue(size)
+        self.stopped = Event()
+        self.error = None
+        self.thread = Thread(target=self.run, args=(iter(iterable),), daemon=True)
+        self.thread.start()
+
+    def run(self, iterator):
+        try:
+            for item in iterator:
+                if not self.put(item):
+                    break
+        except BaseException as error:
+            self.error = error
+        finally:
+            if hasattr(iterator, "close"):
+                # Let generator finish correctly if it was stopped
+                iterator.close()
+            self.put(END)
+
+    def put(self, item):
+        """Put an item in queue, wait if queue is full.
+
+        Args:
+            item : The item to put.
+
+        Returns:
+            bool : False if iteration was stopped by consumer, otherwise True.
+        """
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def close(self):
+        """
+        Stop the thread, even if all items wasn't consumed.
+        """
+        self.stopped.set()
+        self.thread.join()
+
+    # region Override
+    def __iter__(self):
+        try:
+            while True:
+                item = self.queue.get()
+                if item is END:
+                    if self.error:
+                        raise self.error
+                    return
+                yield item
+        finally:
+            self.close()
+    # endregion Override
+
+class FileWriter:
+    """ Write files in a thread, files are given to the thread by batch to limit exchanges between threads.
+    Each file is written without buffer, in one system call.
+
+    Args:
+        batch (int) : Number of files given together to the thread. Default 16.
+        size  (int) : Maximum number of batches waiting to be written. Default 4.
+    """
+    def __init__(self, batch=16, size=4):
+        self.batch_size = batch
+        self.batch = []
+        self.error = None
+        self.queue = Queue(size)
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while True:
+            files = self.queue.get()
+            if files is END:
+                return
+            if self.error is None:
+                try:
+                    for path, data in files:
+                        write_file(path, data)
+                except BaseException as error:
+                    # Continue to consume queue to never block other stages
+                    self.error = error
+
+    def write(self, path, data):
+        """Add a file to write, wait if too many batches are waiting.
+
+        Args:
+            path (str)        : The path of file.
+            data (bytes-like) : The content of file.
+        """
+        if self.error:
+            raise self.error
+        self.batch.append((path, data))
+        if len(self.batch) >= self.batch_size:
+            self.queue.put(self.batch)
+            self.batch = []
+
+    def close(self):
+        """
+        Wait all files are written.
+        """
+        if self.thread:
+            if self.batch:
+                self.queue.put(self.batch)
+                self.batch = []
+            self.queue.put(END)
+            self.thread.join()
+            self.thread = None
+        if self.error:
+            raise self.error
+
+    def stop(self):
+        """
+        Stop the thread after an error of caller, files not yet written are dropped and errors are ignored.
+        """
+        self.batch = []
+        if self.thread:
+            drain(self.queue)
+            self.queue.put(END)
+            self.thread.join()
+            self.thread = None
+
+    # region Override
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.stop()
+    # endregion Override
+
+def drain(queue):
+    """Remove all items waiting in a queue.
+
+    Args:
+        queue (Queue) : The queue.
+    """
+    while True:
+        try:
+            queue.get_nowait()
+        except Empty:
+            return
+
+def write_file(path, data):
+    """Write a file without buffer.
+
+    Args:
+        path (str)        : The path of file.
+        data (bytes-like) : The content of file.
+    """
+    data = memoryview(data).cast("B")
+    with open(path, "wb", buffering=0) as f:
+        while data:
+            data = data[f.write(data):]
+
+def prefetch(iterable, size=None):
+    """Iterate on iterable in a thread if a size of queue is given.
+
+    Args:
+        iterable (iter) : The iterable.
+        size     (int)  : Maximum number of items waiting in queue. Default None, iterate without thread.
+
+    Returns:
+        iter : The iterable, or a Prefetch on it.
+    """
+    return Prefetch(iterable, size) if size else iterable
+
+class RasterWriter:
+    """ Write rasters on a file, in a thread if a size of queue is given.
+    Writing on a pipe release the GIL, so others stages run while the encoder read.
+
+    Args:
+        file        (file)         : The file where write rasters, like stdin of encoder.
+        size        (int)          : Maximum number of rasters waiting to be written. Default None, write without thread.
+        metrics     (RenderReport) : The report where record time of writing. Default None, no measure.
+        first_frame (int)          : The number of first frame written, to record measures. Default 0.
+    """
+    def __init__(self, file, size=None, metrics=None, first_frame=0):
+        self.file = file
+        self.error = None
+        self.metrics = metrics
+        self.frame_number = first_frame
+        self.queue = Queue(size) if size else None
+        self.thread = None
+        if self.queue:
+            self.thread = Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            raster = self.queue.get()
+            if raster is END:
+                return
+            if self.error is None:
+                try:
+                    self.write_raster(raster)
+                except BaseException as error:
+                    # Continue to consume queue to never block other stages
+                    self.error = error
+
+    def write(self, raster):
+        """Write a raster, wait if too many rasters are waiting.
+
+        Args:
+            raster (bytes or cairo.ImageSurface) : The raster to write.
+        """
+        if self.error:
+            raise self.error
+        if self.queue:
+            self.queue.put(raster)
+        else:
+            self.write_raster(raster)
+
+    def write_raster(self, raster):
+        if self.metrics is None:
+            self.file.write(get_buffer(raster))
+            return
+        start = perf_counter()
+        self.file.write(get_buffer(raster))
+        self.metrics.record("write", self.frame_number, start, perf_counter() - start)
+        self.frame_number += 1
+
+    def close(self):
+        """
+        Wait all rasters are written and close the file.
+        """
+        if self.thread:
+            self.queue.put(END)
+            self.thread.join()
+            self.thread = None
+        self.file.close()
+        if self.error:
+            raise self.error
+
+    def stop(self):
+        """
+        Stop the thread after an error of caller, without close the file and without raise errors of writing.
+        Rasters not yet written are dropped, the thread end after the raster it's writing.
+        The file is let to its owner, like an encoder who must be killed and not closed.
+        """
+        if self.thread:
+            drain(self.queue)
+            self.queue.put(END)
+            self.thread = None
+
+    # region Override
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.stop()
+    # endregion Override
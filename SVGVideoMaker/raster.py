@@ -0,0 +1,294 @@
+"""
+Rasterization of svg frames.
+Frames can be rasterized on the main process or spread over a pool of processes.
+"""
+
+# region Imports
+import sys
+import gzip
+import cairocffi as cairo
+from time import perf_counter
+from functools import partial
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from cairosvg import svg2png
+from cairosvg.parser import Tree
+from cairosvg.surface import PNGSurface
+from SVGVideoMaker.metrics import timed_call
+# endregion Imports
+
+# Pixel format of cairo ARGB32 surface in memory, for ffmpeg rawvideo input.
+# Cairo premultiply colors by alpha but ffmpeg read them as straight alpha,
+# raw pixels are the same than png only for opaque pixels, so raw mode need an opaque background.
+RAW_PIXEL_FORMAT = "bgra" if sys.byteorder == "little" else "argb"
+
+# Mark a frame who is the same than the previous one
+HOLD = object()
+
+class FrameData:
+    """ A svg frame in string, with data used by its renderer.
+
+    Args:
+        svg (str) : The svg frame in string.
+    """
+    def __init__(self, svg):
+        self.svg = svg
+
+def get_svg(frame):
+    """Get the svg of a frame.
+
+    Args:
+        frame (str or FrameData) : The frame.
+
+    Returns:
+        str : The svg frame in string.
+    """
+    return frame.svg if isinstance(frame, FrameData) else frame
+
+def rasterize(frame):
+    """Rasterize a svg frame to a png.
+
+    Args:
+        frame (str) : The svg frame in string.
+
+    Returns:
+        bytes : The png of frame.
+    """
+    return svg2png(frame)
+
+def render_surface(frame, width, height):
+    """Render a svg frame on a cairo image surface, without any encoding.
+
+    Args:
+        frame  (str) : The svg frame in string.
+        width  (int) : Width of surface in px.
+        height (int) : Height of surface in px.
+
+    Returns:
+        cairo.ImageSurface : The surface with frame draw on it, in ARGB32 format.
+    """
+    tree = Tree(bytestring=frame.encode() if isinstance(frame, str) else frame)
+    surface = PNGSurface(tree, None, 96, output_width=width, output_height=height)
+    surface.cairo.flush()
+    return surface.cairo
+
+def rasterize_raw(frame, width, height):
+    """Rasterize a svg frame to raw pixels in RAW_PIXEL_FORMAT.
+
+    Args:
+        frame  (str) : The svg frame in string.
+        width  (int) : Width of frame in px.
+        height (int) : Height of frame in px.
+
+    Returns:
+        bytes : The pixels of frame, row by row.
+    """
+    return bytes(render_surface(frame, width, height).get_data())
+
+def get_raw_function(width, height, workers=None):
+    """Get the function who rasterize frames to raw pixels.
+    On main process, the surface is kept to write his buffer without copy.
+
+    Args:
+        width   (int) : Width of frames in px.
+        height  (int) : Height of frames in px.
+        workers (int) : Number of processes who rasterize frames. Default None, on main process.
+
+    Returns:
+        callable : The function who rasterize one frame.
+    """
+    return partial(rasterize_raw if workers else render_surface, width=width, height=height)
+
+def encode_svg(frame):
+    """Encode a svg frame to a svg file.
+
+    Args:
+        frame (str) : The svg frame in string.
+
+    Returns:
+        bytes : The svg file.
+    """
+    return frame.encode()
+
+def compress_svg(frame):
+    """Compress a svg frame to a svgz file.
+
+    Args:
+        frame (str) : The svg frame in string.
+
+    Returns:
+        bytes : The svg file compressed with gzip.
+    """
+    return gzip.compress(frame.encode())
+
+def get_buffer(raster):
+    """Get the bytes of a raster without copy.
+
+    Args:
+        raster (bytes or cairo.ImageSurface) : A raster given by one of rasterize function.
+
+    Returns:
+        bytes-like : The bytes of raster. For a surface, the buffer is valid while surface is alive.
+    """
+    return raster.get_data() if isinstance(raster, cairo.ImageSurface) else raster
+
+def start_executor(workers):
+    """Create a pool of processes and start them now, before threads of a pipeline and ffmpeg processes,
+    fork isn't safe with running threads.
+
+    Args:
+        workers (int) : Number of processes.
+
+    Returns:
+        ProcessPoolExecutor : The executor, None if workers is None or 1.
+    """
+    if not workers or workers <= 1:
+        return None
+    executor = ProcessPoolExecutor(workers)
+    executor.submit(abs, 0).result()
+    return executor
+
+class RasterPool:
+    """ Rasterize frames with a pool of processes and give them back in frame order.
+    If a cache is given, frames already rasterized are read from cache instead of rasterized.
+    A frame identical to the previous one isn't rasterized, the previous raster is given again.
+
+    Args:
+        function     (callable)     : The function to rasterize one frame. Must be picklable. Default None, use rasterize.
+        workers      (int)          : Number of processes. If None or 1, frames are rasterized on main process.
+        window       (int)          : Maximum number of frames in flight in the pool. Default 2 frames by worker.
+        cache        (FrameCache)   : The cache of rasters. Default None, no cache.
+        cache_params (tuple)        : Parameters of function who change the raster, to add in key of cache.
+        metrics      (RenderReport) : The report where record time of rasterization. Default None, no measure.
+        first_frame  (int)          : The number of first frame given, to record measures. Default 0.
+        executor     (Executor)     : An executor shared with other pools, 'workers' is its number of processes.
+                                      Default None, pool create its executor.
+    """
+    def __init__(self, function=None, workers=None, window=None, cache=None, cache_params=(), metrics=None,
+                 first_frame=0, executor=None):
+        self.function = function if function else rasterize
+        self.workers = workers if workers and workers > 1 else None
+        self.window = window if window else (2 * self.workers if self.workers else 1)
+        self.shared = executor is not None
+        self.executor = executor if self.shared else start_executor(self.workers)
+        self.cache = cache
+        self.cache_params = cache_params
+        self.metrics = metrics
+        self.first_frame = first_frame
+
+        # Last frame submitted and last raster given, to detect held frames
+        self.previous_frame = None
+        self.previous_raster = None
+
+    def imap(self, frames):
+        """Rasterize all frames, keep at most 'window' frames in flight to have a flat memory.
+
+        Args:
+            frames (iter) : Iterable of svg frames in string.
+
+        Yields:
+            The result of function for each frame, in the same order than frames.
+        """
+        pending = deque()
+        for frame_number, frame in enumerate(frames, self.first_frame):
+            pending.append((*self.submit(frame, frame_number), frame_number))
+            if len(pending) >= self.window:
+                yield self.result(*pending.popleft())
+        while pending:
+            yield self.result(*pending.popleft())
+
+    def submit(self, frame, frame_number=None):
+        """Start the rasterization of a frame.
+
+        Args:
+            frame        (str or FrameData) : The svg frame in string.
+            frame_number (int)              : The number of frame, to record measures. Default None.
+
+        Returns:
+            str, Future or raster : The key in cache if raster need to be cached and the raster or his future.
+                                    Raster is HOLD if frame is the same than previous one.
+        """
+        svg = get_svg(frame)
+        if svg == self.previous_frame:
+            return None, HOLD
+        self.previous_frame = svg
+
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(svg, *self.cache_params)
+            raster = self.cache.get(key)
+            if raster is not None:
+                return None, raster
+
+        if self.metrics is None:
+            if self.executor:
+                return key, self.executor.submit(self.function, frame)
+            return key, self.function(frame)
+
+        # Measure is done where frame is rasterized
+        if self.executor:
+            return key, self.executor.submit(partial(timed_call, self.function), frame)
+        start = perf_counter()
+        raster = self.function(frame)
+        self.metrics.record("rasterize", frame_number, start, perf_counter() - start)
+        return key, raster
+
+    def result(self, key, raster, frame_number=None):
+        """Wait the end of rasterization of a frame and save it on cache.
+
+        Args:
+            key          (str)              : The key in cache, None if raster don't need to be cached.
+            raster       (Future or raster) : The raster or his future.
+            frame_number (int)              : The number of frame, to record measures. Default None.
+
+        Returns:
+            The raster of frame.
+        """
+        if raster is HOLD:
+            return self.previous_raster
+        if isinstance(raster, Future):
+            raster = raster.result()
+            if self.metrics is not None:
+                start, duration, pid, raster = raster
+                self.metrics.record("rasterize", frame_number, start, duration, pid, pid)
+        if key is not None:
+            self.cache.put(key, get_buffer(raster))
+        self.previous_raster = raster
+        return raster
+
+    def close(self):
+        """
+        Stop all processes of pool, a shared executor is stopped by its owner.
+        """
+        if self.executor and not self.shared:
+            self.executor.shutdown()
+            self.executor = None
+
+    # region Override
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    # endregion Override
+
+def imap_pools(pools, frames):
+    """Rasterize the frames of several outputs, each pool rasterize the frames of one output.
+    Like imap of RasterPool, at most 'window' frames are in flight in each pool.
+
+    Args:
+        pools  (list) : The RasterPool of each output.
+        frames (iter) : Iterable of frame number and the list of svg frames, one by output.
+
+    Yields:
+        The list of rasters of each output, for each frame in order.
+    """
+    pending = deque()
+    window = max(pool.window for pool in pools)
+    for frame_number, outputs_frames in frames:
+        pending.append([(*pool.submit(frame, frame_number), frame_number)
+                        for pool, frame in zip(pools, outputs_frames)])
+        if len(pending) >= window:
+            yield [pool.result(*item) for pool, item in zip(pools, pending.popleft())]
+    while pending:
+        yield [pool.result(*item) for pool, item in zip(pools, pending.popleft())]
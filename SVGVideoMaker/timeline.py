@@ -0,0 +1,379 @@
+"""
+Precomputation with numpy of the animations of all elements of a svg.
+Translation, inflation, rotation, opacity and angle translation are linear between two key frames,
+so the increment of each element at each frame is computed for all elements and a block of frames
+in a few operations on arrays, instead of search the key frames of each element at each frame.
+Translation, rotation and opacity only add their increments to an attribute, so the value of this attribute
+at each frame is a cumulative sum of increments, set directly on elements without apply each increment.
+Modifications of polygons are still computed by their animation, they can need to reshape polygons.
+numpy is optional, without it the svg is updated element by element.
+"""
+
+# region Imports
+from numbers import Number
+from SVGVideoMaker.geo.shape import Shape
+from SVGVideoMaker.geo.group import Group
+from SVGVideoMaker.geo.debug import msg, DebugLevel
+from SVGVideoMaker.geo.animation import AnimationType, ModificationAnimation, EllispePartAnimation
+try:
+    import numpy as np
+except ImportError:
+    np = None
+# endregion Imports
+
+# Number of frames computed together, memory of arrays is frames * elements
+CHUNK_FRAMES = 256
+
+# Types computed by timeline in the order of update of Animation, with the function who apply them
+# and the attribute who keep their value, when the function only add increments to it
+TYPES = (
+    (AnimationType.ANGLE_TRANSLATION, "apply_angle_translation", None),
+    (AnimationType.TRANSLATION, "apply_translation", "translation"),
+    (AnimationType.INFLATION, "apply_inflation", None),
+    (AnimationType.ROTATION, "apply_rotation", "rotation"),
+    (AnimationType.OPACITY, "apply_opacity", "opacity"),
+)
+
+def get_animated(group):
+    """Get elements updated by a group, in the order of update.
+
+    Args:
+        group (Group) : The group, can be a svg.
+
+    Yields:
+        The group, its sub groups and all shapes with an animation of group and of its sub groups.
+    """
+    yield group
+    for element in group.group:
+        if isinstance(element, Group):
+            yield from get_animated(element)
+        elif element.animations:
+            yield element
+
+def get_animation(element):
+    """Get the animation of an element.
+
+    Args:
+        element (Shape or Group) : The element.
+
+    Returns:
+        Animation : The animation of shape, or the animation of group itself.
+    """
+    return element.animation if isinstance(element, Group) else element.animations
+
+def get_target(element, name, attribute):
+    """Get the object who keep the value of an animation, if the element apply it by adding increments.
+    Elements who override the function, like ellipses who move their coordinates, apply each increment.
+
+    Args:
+        element   (Shape or Group) : The element.
+        name      (str)            : The name of function of element who apply the animation.
+        attribute (str)            : The attribute who keep the value, None if type isn't a sum of increments.
+
+    Returns:
+        Shape, Group or Style : The object with the attribute, None if increments must be applied.
+    """
+    if attribute is None or getattr(type(element), name, None) not in (getattr(Shape, name), getattr(Group, name)):
+        return None
+    if attribute == "opacity":
+        return element.style
+    return element
+
+def get_notify(element):
+    """Get the function who tell that an element changed.
+
+    Args:
+        element (Shape or Group) : The element.
+
+    Returns:
+        callable : set_dirty for shapes, notify_groups for groups whose transform or style changed.
+    """
+    return element.notify_groups if isinstance(element, Group) else element.set_dirty
+
+def get_numbers(value):
+    if isinstance(value, Number):
+        return value, 0
+    x, y = value.coordinates
+    return x, y
+
+def is_numbers(value):
+    """Check if a value of key frame can be computed in arrays.
+
+    Args:
+        value (AnimationData) : The value.
+
+    Returns:
+        bool : True if value is a number or a point in 2D.
+    """
+    if isinstance(value, Number):
+        return True
+    coordinates = getattr(value, "coordinates", None)
+    return coordinates is not None and len(coordinates) == 2 and all(isinstance(c, Number) for c in coordinates)
+
+def get_unsupported(elements):
+    """Get the first element with a value of key frame who can't be computed by timeline.
+
+    Args:
+        elements (list) : The elements updated by timeline, given by get_animated.
+
+    Returns:
+        Shape or Group : The element, None if all values are numbers or points.
+    """
+    for element in elements:
+        animations = get_animation(element)
+        for anim_type, _, _ in TYPES:
+            if anim_type is AnimationType.ANGLE_TRANSLATION and not isinstance(animations, EllispePartAnimation):
+                continue
+            if not all(is_numbers(segment.delta) for segment in animations.get_compiled(anim_type)):
+                return element
+    return None
+
+class Timeline:
+    """ Increments of animations of all elements of a svg, frame by frame.
+    Each segment between two key frames give the same increment to all its frames, arrays of frames * elements
+    give the index of segment who animate each element at each frame.
+    Translation, rotation and opacity are set to their value at each frame, elements are told once they changed.
+
+    Args:
+        svg       (SVG) : The svg to animate.
+        end_frame (int) : The last frame played, blocks of frames stop at it. Default None, blocks are full.
+    """
+    def __init__(self, svg, end_frame=None):
+        self.elements = list(get_animated(svg))
+        # Polygons who change of shape during the animation
+        self.modified = [element for element in self.elements
+                         if isinstance(element.animations, ModificationAnimation) and
+                         any(frame > 0 for frame in element.animations.anims[AnimationType.MODIFICATION])]
+        self.segments = {anim_type: self.get_segments(anim_type, name, attribute)
+                         for anim_type, name, attribute in TYPES}
+        self.notify = [get_notify(element) for element in self.elements]
+        self.first_frame, self.last_frame = 0, 0
+        self.end_frame = end_frame
+        self.chunk = None
+
+    def get_segments(self, anim_type, name, attribute):
+        """Gather the segments between key frames of all elements for a type of animation,
+        from the segments compiled by their animation.
+
+        Args:
+            anim_type (AnimationType) : The type of animation.
+            name      (str)           : The name of function of element who apply the animation.
+            attribute (str)           : The attribute who keep the value, None if type isn't a sum of increments.
+
+        Returns:
+            dict : The arrays of element, first frame, last frame and increment of each segment,
+                   the function who apply increment of each element and the increment to apply of each segment,
+                   the object who keep the value of each element (None if increments are applied or if element
+                   haven't this type) and the attribute of this object.
+        """
+        elements, starts, ends, rates, increments, apply, targets = [], [], [], [], [], [], []
+        for i, element in enumerate(self.elements):
+            animations = get_animation(element)
+            apply.append(getattr(element, name, None))
+            targets.append(None)
+            if anim_type is AnimationType.ANGLE_TRANSLATION and not isinstance(animations, EllispePartAnimation):
+                continue
+            compiled = animations.get_compiled(anim_type)
+            if compiled:
+                targets[i] = get_target(element, name, attribute)
+            for segment in compiled:
+                elements.append(i)
+                starts.append(max(segment.start + 1, 1))
+                ends.append(segment.end)
+                rates.append(get_numbers(segment.delta))
+                increments.append(segment.delta)
+
+        return {
+            "elements": np.array(elements, dtype=np.int64),
+            "starts": np.array(starts, dtype=np.int64),
+            "ends": np.array(ends, dtype=np.int64),
+            "rates": np.array(rates, dtype=np.float64).reshape(-1, 2),
+            "increments": increments,
+            "apply": apply,
+            "targets": targets,
+            "absolute": np.array([target is not None for target in targets], dtype=bool),
+            "attribute": attribute
+        }
+
+    def get_dense(self, anim_type, first_frame, last_frame):
+        """Get the segment who animate each element at each frame.
+
+        Args:
+            anim_type   (AnimationType) : The type of animation.
+            first_frame (int)           : The first frame.
+            last_frame  (int)           : The frame after the last frame.
+
+        Returns:
+            numpy.ndarray : Array of frames * elements, with the index of segment, -1 when element don't change.
+        """
+        segments = self.segments[anim_type]
+        dense = np.full((last_frame - first_frame, len(self.elements)), -1, dtype=np.int64)
+        starts = np.maximum(segments["starts"], first_frame)
+        ends = np.minimum(segments["ends"], last_frame - 1)
+        lengths = np.maximum(ends - starts + 1, 0)
+        total = int(lengths.sum())
+        if total:
+            # Each frame of each segment, a row of dense array
+            offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+            rows = np.repeat(starts - first_frame, lengths) + np.arange(total) - offsets
+            dense[rows, np.repeat(segments["elements"], lengths)] = np.repeat(np.arange(len(lengths)), lengths)
+        return dense
+
+    def get_increments(self, anim_type, first_frame, last_frame):
+        """Get the increment of each element at each frame.
+        Value of each element at a frame is the sum of increments from the frame 1.
+
+        Args:
+            anim_type   (AnimationType) : The type of animation.
+            first_frame (int)           : The first frame.
+            last_frame  (int)           : The frame after the last frame.
+
+        Returns:
+            numpy.ndarray : Array of frames * elements * 2, second value is only used by points.
+        """
+        dense = self.get_dense(anim_type, first_frame, last_frame)
+        rates = self.segments[anim_type]["rates"]
+        if not len(rates):
+            return np.zeros(dense.shape + (2,))
+        return np.where((dense >= 0)[..., None], rates[np.maximum(dense, 0)], 0)
+
+    def get_base(self, anim_type, columns):
+        """Get the value of elements before the first frame of block, from their attribute.
+
+        Args:
+            anim_type (AnimationType) : The type of animation.
+            columns   (list)          : The index of elements.
+
+        Returns:
+            numpy.ndarray : Array of elements * 2, second value is only used by translation.
+        """
+        segments = self.segments[anim_type]
+        targets, attribute = segments["targets"], segments["attribute"]
+        base = np.zeros((len(columns), 2))
+        for row, i in enumerate(columns):
+            base[row, :] = getattr(targets[i], attribute)
+        return base
+
+    def get_values(self, anim_type, dense):
+        """Get the value of elements who only add increments, at each frame.
+        Value is the cumulative sum of increments from the value before the first frame, like the sum done by
+        each increment. Opacity is rounded at each frame, so it's summed frame by frame.
+
+        Args:
+            anim_type (AnimationType) : The type of animation.
+            dense     (numpy.ndarray) : The segment who animate each element at each frame, given by get_dense.
+
+        Returns:
+            numpy.ndarray, numpy.ndarray, numpy.ndarray : The index of elements, arrays of frames * elements who
+                                                          indicate if element change and its value at each frame.
+        """
+        segments = self.segments[anim_type]
+        columns = np.flatnonzero(segments["absolute"])
+        dense = dense[:, columns]
+        changed = dense >= 0
+        base = self.get_base(anim_type, columns)
+        rates = segments["rates"]
+
+        if anim_type is AnimationType.OPACITY:
+            rates = rates[:, 0]
+            current = base[:, 0]
+            sums = np.empty(dense.shape)
+            for row, (segment, animated) in enumerate(zip(dense, changed)):
+                animated = np.flatnonzero(animated)
+                current[animated] = round_opacity(current[animated] + rates[segment[animated]])
+                sums[row] = current
+            return columns, changed, sums
+
+        increments = np.where(changed[..., None], rates[np.maximum(dense, 0)], 0)
+        sums = np.cumsum(np.concatenate((base[None], increments)), axis=0)[1:]
+        if anim_type is not AnimationType.TRANSLATION:
+            sums = sums[..., 0]
+        return columns, changed, sums
+
+    def compute(self, frame):
+        """Compute the animated elements of the block of frames who begin at 'frame'.
+        Elements need to be at the state of previous frame, it's the base of values.
+
+        Args:
+            frame (int) : The first frame of block.
+        """
+        self.first_frame, self.last_frame = frame, frame + CHUNK_FRAMES
+        if self.end_frame is not None:
+            self.last_frame = max(frame + 1, min(self.last_frame, self.end_frame + 1))
+        self.chunk = []
+        for anim_type, _, _ in TYPES:
+            segments = self.segments[anim_type]
+            dense = self.get_dense(anim_type, self.first_frame, self.last_frame)
+            applied = ~segments["absolute"]
+            rows = []
+            for row in dense:
+                animated = np.flatnonzero((row >= 0) & applied)
+                rows.append((animated.tolist(), row[animated].tolist()))
+            values = self.get_values(anim_type, dense) if segments["absolute"].any() else None
+            self.chunk.append((segments, rows, values))
+
+    def update(self, frame):
+        """Apply the increments of 'frame' on elements, like update of svg.
+        Animation need to be at the state of previous frame.
+
+        Args:
+            frame (int) : The frame number.
+        """
+        if not self.first_frame <= frame < self.last_frame:
+            self.compute(frame)
+        for element in self.modified:
+            element.animations.current_frame = frame
+            element.animations.update_modification()
+
+        row = frame - self.first_frame
+        changed = set()
+        for segments, rows, values in self.chunk:
+            apply, increments = segments["apply"], segments["increments"]
+            for i, segment in zip(*rows[row]):
+                apply[i](increments[segment])
+            if values is not None:
+                columns, animated, sums = values
+                animated = np.flatnonzero(animated[row])
+                targets, attribute = segments["targets"], segments["attribute"]
+                elements = columns[animated].tolist()
+                for i, value in zip(elements, sums[row, animated].tolist()):
+                    setattr(targets[i], attribute, value)
+                changed.update(elements)
+        for i in changed:
+            self.notify[i]()
+
+def round_opacity(values):
+    """Round opacities like round(value, 3) of apply_opacity.
+    numpy round the value multiplied by 1000, it differ from python only when this product is near a half,
+    these values are rounded by python.
+
+    Args:
+        values (numpy.ndarray) : The opacities.
+
+    Returns:
+        numpy.ndarray : The rounded opacities.
+    """
+    scaled = values * 1000
+    rounded = np.rint(scaled) / 1000
+    for i in np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6).tolist():
+        rounded[i] = round(float(values[i]), 3)
+    return rounded
+
+def get_timeline(svg, end_frame=None):
+    """Create the timeline of a svg.
+
+    Args:
+        svg       (SVG) : The svg to animate.
+        end_frame (int) : The last frame played. Default None.
+
+    Returns:
+        Timeline : The timeline, None if numpy isn't installed or if values of key frames aren't numbers or points.
+    """
+    if np is None:
+        return None
+    unsupported = get_unsupported(list(get_animated(svg)))
+    if unsupported is not None:
+        msg(f"Values of key frames of {get_animation(unsupported).get_name()} aren't numbers or points, "
+            f"svg is updated element by element", DebugLevel.VERBOSE)
+        return None
+    return Timeline(svg, end_frame)
@@ -4,23 +4,24 @@ Necessary to make simple video
 
 # region Imports
 import os
-from enum import Enum
 from getpass import getuser
 from cairosvg import svg2png
-from subprocess import Popen, PIPE
+from tempfile import TemporaryDirectory
 from math import ceil
-from SVGVideoMaker.geo.debug import msg, DebugLevel
+from time import perf_counter
+from SVGVideoMaker.geo.debug import msg, DebugLevel, is_debug, get_debug, set_debug
+from SVGVideoMaker.raster import RasterPool, rasterize, encode_svg, compress_svg, get_buffer, get_raw_function, \
+    start_executor, imap_pools
+from SVGVideoMaker.pipeline import prefetch, RasterWriter, FileWriter
+from SVGVideoMaker.encoder import Format, Encoder, get_profile, get_input_options, get_concat_options
+from SVGVideoMaker.metrics import RenderReport
+from SVGVideoMaker.damage import DamageTracker, DamageRenderer, track_damages
+from SVGVideoMaker.layers import split_layers, get_static_layers, track_layers, LayerRenderer
+from SVGVideoMaker.output import OutputSpec, get_branches
+from SVGVideoMaker.incremental import SEGMENT_SECONDS, RenderManifest, get_segments, hash_frame
+from SVGVideoMaker.timeline import get_timeline
 # endregion Imports
 
-class Format(Enum):
-    """
-    Enumeration of different format (Picture, Video)
-    """
-    PNG = "png"
-    SVG = "svg"
-    MP4 = "mp4"
-    GIF = "gif"
-
 class Video:
     """ Instantiate a Video Maker.
 
@@ -31,6 +32,9 @@ class Video:
         fps     (int) : number of frames per seconds
     """
     file_count = 0
+    # Default stride and scale of draft videos
+    DRAFT_STRIDE = 2
+    DRAFT_SCALE = 0.5
 
     def __init__(self, svg, width=500, height=500, fps=30):
         self.svg = svg
@@ -43,20 +47,52 @@ class Video:
         self.height = height
         self.svg.set_size(width, height)
 
-    def make_movie(self, start=None, end=None):
-        """Generator who return all svg in string for each frame.
+    def get_frames_range(self, start=None, end=None):
+        """Get the first and the last frame of movie.
 
         Args:
             start (int): Begin of movie in seconds.
             end   (int): End of movie in seconds.
 
+        Returns:
+            int, int : The first and the last frame.
+        """
+        start_frame = ceil(start) * self.fps if start else 0
+        end_frame = ceil(end) * self.fps if end else self.svg.get_nb_frames()
+        return start_frame, end_frame
+
+    def check_raw(self, raw):
+        """Check if frames can be send to ffmpeg in raw pixels.
+        Raw pixels of cairo are premultiplied by alpha and ffmpeg read them as straight alpha,
+        so semi transparent pixels would be darker than with png. Raw mode need a background color.
+        Borders of a view box with an other ratio than video stay transparent.
+
+        Args:
+            raw (bool) : Frames are send in raw pixels.
+
+        Raises:
+            ValueError : If raw and svg have no background color.
+        """
+        if raw and not self.svg.background_color:
+            raise ValueError("Raw pixels are premultiplied by alpha, raw mode need a background color, "
+                             "see SVG.set_background_color")
+
+    def play(self, start=None, end=None, metrics=None, timeline=True):
+        """Generator who update the svg for each frame.
+
+        Args:
+            start    (int)          : Begin of movie in seconds.
+            end      (int)          : End of movie in seconds.
+            metrics  (RenderReport) : The report where record time of update. Default None, no measure.
+            timeline (bool)         : Update elements from increments precomputed with numpy for all frames,
+                                      if numpy is installed. Default True.
+
         Yields:
-            All svg frames in string with the frame number
+            The frame number, when svg is at the state of this frame
         """
 
         # Prepare the size of movie
-        start_frame = ceil(start) * self.fps if start else 0
-        end_frame = ceil(end) * self.fps if end else self.svg.get_nb_frames()
+        start_frame, end_frame = self.get_frames_range(start, end)
 
         # Inform the different key animation
         msg(self.svg.get_keys_animations(), DebugLevel.VERBOSE)
@@ -64,12 +100,23 @@ class Video:
         # Encapsulate generator in try to reset animation
         # if the generator was break
         try:
-            self.svg.init_animation()
+            if start_frame:
+                # Go directly to the frame before start
+                self.svg.state_at(start_frame - 1)
+            else:
+                self.svg.init_animation()
+            timeline = get_timeline(self.svg, end_frame) if timeline else None
+            update = timeline.update if timeline else lambda frame: self.svg.update()
             # Around max time to sup value
             for i in range(start_frame, end_frame + 1):
                 msg(f"Compute frame {i}", DebugLevel.VERBOSE)
-                self.svg.update()
-                yield i, self.svg.get_svg()
+                if metrics is None:
+                    update(i)
+                else:
+                    start_update = perf_counter()
+                    update(i)
+                    metrics.record("update", i, start_update, perf_counter() - start_update)
+                yield i
         except GeneratorExit:
             # Reset animation when generator was break
             self.svg.reset()
@@ -77,35 +124,614 @@ class Video:
         # Normal reset
         self.svg.reset()
 
-    def save_movie(self, start=None, end=None, path="./", name="out", ext="mp4"):
+    def make_movie(self, start=None, end=None, metrics=None):
+        """Generator who return all svg in string for each frame.
+
+        Args:
+            start   (int)          : Begin of movie in seconds.
+            end     (int)          : End of movie in seconds.
+            metrics (RenderReport) : The report where record time of update and get_svg. Default None, no measure.
+
+        Yields:
+            All svg frames in string with the frame number
+        """
+        for i in self.play(start, end, metrics):
+            if metrics is None:
+                yield i, self.svg.get_svg()
+                continue
+
+            start_svg = perf_counter()
+            frame = self.svg.get_svg()
+            metrics.record("get_svg", i, start_svg, perf_counter() - start_svg)
+            metrics.record_svg_size(i, len(frame))
+            yield i, frame
+
+    def make_draft(self, output, start=None, end=None, stride=1, metrics=None, first_frame=0):
+        """Generator who return one svg frame on 'stride', drawn for an output.
+        With a stride, each frame is computed directly from key frames, without compute skipped frames.
+
+        Args:
+            output      (OutputSpec)   : The output of frames, with its size and view box.
+            start       (int)          : Begin of movie in seconds.
+            end         (int)          : End of movie in seconds.
+            stride      (int)          : Keep one frame on 'stride'. Default 1, all frames.
+            metrics     (RenderReport) : The report where record time of frames. Default None, no measure.
+            first_frame (int)          : The number of first frame given, to record measures. Default 0.
+
+        Yields:
+            The svg frames in string with their number in movie
+        """
+        if stride == 1:
+            frames = self.play(start, end)
+        else:
+            start_frame, end_frame = self.get_frames_range(start, end)
+            frames = range(start_frame, end_frame + 1, stride)
+        for j, i in enumerate(frames, first_frame):
+            start_svg = perf_counter()
+            frame = output.get_svg(self.svg) if stride == 1 else self.render_frame(i, output)
+            if metrics is not None:
+                metrics.record("get_svg", j, start_svg, perf_counter() - start_svg)
+                metrics.record_svg_size(j, len(frame))
+            yield i, frame
+
+    def make_outputs(self, outputs, start=None, end=None):
+        """Generator who return the svg of each output for each frame.
+        Each frame is computed once for all outputs, only the size and the view box change between outputs.
+
+        Args:
+            outputs (list) : The OutputSpec of each output.
+            start   (int)  : Begin of movie in seconds.
+            end     (int)  : End of movie in seconds.
+
+        Yields:
+            The frame number with the list of svg frames in string, one by output
+        """
+        for i in self.play(start, end):
+            # Elements are computed by the first output, and reused by the others
+            yield i, [output.get_svg(self.svg, reuse=j > 0) for j, output in enumerate(outputs)]
+
+    def save_movie(self, start=None, end=None, path="./", name="out", ext="mp4", workers=None, raw=False,
+                   cache=None, vfr=False, pipeline=None, profile=None, palette=None, metrics=None, dirty=False,
+                   layers=False, progress=None):
         """Make a video file from svg and all the key frame.
+        Frames are computed in order on main process, because update of svg depend of previous frame,
+        but can be rasterized on a pool of 'workers' processes.
+        In raw mode, frames are send to ffmpeg in raw pixels instead of png, to skip png compression,
+        the svg need a background color, see check_raw.
+        With a cache, frames who are in cache since a previous render aren't rasterized.
+        A frame identical to the previous one is never rasterized again. With variable frame rate,
+        it isn't encoded again too, ffmpeg receive each different frame once with his duration.
+        With a pipeline, computation of frames, rasterization and writing to ffmpeg run concurrently.
+        Encoding options are given by the profile of format. For a gif, the color palette is computed
+        before encoding from some frames, so frames are send to ffmpeg without buffering all the video.
+        With metrics, time of each stage is recorded for each frame, see RenderReport.
+        In dirty mode, only regions where elements change are rasterized again on the previous frame,
+        so rasterization is done on main process, in frame order, without cache.
+        With layers, elements who never change are rasterized once, frames rasterize only animated elements.
+        For a fast draft of video, see preview.
 
         Args:
-            start (int): Begin of movie in seconds.
-            end   (int): End of movie in seconds.
-            path  (str) : The path where you save video. Default "./".
-            name  (str) : The name of video. Default "out".
-            ext   (str) : The extension of your video. Default mp4.
+            start    (int)             : Begin of movie in seconds.
+            end      (int)             : End of movie in seconds.
+            path     (str)             : The path where you save video. Default "./".
+            name     (str)             : The name of video. Default "out".
+            ext      (str)             : The extension of your video. Default mp4.
+            workers  (int)             : Number of processes to rasterize frames. Default None, on main process.
+            raw      (bool)            : Send raw pixels to ffmpeg instead of png. Default False.
+            cache    (FrameCache)      : The cache of rasterized frames. Default None, no cache.
+            vfr      (bool)            : Encode held frames once with their duration. Default False.
+            pipeline (int)             : Number of frames in queues between stages of pipeline.
+                                         Default None, stages run one after the other.
+            profile  (EncodingProfile) : The encoding options. Default None, profile of format 'ext'.
+            palette  (str)             : The path of color palette. If file exist it's reused, otherwise it's
+                                         created to be reused by next renders. Default None, temporary palette.
+            metrics  (RenderReport)    : The report where record time of each stage. If True, a new report is
+                                         created. Default None, no measure.
+            dirty    (bool)            : Rasterize only regions who change between frames. Default False.
+            layers   (bool)            : Rasterize once elements who never change. Default False.
+                                         Need a fixed view box.
+            progress (callable)        : Function called with the Encoder at each progress of ffmpeg,
+                                         and when ffmpeg stall. Default None.
+
+        Returns:
+            RenderReport : The report of render, None without metrics.
+
+        Raises:
+            ValueError : If options can't be used together, dirty mode with workers, a cache or layers,
+                         raw pixels with vfr (held frames are given to ffmpeg with png files),
+                         or layers without a fixed view box. If raw and svg have no background color.
+        """
+        self.check_raw(raw)
+        if dirty and workers and workers > 1:
+            raise ValueError("Dirty mode rasterize each frame on the previous one, it can't use workers")
+        if dirty and cache is not None:
+            raise ValueError("Dirty mode rasterize only regions of frames, it can't use a cache")
+        if dirty and layers:
+            raise ValueError("Dirty mode and layers can't be used together")
+        if vfr and raw:
+            raise ValueError("Held frames are given to ffmpeg with png files, vfr can't use raw pixels")
+        if layers and not (self.svg.start_vb and self.svg.end_vb):
+            raise ValueError("Layers need a fixed view box, see SVG.set_view_box")
+
+        profile = profile if profile else get_profile(ext)
+        start_frame, end_frame = self.get_frames_range(start, end)
+        metrics = RenderReport() if metrics is True else (metrics if metrics else None)
+        if metrics is not None and metrics.total_frames is None:
+            metrics.total_frames = end_frame - start_frame + 1
+
+        svg_layers = split_layers(self.svg) if layers else None
+        if dirty:
+            # Each raster is drawn on the previous one
+            function = DamageRenderer(self.width, self.height, raw)
+        elif svg_layers:
+            function = LayerRenderer(get_static_layers(self.svg, svg_layers), self.width, self.height, raw,
+                                     copy=bool(workers))
+        else:
+            function = get_raw_function(self.width, self.height, workers) if raw else None
+        cache_params = (self.width, self.height, "raw" if raw else Format.PNG.value)
+        # Pool is created before ffmpeg processes and threads of pipeline, so his processes don't share them
+        pool = RasterPool(function, workers=workers, cache=cache, cache_params=cache_params, first_frame=start_frame)
+
+        with TemporaryDirectory() as directory:
+            try:
+                palette = self.prepare_palette(pool, profile, palette, directory, start, end, raw)
+                # Frames of palette aren't measured, they aren't frames of video
+                pool.metrics = metrics
+
+                # Computation of frames is the first stage of pipeline
+                movie = self.make_movie(start, end, metrics)
+                if dirty:
+                    movie = track_damages(movie, DamageTracker(self.svg, self.width, self.height))
+                elif svg_layers:
+                    movie = track_layers(movie, self.svg, svg_layers)
+                self.encode_movie(movie, pool, f"{path}{name}.{ext}", profile, directory, self.width, self.height,
+                                  self.fps, raw, vfr, pipeline, palette, metrics, start_frame, progress)
+                return self.finish_metrics(metrics)
+            finally:
+                pool.close()
+
+    def preview(self, stride=DRAFT_STRIDE, scale=DRAFT_SCALE, start=None, end=None, path="./", name="preview",
+                ext="mp4", workers=None, raw=False):
+        """Make quickly a draft video, to check animations before the final render.
+        Only one frame on 'stride' is computed, directly from key frames, and rasterized at a reduced size,
+        with the fastest encoding profile and without visual debug of elements.
+        The frame rate is divided by 'stride' to keep the duration.
+
+        Args:
+            stride  (int)   : Keep one frame on 'stride'. Default DRAFT_STRIDE.
+            scale   (float) : Scale of size of video. Default DRAFT_SCALE.
+            start   (int)   : Begin of movie in seconds.
+            end     (int)   : End of movie in seconds.
+            path    (str)   : The path where you save video. Default "./".
+            name    (str)   : The name of video. Default "preview".
+            ext     (str)   : The extension of your video. Default mp4.
+            workers (int)   : Number of processes to rasterize frames. Default None, on main process.
+            raw     (bool)  : Send raw pixels to ffmpeg instead of png. Default False.
+
+        Returns:
+            str : The path of video.
+
+        Raises:
+            ValueError : If raw and svg have no background color.
+        """
+        self.check_raw(raw)
+        profile = get_profile(ext, draft=True)
+        width, height = max(1, round(self.width * scale)), max(1, round(self.height * scale))
+        fps = self.fps / stride if self.fps % stride else self.fps // stride
+        # Frames are drawn for the size of draft
+        output = OutputSpec(width, height)
+        function = get_raw_function(width, height, workers) if raw else None
+        pool = RasterPool(function, workers=workers)
+
+        # Visual debug of elements isn't drawn in draft
+        debug_level = get_debug()
+        if is_debug(DebugLevel.VISUAL):
+            set_debug(DebugLevel.VERBOSE)
+
+        with TemporaryDirectory() as directory:
+            try:
+                palette = self.prepare_palette(pool, profile, None, directory, start, end, raw, output)
+                movie = self.make_draft(output, start, end, stride)
+                self.encode_movie(movie, pool, f"{path}{name}.{ext}", profile, directory, width, height, fps, raw,
+                                  palette=palette)
+            finally:
+                pool.close()
+                set_debug(debug_level)
+        return f"{path}{name}.{ext}"
+
+    def encode_movie(self, movie, pool, output, profile, directory, width, height, fps, raw=False, vfr=False,
+                     pipeline=None, palette=None, metrics=None, first_frame=0, progress=None):
+        """Rasterize the frames of a movie and encode them with ffmpeg in a video file.
+
+        Args:
+            movie       (iter)            : Iterable of frame number and svg frame, like make_movie.
+            pool        (RasterPool)      : The pool to rasterize frames.
+            output      (str)             : The path of video.
+            profile     (EncodingProfile) : The encoding options.
+            directory   (str)             : A temporary directory, for held frames of vfr.
+            width       (int)             : Width of frames in px.
+            height      (int)             : Height of frames in px.
+            fps         (float)           : Number of frames per seconds of video.
+            raw         (bool)            : The pool give raw pixels instead of png. Default False.
+            vfr         (bool)            : Encode held frames once with their duration. Default False.
+            pipeline    (int)             : Number of frames in queues between stages of pipeline. Default None.
+            palette     (str)             : The path of color palette, if profile need one. Default None.
+            metrics     (RenderReport)    : The report where record time of each stage. Default None, no measure.
+            first_frame (int)             : The number of first frame, to record measures. Default 0.
+            progress    (callable)        : Function called with the Encoder at each progress of ffmpeg,
+                                            and when ffmpeg stall. Default None.
         """
+        frames = prefetch((frame for _, frame in movie), pipeline)
+
+        if vfr:
+            concat = save_hold_frames(pool.imap(frames), directory, fps, metrics, first_frame)
+            cmd = [
+                "ffmpeg",
+                "-y",  # Overwrite output file if exist
+                *get_concat_options(concat),  # Input is list of frames with duration
+                *profile.get_options(palette),
+                "-vsync", "vfr",  # Keep timestamps of input
+                output
+            ]
+            Encoder(cmd, stdin=False, callback=progress).close()
+            return
 
         # Prepare command to write video
         cmd = [
             "ffmpeg",
             "-y",  # Overwrite output file if exist
-            "-s", f"{self.width}x{self.height}",  # Size
-            "-r", f"{self.fps}",  # fps
-            "-i", "-",  # input come from a pipe like that "exec | ffmpeg"
-            "-filter_complex",  # filter to make a higer quality color palette
-            "[0:v] split [a][b];[a] palettegen [p];[b][p] paletteuse",
+            *get_input_options(width, height, fps, raw),
+            *profile.get_options(palette),
+            output
+        ]
+        encode(cmd, pool.imap(frames), pipeline, metrics, first_frame, progress)
+
+    def save_outputs(self, outputs, start=None, end=None, workers=None, raw=False, cache=None, pipeline=None,
+                     split=False, progress=None, executor=None):
+        """Make several video files with one computation of frames.
+        Each frame is computed once, and drawn for each output with its size and its view box.
+        Each output is rasterized and encoded separately, except with split, where outputs with the same view box
+        and the same ratio of size are rasterized once at the biggest size and scaled by ffmpeg.
+
+        Args:
+            outputs  (list)       : The OutputSpec of each output.
+            start    (int)        : Begin of movie in seconds.
+            end      (int)        : End of movie in seconds.
+            workers  (int)        : Number of processes to rasterize frames, shared by all outputs.
+                                    Default None, on main process.
+            raw      (bool)       : Send raw pixels to ffmpeg instead of png. Default False.
+            cache    (FrameCache) : The cache of rasterized frames. Default None, no cache.
+            pipeline (int)        : Number of frames in queues between stages of pipeline.
+                                    Default None, stages run one after the other.
+            split    (bool)       : Rasterize once outputs who differ only by their size. Default False.
+            progress (callable)   : Function called with the Encoder of an output at each progress of ffmpeg,
+                                    and when ffmpeg stall. Default None.
+            executor (Executor)   : The 'workers' processes to rasterize frames, shared with other renders.
+                                    Default None, created from workers.
+
+        Raises:
+            ValueError : If raw and svg have no background color.
+        """
+        self.check_raw(raw)
+        for output in outputs:
+            output.set_default_size(self.width, self.height)
+        branches = get_branches(outputs, split)
+        start_frame, _ = self.get_frames_range(start, end)
+
+        # Processes are created before ffmpeg processes and threads of pipeline, so they don't share them
+        shared = executor is not None
+        if not shared:
+            executor = start_executor(workers)
+        pools = []
+        for branch in branches:
+            function = get_raw_function(branch.width, branch.height, workers) if raw else None
+            cache_params = (branch.width, branch.height, "raw" if raw else Format.PNG.value)
+            pools.append(RasterPool(function, workers=workers, cache=cache, cache_params=cache_params,
+                                    first_frame=start_frame, executor=executor))
+
+        with TemporaryDirectory() as directory:
+            try:
+                commands = []
+                for i, (branch, pool) in enumerate(zip(branches, pools)):
+                    output = branch.spec
+                    palette = self.prepare_palette(pool, output.profile, output.palette, directory, start, end, raw,
+                                                   output, f"palette{i}")
+                    commands.append(branch.get_command(self.fps, raw, palette))
+
+                frames = prefetch(self.make_outputs([branch.spec for branch in branches], start, end), pipeline)
+                encode_all(commands, imap_pools(pools, frames), pipeline, progress=progress)
+            finally:
+                for pool in pools:
+                    pool.close()
+                if executor and not shared:
+                    executor.shutdown()
+
+    def save_incremental(self, start=None, end=None, path="./", name="out", ext="mp4", workers=None, raw=False,
+                         pipeline=None, profile=None, segment=None):
+        """Make a video file, rasterize and encode only frames who change since the previous render.
+        Video is encoded in segments, kept in directory "name.segments" with a manifest of hash of each frame.
+        All frames are computed, but a segment is rasterized and encoded only if one of his frames change,
+        then segments are spliced in the video without encode them again.
+
+        Args:
+            start    (int)             : Begin of movie in seconds.
+            end      (int)             : End of movie in seconds.
+            path     (str)             : The path where you save video. Default "./".
+            name     (str)             : The name of video. Default "out".
+            ext      (str)             : The extension of your video. Default mp4.
+            workers  (int)             : Number of processes to rasterize frames. Default None, on main process.
+            raw      (bool)            : Send raw pixels to ffmpeg instead of png. Default False.
+            pipeline (int)             : Number of rasters waiting to be written to ffmpeg.
+                                         Default None, write without thread.
+            profile  (EncodingProfile) : The encoding options. Default None, profile of format 'ext'.
+                                         Profile with a palette can't be spliced.
+            segment  (int)             : Number of frames of each segment. Default None, SEGMENT_SECONDS of video.
+
+        Returns:
+            list : The first and the last frame of each segment rendered again.
+
+        Raises:
+            ValueError : If profile need a palette, or if raw and svg have no background color.
+        """
+        self.check_raw(raw)
+        profile = profile if profile else get_profile(ext)
+        if profile.palette:
+            raise ValueError(f"Segments of {ext} video can't be spliced, palette is computed on all the video")
+        segment = segment if segment else SEGMENT_SECONDS * self.fps
+
+        params = {"width": self.width, "height": self.height, "fps": self.fps, "ext": ext, "segment": segment,
+                  "profile": repr(profile)}
+        manifest = RenderManifest(f"{path}{name}.segments", params)
+        function = get_raw_function(self.width, self.height, workers) if raw else None
+        pool = RasterPool(function, workers=workers)
+
+        try:
+            starts, rendered = [], []
+            for start_frame, end_frame, frames in get_segments(self.make_movie(start, end), segment):
+                starts.append(start_frame)
+                hashes = [hash_frame(frame) for frame in frames]
+                if manifest.is_valid(start_frame, end_frame, hashes):
+                    continue
+
+                msg(f"Render segment {start_frame}-{end_frame}", DebugLevel.VERBOSE)
+                file = f"{start_frame:08d}.{ext}"
+                # Each segment is encoded alone, so it begin with a key frame and can be spliced
+                cmd = [
+                    "ffmpeg",
+                    "-y",  # Overwrite output file if exist
+                    *get_input_options(self.width, self.height, self.fps, raw),
+                    *profile.get_options(),
+                    manifest.get_path(file)
+                ]
+                encode(cmd, pool.imap(frames), pipeline)
+                manifest.add(start_frame, end_frame, hashes, file)
+                manifest.save()
+                rendered.append((start_frame, end_frame))
+        finally:
+            pool.close()
+
+        manifest.keep(starts)
+        manifest.save()
+        cmd = [
+            "ffmpeg",
+            "-y",  # Overwrite output file if exist
+            *get_concat_options(manifest.save_concat(starts)),
+            "-c", "copy",  # Splice segments without encode them again
             f"{path}{name}.{ext}"
         ]
+        Encoder(cmd, stdin=False).close()
+        return rendered
 
-        pipe = Popen(cmd, stdin=PIPE, stderr=PIPE) # Start video compilation with command
-        # Display bytestream on stdin to pass at ffmpeg
-        for _, frame in self.make_movie(start, end):
-            pipe.stdin.write(svg2png(frame))
-        pipe.stdin.close()
-        pipe.wait()
+    @staticmethod
+    def finish_metrics(metrics):
+        """Mark the end of render in report.
+
+        Args:
+            metrics (RenderReport) : The report of render, can be None.
+
+        Returns:
+            RenderReport : The report.
+        """
+        if metrics is not None:
+            metrics.finish()
+            msg(f"{metrics}", DebugLevel.VERBOSE)
+        return metrics
+
+    def prepare_palette(self, pool, profile, palette, directory, start=None, end=None, raw=False, output=None,
+                        name="palette"):
+        """Get the color palette of movie if the profile need one, compute it if it doesn't exist yet.
+
+        Args:
+            pool      (RasterPool)      : The pool to rasterize frames.
+            profile   (EncodingProfile) : The encoding options.
+            palette   (str)             : The path of palette, reused if it exist. None for a temporary palette.
+            directory (str)             : The directory of temporary palette.
+            start     (int)             : Begin of movie in seconds.
+            end       (int)             : End of movie in seconds.
+            raw       (bool)            : The pool give raw pixels instead of png.
+            output    (OutputSpec)      : The output of frames. Default None, frames of video.
+            name      (str)             : The name of temporary palette. Default "palette".
+
+        Returns:
+            str : The path of palette, None if profile don't need a palette.
+        """
+        if not profile.palette:
+            return None
+        palette = palette if palette else os.path.join(directory, f"{name}.{Format.PNG.value}")
+        if not os.path.exists(palette):
+            self.save_palette(pool, palette, profile.palette_samples, start, end, raw, output)
+        return palette
+
+    def save_palette(self, pool, path, samples, start=None, end=None, raw=False, output=None):
+        """Compute the color palette of movie from some frames, for gif encoding.
+        Frames are sampled on all the movie and computed directly, without compute others frames.
+
+        Args:
+            pool    (RasterPool) : The pool to rasterize frames.
+            path    (str)        : The path where you save palette.
+            samples (int)        : Number of frames to use.
+            start   (int)        : Begin of movie in seconds.
+            end     (int)        : End of movie in seconds.
+            raw     (bool)       : The pool give raw pixels instead of png.
+            output  (OutputSpec) : The output of frames. Default None, frames of video.
+        """
+        start_frame, end_frame = self.get_frames_range(start, end)
+        step = max(1, (end_frame - start_frame + 1) // samples)
+        frames = (self.render_frame(i, output) for i in range(start_frame, end_frame + 1, step))
+        width, height = output.get_size() if output else (self.width, self.height)
+
+        cmd = [
+            "ffmpeg",
+            "-y",  # Overwrite output file if exist
+            *get_input_options(width, height, self.fps, raw),
+            "-vf", "palettegen",
+            path
+        ]
+        encode(cmd, pool.imap(frames))
+
+    def save_frames(self, path="./", ext=Format.PNG, start=None, end=None, workers=None, name="frame", batch=16):
+        """Save each frame of movie in a numbered file, like "frame00042.png".
+        Frames are computed in one pass, rasterized or compressed on a pool of 'workers' processes,
+        and written by batch in a thread.
+
+        Args:
+            path    (str)           : The path where you save frames. Default "./".
+            ext     (Format or str) : The extension of files, png, svg or svgz (svg compressed). Default png.
+            start   (int)           : Begin of movie in seconds.
+            end     (int)           : End of movie in seconds.
+            workers (int)           : Number of processes to rasterize or compress frames.
+                                      Default None, on main process.
+            name    (str)           : The prefix of name of files. Default "frame".
+            batch   (int)           : Number of files given together to the writing thread. Default 16.
+
+        Returns:
+            list : The path of each file, in order of frames.
+        """
+        ext = ext.value if isinstance(ext, Format) else ext
+        functions = {
+            Format.PNG.value: rasterize,
+            Format.SVG.value: encode_svg,
+            Format.SVGZ.value: compress_svg,
+        }
+        if ext not in functions:
+            raise ValueError(f"Frames can't be saved in {ext}, only in {', '.join(functions)}")
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        start_frame, end_frame = self.get_frames_range(start, end)
+        digits = max(5, len(str(end_frame)))
+        # Encoding of svg is too fast to be sent to other processes
+        pool = RasterPool(functions[ext], workers=workers if ext != Format.SVG.value else None)
+        paths = []
+        try:
+            with FileWriter(batch) as writer:
+                rasters = pool.imap(frame for _, frame in self.make_movie(start, end))
+                for frame_number, raster in enumerate(rasters, start_frame):
+                    file = f"{path}{name}{str(frame_number).zfill(digits)}.{ext}"
+                    writer.write(file, get_buffer(raster))
+                    paths.append(file)
+        finally:
+            pool.close()
+        return paths
+
+    def render_frame(self, frame_number=-1, output=None):
+        """Compute the svg of frame 'frame_number' directly from key frames, without compute previous frames.
+
+        Args:
+            frame_number (int)        : The number of frame to compute. Default is last frame (-1).
+            output       (OutputSpec) : The output of frame, with its size and view box. Default None, video.
+
+        Returns:
+            str : The svg of frame in string.
+        """
+        last_frame = self.svg.get_nb_frames()
+        if last_frame < 0:
+            # The movie have no frame
+            raise Exception(f"Can't render frame {frame_number} if movie have no frame")
+
+        self.svg.state_at(last_frame if frame_number == -1 else frame_number)
+        frame = output.get_svg(self.svg) if output else self.svg.get_svg()
+        self.svg.reset()
+        return frame
+
+    def frames_at(self, frame_numbers, output=None):
+        """Compute the svg of several frames, in one pass on the movie.
+        Animation is played once until the last frame asked, each frame asked is captured on the way.
+
+        Args:
+            frame_numbers (list)       : The numbers of frames to compute, in any order. -1 is the last frame.
+            output        (OutputSpec) : The output of frames, with its size and view box. Default None, video.
+
+        Returns:
+            list : The svg of each frame in string, in the order of frame_numbers.
+        """
+        last_frame = self.svg.get_nb_frames()
+        if last_frame < 0:
+            # The movie have no frame
+            raise Exception(f"Can't render frames {frame_numbers} if movie have no frame")
+        numbers = [last_frame if frame_number == -1 else frame_number for frame_number in frame_numbers]
+        for frame_number in numbers:
+            if not 0 <= frame_number <= last_frame:
+                raise ValueError(f"Frame {frame_number} isn't in movie, frames are between 0 and {last_frame}")
+        if not numbers:
+            return []
+
+        wanted, last_wanted, frames = set(numbers), max(numbers), {}
+        playing = self.play()
+        try:
+            for i in playing:
+                if i in wanted:
+                    frames[i] = output.get_svg(self.svg) if output else self.svg.get_svg()
+                if i >= last_wanted:
+                    break
+        finally:
+            # Reset animation
+            playing.close()
+        return [frames[frame_number] for frame_number in numbers]
+
+    def poster_sheet(self, frame_numbers=None, count=12, columns=4, width=None, gap=4, path=None, name="poster",
+                     ext=Format.SVG):
+        """Compute a poster sheet, a grid of thumbnails of some frames, in one pass on the movie.
+        Each thumbnail is a svg frame nested in the svg of sheet.
+
+        Args:
+            frame_numbers (list)          : The numbers of frames to display. Default None, 'count' frames spread
+                                            on all the movie.
+            count         (int)           : Number of frames, if frame_numbers isn't given. Default 12.
+            columns       (int)           : Number of thumbnails by row. Default 4.
+            width         (int)           : Width of sheet in px. Default None, width of video.
+            gap           (int)           : Space between thumbnails in px. Default 4.
+            path          (str)           : The path where you save sheet. Default None, sheet isn't saved.
+            name          (str)           : The name of sheet. Default "poster".
+            ext           (Format or str) : The extension of sheet (SVG or PNG). Default "svg".
+
+        Returns:
+            str : The svg of sheet in string.
+        """
+        if frame_numbers is None:
+            last_frame = self.svg.get_nb_frames()
+            count = max(1, min(count, last_frame + 1))
+            frame_numbers = [round(i * last_frame / max(1, count - 1)) for i in range(count)]
+
+        width = width if width else self.width
+        columns = max(1, min(columns, len(frame_numbers)))
+        thumb_width = max(1, (width - gap * (columns + 1)) // columns)
+        thumb_height = max(1, round(thumb_width * self.height / self.width))
+        rows = ceil(len(frame_numbers) / columns)
+        height = rows * thumb_height + gap * (rows + 1)
+
+        sheet = f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">\n'
+        frames = self.frames_at(frame_numbers, OutputSpec(thumb_width, thumb_height))
+        for i, frame in enumerate(frames):
+            x = gap + (i % columns) * (thumb_width + gap)
+            y = gap + (i // columns) * (thumb_height + gap)
+            # Place the svg of frame in the grid
+            sheet += frame.replace("<svg ", f'<svg x="{x}" y="{y}" ', 1)
+        sheet += "</svg>\n"
+
+        if path:
+            save(sheet, f"{path}{name}", ext)
+        return sheet
 
     def save_frame(self, frame_number=-1, path="./", name=None):
         """Save the frame 'frame_number' on a file at 'path' with 'name' and extension 'ext'.
@@ -120,22 +746,11 @@ class Video:
         if name:
             n = name
         else:
+            # If no name given, assign name like that : frame_53_00001
             n = f"frame{frame_number}_{str(Video.file_count).zfill(5)}"
             Video.file_count += 1
 
-        frame = None
-        # Find frame and save it
-        for i, frame in self.make_movie():
-            if i == frame_number:
-                # If no name given, assign name like that : frame_53_00001
-                save(frame, f"{path}{n}", Format.SVG)
-                break
-        else:  # If frame not found, print last
-            if frame:
-                save(frame, f"{path}{n}", Format.SVG)
-            else:
-                # If None, the movie have no frame
-                raise Exception(f"Can't display frame {frame_number} if movie have no frame")
+        save(self.render_frame(frame_number), f"{path}{n}", Format.SVG)
 
     def print_frame(self, frame_number=-1):
         """Print frame on terminal, if 'frame_number' is -1, print last frame.
@@ -143,24 +758,55 @@ class Video:
         Args:
             frame_number (int) : The number of frame to save. Default -1 save last frame.
         """
-        path = get_default_path_name()
-        i, frame, max_time = 0, None, self.svg.get_max_time()
-        # Find frame and save it on tmp
-        for i, frame in self.make_movie():
-            if i + 1 == frame_number:
-                save(frame, path, Format.PNG)
-                break
-        else:  # If frame not found, print last frame we have
-            if frame:
-                save(frame, path, Format.PNG)
-                frame_number = i # Change the number of frame
-            else:
-                # If None, the movie have no frame
-                raise Exception(f"Can't display frame {frame_number} if movie have no frame")
-
-        display_on_term(f"{path}", f"Frame {frame_number}" if frame_number != -1 else "Last frame")
+        path, _ = os.path.splitext(get_default_path_name())
+        save(self.render_frame(frame_number), path, Format.PNG)
+        display_on_term(f"{path}.{Format.PNG.value}", f"Frame {frame_number}" if frame_number != -1 else "Last frame")
 
 # region Utility
+def encode_all(commands, rasters, pipeline=None, metrics=None, first_frame=0, progress=None):
+    """Encode rasters with one ffmpeg process by command, like several files written together.
+    If an encoder fail, all encoders are stopped.
+
+    Args:
+        commands    (list)         : The ffmpeg command of each encoder.
+        rasters     (iter)         : Iterable of the list of rasters of each encoder, for each frame.
+        pipeline    (int)          : Number of rasters waiting to be written to each ffmpeg.
+                                     Default None, write without thread.
+        metrics     (RenderReport) : The report where record time of writing. Default None, no measure.
+        first_frame (int)          : The number of first frame written, to record measures. Default 0.
+        progress    (callable)     : Function called with the Encoder at each progress of ffmpeg,
+                                     and when ffmpeg stall. Default None.
+    """
+    encoders = [Encoder(cmd, callback=progress) for cmd in commands]
+    writers = [RasterWriter(encoder, pipeline, metrics, first_frame) for encoder in encoders]
+    try:
+        # Display bytestream on stdin to pass at ffmpeg
+        for frame_rasters in rasters:
+            for raster, writer in zip(frame_rasters, writers):
+                writer.write(raster)
+        for writer in writers:
+            writer.close()
+    except BaseException:
+        # Encoders are killed, closing them would wait the end of encoding and hide the error
+        for encoder in encoders:
+            encoder.kill()
+        for writer in writers:
+            writer.stop()
+        raise
+
+def encode(cmd, rasters, pipeline=None, metrics=None, first_frame=0, progress=None):
+    """Encode rasters with ffmpeg, see encode_all.
+
+    Args:
+        cmd         (list)         : The ffmpeg command.
+        rasters     (iter)         : Iterable of rasters.
+        pipeline    (int)          : Number of rasters waiting to be written to ffmpeg. Default None, without thread.
+        metrics     (RenderReport) : The report where record time of writing. Default None, no measure.
+        first_frame (int)          : The number of first frame written, to record measures. Default 0.
+        progress    (callable)     : Function called with the Encoder at each progress of ffmpeg. Default None.
+    """
+    encode_all([cmd], ((raster,) for raster in rasters), pipeline, metrics, first_frame, progress)
+
 def get_default_path_name(ext=Format.PNG):
     """Get a string who indicate a default path with a default name
 
@@ -180,6 +826,47 @@ def get_default_path_name(ext=Format.PNG):
     Video.file_count += 1
     return path_name
 
+def save_hold_frames(rasters, directory, fps, metrics=None, first_frame=0):
+    """Save each different raster once in directory, with a ffmpeg concat file who give duration of each raster.
+    A raster is held while the same raster object is given again.
+
+    Args:
+        rasters     (iter)         : Iterable of png rasters.
+        directory   (str)          : The directory to save rasters.
+        fps         (int)          : Number of frames per seconds.
+        metrics     (RenderReport) : The report where record time of writing. Default None, no measure.
+        first_frame (int)          : The number of first raster, to record measures. Default 0.
+
+    Returns:
+        str : The path of concat file.
+    """
+    runs, previous = [], None
+    for frame_number, raster in enumerate(rasters, first_frame):
+        start = perf_counter()
+        if raster is previous:
+            runs[-1][1] += 1
+        else:
+            previous = raster
+            file_name = f"frame{str(len(runs)).zfill(6)}.{Format.PNG.value}"
+            with open(os.path.join(directory, file_name), "wb") as f:
+                f.write(get_buffer(raster))
+            runs.append([file_name, 1])
+        if metrics is not None:
+            metrics.record("write", frame_number, start, perf_counter() - start)
+
+    lines = ["ffconcat version 1.0"]
+    for file_name, count in runs:
+        lines.append(f"file '{file_name}'")
+        lines.append(f"duration {count / fps}")
+    if runs:
+        # Last file need to be repeat, else ffmpeg ignore his duration
+        lines.append(f"file '{runs[-1][0]}'")
+
+    concat = os.path.join(directory, "frames.ffconcat")
+    with open(concat, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return concat
+
 def save(element, path, ext):
     """Save element at path with extension 'ext'.
 
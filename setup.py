@@ -13,6 +13,8 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/evayann/SVGVideoMaker",
     packages=setuptools.find_packages(),
+    # Dirty mode override private methods of cairosvg surfaces, see damage.py
+    install_requires=["cairosvg>=2.2,<3"],
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
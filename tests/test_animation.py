@@ -0,0 +1,149 @@
+"""
+Regression tests of animations: all ways to compute a frame give the same svg.
+"""
+
+# region Imports
+import re
+import pytest
+pytest.importorskip("cairosvg")
+pytest.importorskip("cairocffi")
+from SVGVideoMaker import *
+from SVGVideoMaker import timeline
+from SVGVideoMaker.geo.debug import get_debug, set_debug
+# endregion Imports
+
+FPS = 30
+SECONDS = 3
+NUMBER = re.compile(r"-?\d+(?:\.\d+)?(?:e-?\d+)?")
+
+def create_scene(reverse=False):
+    """Create a svg with each kind of animation, on shapes, on a group and on a nested group.
+    Opacities change by a multiple of 0.001 at each frame, so they aren't rounded.
+
+    Args:
+        reverse (bool) : Add key frames from the last to the first. Default False.
+
+    Returns:
+        Video : The video of scene.
+    """
+    svg = SVG(width=200, height=200)
+    svg.set_view_box(Point2D(0, 0), Point2D(200, 200))
+    order = reversed if reverse else list
+
+    polygon = Polygon([Point2D(10, 10), Point2D(40, 10), Point2D(40, 40), Point2D(10, 40)])
+    for frame, x, y in order([(20, 30, 10), (50, -10, 40), (90, 5, 5)]):
+        polygon.add_translation(frame, x, y)
+    for frame, value in order([(0, 1), (30, 0.7), (60, 1)]):
+        polygon.add_opacity(frame, value)
+    polygon.add_rotate(45, 90)
+    polygon.add_modification(60, [Point2D(20, 20), Point2D(50, 20), Point2D(35, 50)])
+
+    ellipse = Ellipse(Point2D(100, 100), 10, 20)
+    for frame, x, y in order([(15, 20, 0), (75, 0, -30)]):
+        ellipse.add_translation(frame, x, y)
+    ellipse.add_rotate(90, 180)
+
+    arc = EllipseArc(Point2D(150, 50), Point2D(20, 10), 0, 120)
+    arc.add_angle_translation(60, 360)
+    segment = Segment(Point2D(10, 150), Point2D(60, 190))
+    segment.add_translation(40, 15, -15)
+
+    group, inner = Group(), Group()
+    inner.append(Circle(Point2D(120, 150), 5), Rectangle(Point2D(140, 140), 10, 20))
+    inner.add_rotate(30, -45)
+    group.append(Circle(Point2D(160, 160), 8), inner)
+    for frame, x, y in order([(40, 10, 10), (80, -20, 0)]):
+        group.add_translation(frame, x, y)
+    group.add_opacity(0, 1)
+    group.add_opacity(50, 0.5)
+    group.add_inflation(60, 0.5)
+
+    svg.append(polygon, ellipse, arc, segment, group)
+    return Video(svg, width=200, height=200, fps=FPS)
+
+def play_frames(video, timeline=True):
+    """Get the svg of each frame, updated frame by frame.
+
+    Args:
+        video    (Video) : The video.
+        timeline (bool)  : Update elements with the numpy timeline. Default True.
+
+    Returns:
+        list : The svg of each frame in string.
+    """
+    return [video.svg.get_svg() for _ in video.play(end=SECONDS, timeline=timeline)]
+
+def assert_close(frame, expected):
+    """Check two svg frames are the same, numbers can differ by the errors of floats.
+
+    Args:
+        frame    (str) : The svg frame.
+        expected (str) : The expected svg frame.
+    """
+    assert NUMBER.sub("#", frame) == NUMBER.sub("#", expected)
+    for value, expected_value in zip(NUMBER.findall(frame), NUMBER.findall(expected)):
+        assert float(value) == pytest.approx(float(expected_value), abs=1e-6)
+
+def test_timeline_same_as_update():
+    expected = play_frames(create_scene(), timeline=False)
+    assert play_frames(create_scene(), timeline=True) == expected
+    assert expected[0] != expected[45]
+
+def test_make_movie_same_as_play():
+    video = create_scene()
+    assert [frame for _, frame in video.make_movie(end=SECONDS)] == play_frames(create_scene())
+
+def test_render_frame_same_as_play():
+    video = create_scene()
+    frames = play_frames(video)
+    for frame_number in (0, 1, 17, 30, 45, 60, 89, 90):
+        assert_close(video.render_frame(frame_number), frames[frame_number])
+
+def test_start_same_as_play():
+    frames = play_frames(create_scene())
+    video = create_scene()
+    started = [frame for _, frame in video.make_movie(start=1, end=SECONDS)]
+    for frame, expected in zip(started, frames[FPS:]):
+        assert_close(frame, expected)
+
+def test_key_frames_out_of_order():
+    assert play_frames(create_scene(reverse=True)) == play_frames(create_scene())
+
+def test_second_make_movie_same_frames():
+    video = create_scene()
+    first = [frame for _, frame in video.make_movie(end=SECONDS)]
+    second = [frame for _, frame in video.make_movie(end=SECONDS)]
+    assert first == second
+
+def test_invalid_key_frame():
+    polygon = Polygon([Point2D(0, 0), Point2D(10, 0), Point2D(0, 10)])
+    polygon.add_rotate(10, "90")
+    with pytest.raises(ValueError):
+        polygon.animations.compile()
+
+def test_timeline_unsupported_values(capsys):
+    pytest.importorskip("numpy")
+    video = create_scene()
+    polygon = Polygon([Point2D(0, 0), Point2D(10, 0), Point2D(0, 10)], id="volume")
+    polygon.animations.add_animation(10, AnimationType.TRANSLATION, value=Point([1, 2, 3]))
+    video.svg.append(polygon)
+    video.svg.init_animation()
+
+    level = get_debug()
+    set_debug(DebugLevel.VERBOSE)
+    try:
+        assert timeline.get_timeline(video.svg) is None
+    finally:
+        set_debug(level)
+    assert "volume" in capsys.readouterr().out
+
+def test_timeline_errors_propagate(monkeypatch):
+    pytest.importorskip("numpy")
+    video = create_scene()
+    video.svg.init_animation()
+
+    def fail(*args):
+        raise TypeError("bug")
+    monkeypatch.setattr(timeline.Timeline, "get_segments", fail)
+    with pytest.raises(TypeError):
+        timeline.get_timeline(video.svg)
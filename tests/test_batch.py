@@ -0,0 +1,43 @@
+"""
+Tests of jobs loaded from a json file.
+"""
+
+# region Imports
+import os
+import json
+import pytest
+pytest.importorskip("cairosvg")
+pytest.importorskip("cairocffi")
+from SVGVideoMaker.batch import load_jobs
+# endregion Imports
+
+def write_jobs(tmp_path, descriptions):
+    directory = tmp_path / "jobs"
+    directory.mkdir()
+    jobs_file = directory / "jobs.json"
+    jobs_file.write_text(json.dumps(descriptions))
+    return str(jobs_file)
+
+def test_jobs_relative_to_json(tmp_path):
+    jobs_file = write_jobs(tmp_path, [
+        {"scene": "scenes/first.py"},
+        {"scene": "second.svg", "outputs": [{"ext": "webm"}, {"path": "other/", "name": "small", "width": 10}]},
+        {"scene": "SVGVideoMaker.examples.Polygon"},
+    ])
+    first, second, module = load_jobs(jobs_file, "videos/")
+    directory = os.path.dirname(jobs_file)
+
+    assert first.scene == os.path.join(directory, "scenes/first.py")
+    assert second.scene == os.path.join(directory, "second.svg")
+    assert module.scene == "SVGVideoMaker.examples.Polygon"
+    assert [first.name, second.name, module.name] == ["first", "second", "Polygon"]
+
+    assert [(output.path, output.name) for output in first.outputs] == [("videos/", "first")]
+    assert [(output.path, output.ext) for output in second.outputs] == [("videos/", "webm"), ("other/", "mp4")]
+
+def test_jobs_absolute_scene(tmp_path):
+    scene = str(tmp_path / "scene.py")
+    jobs_file = write_jobs(tmp_path, [{"scene": scene, "path": "own/"}])
+    job, = load_jobs(jobs_file, "videos/")
+    assert job.scene == scene
+    assert job.outputs[0].path == "own/"
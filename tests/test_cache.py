@@ -0,0 +1,76 @@
+"""
+Tests of the cache on disk of rasterized frames.
+"""
+
+# region Imports
+import os
+import pytest
+pytest.importorskip("cairosvg")
+pytest.importorskip("cairocffi")
+from SVGVideoMaker.cache import FrameCache
+# endregion Imports
+
+def test_get_and_put(tmp_path):
+    cache = FrameCache(str(tmp_path), max_size=100)
+    key = FrameCache.key("<svg/>")
+    assert cache.get(key) is None
+    cache.put(key, b"raster")
+    assert key in cache and len(cache) == 1
+    assert cache.get(key) == b"raster"
+    assert (cache.hits, cache.misses, cache.size) == (1, 1, 6)
+    assert os.path.exists(cache.get_path(key))
+
+def test_key_params():
+    frame = "<svg/>"
+    assert FrameCache.key(frame) == FrameCache.key(frame.encode())
+    assert FrameCache.key(frame, 100, 100, "png") == FrameCache.key(frame, 100, 100, "png")
+    keys = {FrameCache.key(frame), FrameCache.key(frame, 100, 100, "png"), FrameCache.key(frame, 100, 50, "png"),
+            FrameCache.key(frame, 100, 100, "raw"), FrameCache.key("<svg></svg>", 100, 100, "png")}
+    assert len(keys) == 5
+
+def test_evict_least_recently_used(tmp_path):
+    cache = FrameCache(str(tmp_path), max_size=30)
+    first, second, third, fourth = (FrameCache.key(str(i)) for i in range(4))
+    for key in (first, second, third):
+        cache.put(key, b"0123456789")
+    # First frame is used again, second frame is the least recently used
+    assert cache.get(first) is not None
+    cache.put(fourth, b"0123456789")
+
+    assert second not in cache and not os.path.exists(cache.get_path(second))
+    assert list(cache.entries) == [third, first, fourth]
+    assert cache.size == 30
+
+def test_load_index_by_last_use(tmp_path):
+    cache = FrameCache(str(tmp_path), max_size=100)
+    keys = [FrameCache.key(str(i)) for i in range(3)]
+    for time, key in zip((30, 10, 20), keys):
+        cache.put(key, b"raster")
+        os.utime(cache.get_path(key), (time, time))
+    # A temporary file of a frame who was being written isn't an entry
+    open(cache.get_path(keys[0]) + ".tmp", "wb").close()
+
+    loaded = FrameCache(str(tmp_path), max_size=100)
+    assert list(loaded.entries) == [keys[1], keys[2], keys[0]]
+    assert loaded.size == 18
+
+    # Reloaded cache evict the least recently used frame of previous render first
+    loaded.max_size = 12
+    loaded.evict()
+    assert list(loaded.entries) == [keys[2], keys[0]]
+
+def test_removed_file(tmp_path):
+    cache = FrameCache(str(tmp_path))
+    key = FrameCache.key("<svg/>")
+    cache.put(key, b"raster")
+    os.remove(cache.get_path(key))
+    assert cache.get(key) is None
+    assert key not in cache and cache.size == 0
+
+def test_clear(tmp_path):
+    cache = FrameCache(str(tmp_path), max_size=100)
+    for i in range(3):
+        cache.put(FrameCache.key(str(i)), b"raster")
+    cache.clear()
+    assert len(cache) == 0 and cache.size == 0 and cache.max_size == 100
+    assert len(FrameCache(str(tmp_path))) == 0
@@ -0,0 +1,56 @@
+"""
+Tests of rasterization of regions who change, compared to the rasterization of all frame.
+"""
+
+# region Imports
+import pytest
+pytest.importorskip("cairosvg")
+pytest.importorskip("cairocffi")
+from SVGVideoMaker import *
+from SVGVideoMaker.raster import render_surface
+from SVGVideoMaker import damage
+from SVGVideoMaker.damage import DamageTracker, DamageRenderer, track_damages
+# endregion Imports
+
+WIDTH, HEIGHT = 120, 80
+
+def create_video():
+    svg = SVG(width=WIDTH, height=HEIGHT)
+    svg.set_view_box(Point2D(0, 0), Point2D(WIDTH, HEIGHT))
+    still = Rectangle(Point2D(70, 10), 30, 20)
+    still.set_style(fill_color="blue", stroke_color="black", stroke_width=2)
+    moving = Polygon([Point2D(5, 40), Point2D(25, 40), Point2D(15, 60)])
+    moving.set_style(fill_color="red", stroke_color="green", stroke_width=3, opacity=0.8)
+    moving.add_translation(20, 30, 5)
+    moving.add_rotate(30, 45)
+    svg.append(still, moving)
+    return Video(svg, width=WIDTH, height=HEIGHT, fps=30)
+
+def render_frames(video):
+    """Rasterize frames of video in dirty mode, and check each raster is the same than a full rasterization.
+
+    Args:
+        video (Video) : The video.
+
+    Returns:
+        DamageRenderer : The renderer who rasterized frames.
+    """
+    renderer = DamageRenderer(WIDTH, HEIGHT)
+    tracker = DamageTracker(video.svg, WIDTH, HEIGHT)
+    for _, frame in track_damages(video.make_movie(end=1), tracker):
+        dirty = bytes(renderer(frame).get_data())
+        full = bytes(render_surface(frame.svg, WIDTH, HEIGHT).get_data())
+        # Antialiasing at border of regions can differ by a rounding
+        assert len(dirty) == len(full)
+        assert max(abs(a - b) for a, b in zip(dirty, full)) <= 1
+    return renderer
+
+def test_dirty_same_as_full():
+    renderer = render_frames(create_video())
+    if damage.CLIPPED:
+        # Only regions of moving element were rasterized
+        assert 0 < renderer.get_damaged_ratio() < 1
+
+def test_dirty_without_hooks(monkeypatch):
+    monkeypatch.setattr(damage, "CLIPPED", False)
+    assert render_frames(create_video()).get_damaged_ratio() == 1
@@ -0,0 +1,88 @@
+"""
+Tests of segments and manifest of incremental render, without ffmpeg.
+"""
+
+# region Imports
+import os
+import pytest
+pytest.importorskip("cairosvg")
+pytest.importorskip("cairocffi")
+from SVGVideoMaker.incremental import RenderManifest, get_segments, hash_frame
+# endregion Imports
+
+PARAMS = {"width": 100, "height": 100, "fps": 30, "profile": "mp4"}
+
+def get_bounds(start, end, size):
+    frames = ((i, str(i)) for i in range(start, end + 1))
+    return [(first, last, segment) for first, last, segment in get_segments(frames, size)]
+
+def test_segments_begin_at_multiple():
+    assert [(first, last) for first, last, _ in get_bounds(0, 9, 4)] == [(0, 3), (4, 7), (8, 9)]
+    # A movie who don't begin at a multiple of size have a shorter first segment
+    segments = get_bounds(6, 21, 5)
+    assert [(first, last) for first, last, _ in segments] == [(6, 9), (10, 14), (15, 19), (20, 21)]
+    assert segments[0][2] == ["6", "7", "8", "9"]
+    assert [frame for _, _, segment in segments for frame in segment] == [str(i) for i in range(6, 22)]
+
+def test_one_segment():
+    assert get_bounds(3, 3, 4) == [(3, 3, ["3"])]
+    assert list(get_segments(iter(()), 4)) == []
+
+def create_manifest(directory, hashes):
+    manifest = RenderManifest(directory, PARAMS)
+    for start, file in ((0, "segment0.mp4"), (4, "segment4.mp4")):
+        with open(manifest.get_path(file), "wb") as f:
+            f.write(b"segment")
+        manifest.add(start, start + 3, hashes[start:start + 4], file)
+    manifest.save()
+    return manifest
+
+def test_is_valid(tmp_path):
+    directory = str(tmp_path / "segments")
+    hashes = [hash_frame(str(i)) for i in range(8)]
+    create_manifest(directory, hashes)
+
+    manifest = RenderManifest(directory, PARAMS)
+    assert manifest.is_valid(0, 3, hashes[:4])
+    assert manifest.is_valid(4, 7, hashes[4:])
+    # A frame change, the segment end elsewhere or begin elsewhere
+    assert not manifest.is_valid(0, 3, hashes[:3] + [hash_frame("other")])
+    assert not manifest.is_valid(4, 6, hashes[4:7])
+    assert not manifest.is_valid(2, 5, hashes[2:6])
+
+    # The file of segment was removed
+    os.remove(manifest.get_path("segment4.mp4"))
+    assert not manifest.is_valid(4, 7, hashes[4:])
+
+def test_other_params(tmp_path):
+    directory = str(tmp_path / "segments")
+    hashes = [hash_frame(str(i)) for i in range(8)]
+    create_manifest(directory, hashes)
+
+    manifest = RenderManifest(directory, {**PARAMS, "width": 200})
+    assert manifest.segments == {}
+    assert not manifest.is_valid(0, 3, hashes[:4])
+
+def test_unreadable_manifest(tmp_path):
+    directory = str(tmp_path / "segments")
+    create_manifest(directory, [hash_frame(str(i)) for i in range(8)])
+    with open(os.path.join(directory, RenderManifest.FILE_NAME), "w") as f:
+        f.write("{")
+    assert RenderManifest(directory, PARAMS).segments == {}
+
+def test_keep(tmp_path):
+    directory = str(tmp_path / "segments")
+    manifest = create_manifest(directory, [hash_frame(str(i)) for i in range(8)])
+
+    manifest.keep([0])
+    assert list(manifest.segments) == [0]
+    assert os.path.exists(manifest.get_path("segment0.mp4"))
+    assert not os.path.exists(manifest.get_path("segment4.mp4"))
+
+    manifest.save()
+    assert list(RenderManifest(directory, PARAMS).segments) == [0]
+
+def test_save_concat(tmp_path):
+    manifest = create_manifest(str(tmp_path / "segments"), [hash_frame(str(i)) for i in range(8)])
+    with open(manifest.save_concat([0, 4])) as f:
+        assert f.read() == "file 'segment0.mp4'\nfile 'segment4.mp4'\n"
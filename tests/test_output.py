@@ -0,0 +1,59 @@
+"""
+Tests of outputs rasterized together and of their ffmpeg commands.
+"""
+
+# region Imports
+import pytest
+pytest.importorskip("cairosvg")
+pytest.importorskip("cairocffi")
+from SVGVideoMaker.geo import Point2D
+from SVGVideoMaker.output import OutputSpec, get_branches
+# endregion Imports
+
+INPUT = ["ffmpeg", "-y", "-s", "640x360", "-r", "30", "-f", "rawvideo", "-pix_fmt"]
+
+def get_names(branches):
+    return [[output.name for output in branch.outputs] for branch in branches]
+
+def test_branches_by_view_box_and_ratio():
+    view_box = (Point2D(0, 0), Point2D(50, 50))
+    outputs = [
+        OutputSpec(640, 360, name="big"), OutputSpec(320, 180, name="small", ext="webm"),
+        OutputSpec(100, 100, name="square"), OutputSpec(200, 200, name="square_big"),
+        OutputSpec(200, 200, view_box=view_box, name="zoom"),
+        OutputSpec(100, 100, view_box=view_box, name="zoom_small"),
+        OutputSpec(321, 180, name="other_ratio"),
+    ]
+    assert get_names(get_branches(outputs)) == [[output.name] for output in outputs]
+    assert get_names(get_branches(outputs, split=True)) == [["big", "small"], ["square", "square_big"],
+                                                            ["zoom", "zoom_small"], ["other_ratio"]]
+    branch = get_branches(outputs, split=True)[1]
+    assert (branch.spec.name, branch.width, branch.height) == ("square_big", 200, 200)
+
+def test_palette_alone():
+    outputs = [OutputSpec(320, 180, name="first", ext="gif"), OutputSpec(640, 360, name="video"),
+               OutputSpec(160, 90, name="second", ext="gif")]
+    assert get_names(get_branches(outputs, split=True)) == [["first"], ["second"], ["video"]]
+
+def test_command_of_one_output():
+    output = OutputSpec(640, 360, path="videos/", name="alone")
+    branch, = get_branches([output], split=True)
+    assert branch.get_command(30) == ["ffmpeg", "-y", "-s", "640x360", "-r", "30", "-i", "-",
+                                      *output.profile.get_options(), "videos/alone.mp4"]
+
+def test_command_of_split_outputs():
+    big, small = OutputSpec(640, 360, path="videos/", name="big"), OutputSpec(320, 180, name="small", ext="webm")
+    branch, = get_branches([small, big], split=True)
+    cmd = branch.get_command(30, raw=True)
+
+    assert cmd[:len(INPUT)] == INPUT
+    assert cmd[len(INPUT) + 1:len(INPUT) + 3] == ["-i", "-"]
+    graph = cmd[cmd.index("-filter_complex") + 1].split(";")
+    assert graph == ["[0:v]split=2[split0][split1]",
+                     "[split0]scale=320:180[out0]",
+                     "[split1]scale=640:360,pad=ceil(iw/2)*2:ceil(ih/2)*2[out1]"]
+
+    maps = cmd[cmd.index("-map"):]
+    assert maps == ["-map", "[out0]", *small.profile.get_options(filters=False), "./small.webm",
+                    "-map", "[out1]", *big.profile.get_options(filters=False), "videos/big.mp4"]
+    assert "-vf" not in cmd
@@ -0,0 +1,92 @@
+"""
+Tests of rasterization of frames on a pool of processes, with a fake rasterization who don't need cairo.
+"""
+
+# region Imports
+import os
+import time
+import pytest
+pytest.importorskip("cairosvg")
+pytest.importorskip("cairocffi")
+from concurrent.futures import ThreadPoolExecutor
+from SVGVideoMaker.geo import SVG
+from SVGVideoMaker.raster import RasterPool, FrameData
+from SVGVideoMaker.video import Video, save_hold_frames
+# endregion Imports
+
+def fake_rasterize(frame):
+    # First frames are the slowest, they end after next frames
+    svg = frame.svg if isinstance(frame, FrameData) else frame
+    time.sleep(0.002 * (10 - int(svg) % 10))
+    return f"raster {svg}".encode()
+
+class CountRasterize:
+    """ Rasterize frames on main process and count the frames rasterized.
+    """
+    def __init__(self):
+        self.frames = []
+
+    def __call__(self, frame):
+        self.frames.append(frame)
+        return f"raster {frame}".encode()
+
+def test_imap_order_with_processes():
+    frames = [str(i) for i in range(30)]
+    with RasterPool(fake_rasterize, workers=3) as pool:
+        assert list(pool.imap(frames)) == [f"raster {i}".encode() for i in range(30)]
+
+def test_imap_window():
+    submitted, given = [], []
+
+    def frames():
+        for i in range(20):
+            submitted.append(i)
+            # Frames given to pool but not given back are at most the window
+            assert len(submitted) - len(given) <= 4
+            yield str(i)
+
+    with ThreadPoolExecutor(2) as executor:
+        pool = RasterPool(fake_rasterize, workers=2, executor=executor)
+        assert pool.window == 4
+        for raster in pool.imap(frames()):
+            given.append(raster)
+        pool.close()
+        # A shared executor is stopped by its owner
+        assert executor.submit(abs, -1).result() == 1
+    assert given == [f"raster {i}".encode() for i in range(20)]
+
+def test_hold_previous_raster():
+    function = CountRasterize()
+    pool = RasterPool(function)
+    frames = ["a", "a", "b", "b", "b", FrameData("b"), "a"]
+    rasters = list(pool.imap(frames))
+
+    assert function.frames == ["a", "b", "a"]
+    assert rasters[0] is rasters[1]
+    assert rasters[2] is rasters[3] is rasters[4] is rasters[5]
+    assert rasters[6] is not rasters[0] and rasters[6] == rasters[0]
+
+def test_save_hold_frames(tmp_path):
+    first, second = b"first", b"second"
+    rasters = [first, first, first, second, first, first]
+    concat = save_hold_frames(rasters, str(tmp_path), fps=30)
+
+    assert sorted(os.listdir(str(tmp_path))) == ["frame000000.png", "frame000001.png", "frame000002.png",
+                                                "frames.ffconcat"]
+    assert (tmp_path / "frame000001.png").read_bytes() == second
+    with open(concat) as f:
+        assert f.read().splitlines() == [
+            "ffconcat version 1.0",
+            "file 'frame000000.png'", f"duration {3 / 30}",
+            "file 'frame000001.png'", f"duration {1 / 30}",
+            "file 'frame000002.png'", f"duration {2 / 30}",
+            "file 'frame000002.png'",
+        ]
+
+def test_raw_need_background():
+    video = Video(SVG(background_color=None), width=10, height=10)
+    for render in (video.save_movie, video.preview, video.save_incremental):
+        with pytest.raises(ValueError):
+            render(raw=True)
+    with pytest.raises(ValueError):
+        video.save_outputs([], raw=True)
@@ -0,0 +1,37 @@
+"""
+Regression tests of SVG.dump and SVG.load: a loaded svg play the same frames.
+"""
+
+# region Imports
+import pytest
+pytest.importorskip("cairosvg")
+pytest.importorskip("cairocffi")
+from SVGVideoMaker import *
+from test_animation import create_scene, play_frames, SECONDS
+# endregion Imports
+
+def test_loads_same_frames():
+    video = create_scene()
+    data = video.svg.dumps()
+    expected = play_frames(video)
+    loaded = Video(SVG.loads(data), width=video.width, height=video.height, fps=video.fps)
+    assert play_frames(loaded) == expected
+
+def test_load_file_same_frames(tmp_path):
+    video = create_scene()
+    path = str(tmp_path / "scene.svgvm")
+    video.svg.dump(path)
+    loaded = Video(SVG.load(path), width=video.width, height=video.height, fps=video.fps)
+    assert [frame for _, frame in loaded.make_movie(end=SECONDS)] == play_frames(create_scene())
+
+def test_loads_parsed_transforms(tmp_path):
+    path = tmp_path / "scene.svg"
+    path.write_text('<svg width="100" height="100" viewBox="0 0 100 100">'
+                    '<g transform="translate(10 20)"><rect x="1" y="2" width="30" height="40"/>'
+                    '<g transform="rotate(15)"><line x1="0" y1="0" x2="5" y2="5"/></g></g>'
+                    '<rect x="3" y="4" width="10" height="10" transform="translate(5 6) rotate(30)"/>'
+                    '<ellipse cx="50" cy="50" rx="4" ry="8" transform="translate(-2.5 1)"/></svg>')
+    svg = parse_svg(str(path))
+    expected = svg.get_svg()
+    assert "translate(10.0 20.0)" in expected and "rotate(30.0" in expected
+    assert SVG.loads(svg.dumps()).get_svg() == expected
@@ -0,0 +1,40 @@
+"""
+Regression tests of the svg of shapes reused between frames.
+"""
+
+# region Imports
+import pytest
+pytest.importorskip("cairosvg")
+pytest.importorskip("cairocffi")
+from SVGVideoMaker import *
+from SVGVideoMaker.geo.debug import get_debug, set_debug
+# endregion Imports
+
+@pytest.fixture
+def debug_level():
+    level = get_debug()
+    yield
+    set_debug(level)
+
+def test_debug_level_change_svg(debug_level):
+    polygon = Polygon([Point2D(0, 0), Point2D(10, 0), Point2D(0, 10)])
+    group = Group()
+    group.append(Polygon([Point2D(20, 20), Point2D(30, 20), Point2D(20, 30)]))
+    svg = SVG(width=50, height=50)
+    svg.append(polygon, group)
+
+    set_debug(DebugLevel.NO)
+    plain = svg.get_svg()
+    set_debug(DebugLevel.VISUAL)
+    visual = svg.get_svg()
+    assert visual.count("<ellipse") - plain.count("<ellipse") == 6
+    set_debug(DebugLevel.VERBOSE)
+    assert svg.get_svg() == plain
+
+def test_unchanged_shape_reuse_svg():
+    polygon = Polygon([Point2D(0, 0), Point2D(10, 0), Point2D(0, 10)])
+    content = polygon.get_content()
+    assert polygon.get_content() is content
+    polygon.add_translation(10, 10, 0)
+    polygon.set_dirty()
+    assert polygon.get_content() is not content